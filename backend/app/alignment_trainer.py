@@ -0,0 +1,221 @@
+import math
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+import torchaudio.functional as F
+
+from app.compiled_target import CompiledTarget
+from app.pronunciation_trainer import PronunciationTrainer
+from models.ctc_phoneme_model import CTCPhonemeModel, get_ctc_phoneme_model
+from models.interfaces import ITextToPhonemModel, TranscriptionResult
+from models.phoneme_converters import get_phonem_converter
+
+
+class AlignmentPronunciationTrainer(PronunciationTrainer):
+    """
+    Scores a recording by force-aligning it to the target's phonemes with a CTC phoneme model, instead of
+    transcribing it freely with Whisper and aligning the texts. One forward pass, no autoregressive decoding.
+
+    Results follow the PronunciationTrainer contract. A phoneme counts as correct when its goodness of
+    pronunciation (GOP: mean log-posterior of the target phoneme over its aligned frames minus that of the
+    best competing unit, blank included, 0 at best) is at least `gop_threshold`. `phoneme_scores` adds, per
+    target word, each phoneme's GOP, a 0-100 score, the phoneme the model heard there and its timing in seconds.
+    """
+
+    def __init__(self, trim_silence: bool = True, ipa_converter: ITextToPhonemModel = None,
+                 gop_threshold: float = -1.0, acoustic_model: Optional[CTCPhonemeModel] = None):
+        # No free-decoding ASR model, so the Whisper pipeline is not loaded (and streaming is not available)
+        self.asr_model = None
+        self.asr_scheduler = None
+        self.acoustic_model = acoustic_model if acoustic_model is not None else get_ctc_phoneme_model()
+        self.trim_silence = trim_silence
+        self.ipa_converter = ipa_converter if ipa_converter is not None else get_phonem_converter("en")
+        self.gop_threshold = gop_threshold
+        self.sampling_rate = 16000
+        self.categories_thresholds = np.array([80, 60, 59])
+        # Everything besides the audio and target text that changes a result
+        self.model_version = (f"{self.acoustic_model.model_version}|trim_silence={trim_silence}"
+                              f"|gop_threshold={gop_threshold}")
+        # Special units (sentence markers, unknown) never compete in GOP. The blank does: where the path had to
+        # place a phoneme the speaker skipped, the blank dominates and the GOP drops.
+        self._special_ids = torch.tensor(
+            sorted(self.acoustic_model.special_ids - {self.acoustic_model.blank_id}), dtype=torch.long)
+        self._blank_id = self.acoustic_model.blank_id
+
+    def process_audio_for_given_text(self, recorded_audio: torch.Tensor, target_text: str,
+                                     compiled_target: CompiledTarget = None) -> Dict:
+        """
+        Score a recording against the target text.
+
+        Args:
+            recorded_audio: Audio tensor
+            target_text: Target text to compare against
+            compiled_target: Precompiled `target_text`, compiled here when not provided
+
+        Returns:
+            Dictionary containing pronunciation analysis results, with `phoneme_scores`
+        """
+        if compiled_target is None:
+            compiled_target = self.compile_target(target_text)
+        _, speech_audio, offset_in_samples = self._prepare_audio(recorded_audio)
+        log_probs = self.acoustic_model.log_posteriors([speech_audio])[0]
+        return self._score_alignment(log_probs, offset_in_samples, target_text, compiled_target)
+
+    def process_batch(self, recorded_audios: Sequence[torch.Tensor], target_texts: Sequence[str],
+                      compiled_targets: Sequence[CompiledTarget] = None,
+                      batch_size: int = 8) -> Iterator[Tuple[int, Union[Dict, Exception]]]:
+        """Same as PronunciationTrainer.process_batch, `batch_size` clips per acoustic model forward pass."""
+        if compiled_targets is None:
+            compiled_targets = [None] * len(recorded_audios)
+        for batch_start in range(0, len(recorded_audios), batch_size):
+            # Clips that cannot be prepared (e.g. empty) fail on their own, the rest goes through one forward pass
+            prepared = {}
+            for idx in range(batch_start, min(batch_start + batch_size, len(recorded_audios))):
+                try:
+                    prepared[idx] = self._prepare_audio(recorded_audios[idx])
+                except Exception as e:
+                    yield idx, e
+            if not prepared:
+                continue
+
+            speech_audios = [speech_audio for _, speech_audio, _ in prepared.values()]
+            try:
+                batch_log_probs = self.acoustic_model.log_posteriors(speech_audios)
+            except Exception:
+                # One clip can break the whole forward pass, give every clip its own posteriors or error
+                batch_log_probs = []
+                for speech_audio in speech_audios:
+                    try:
+                        batch_log_probs.append(self.acoustic_model.log_posteriors([speech_audio])[0])
+                    except Exception as e:
+                        batch_log_probs.append(e)
+
+            for (idx, (_, _, offset_in_samples)), log_probs in zip(prepared.items(), batch_log_probs):
+                try:
+                    if isinstance(log_probs, Exception):
+                        raise log_probs
+                    compiled_target = compiled_targets[idx] or self.compile_target(target_texts[idx])
+                    yield idx, self._score_alignment(log_probs, offset_in_samples, target_texts[idx], compiled_target)
+                except Exception as e:
+                    yield idx, e
+
+    def transcribe(self, recorded_audio: torch.Tensor) -> TranscriptionResult:
+        raise NotImplementedError("Forced alignment does not transcribe, use SCORING_ENGINE=whisper for transcripts")
+
+    def _score_alignment(self, log_probs: torch.Tensor, offset_in_samples: int, target_text: str,
+                         compiled_target: CompiledTarget) -> Dict:
+        """Align the target phonemes to the frames and turn the per-phoneme GOP into the result contract."""
+        words_units = [self.acoustic_model.units_for_ipa(word_ipa) for word_ipa in compiled_target.words_ipa]
+        spans = self._align(log_probs, [unit for units in words_units for unit in units])
+        offset_seconds = offset_in_samples / self.sampling_rate
+        frame_seconds = self.acoustic_model.frame_seconds
+
+        real_and_transcribed_words = []
+        real_and_transcribed_words_ipa = []
+        mapped_words_indices = []
+        words_pronunciation_accuracy = []
+        words_phoneme_mismatches = []
+        phoneme_scores = []
+        transcript_words = []
+        transcript_ipa = []
+        total_phonemes = 0
+        total_mismatches = 0
+        span_idx = 0
+
+        for word_idx, units in enumerate(words_units):
+            word = compiled_target.words[word_idx]
+            word_scores = []
+            for unit in units:
+                if spans is not None:
+                    start, end = spans[span_idx]
+                    gop, recognized = self._goodness_of_pronunciation(log_probs[start:end], self.acoustic_model.vocab[unit])
+                    word_scores.append({
+                        "phoneme": unit,
+                        "recognized": recognized,
+                        "start_ts": round(offset_seconds + start * frame_seconds, 3),
+                        "end_ts": round(offset_seconds + end * frame_seconds, 3),
+                        "gop": round(gop, 3),
+                        "score": round(100 * math.exp(gop), 1),
+                    })
+                span_idx += 1
+
+            mismatches = sum(1 for score in word_scores if score["gop"] < self.gop_threshold) + len(units) - len(word_scores)
+            total_phonemes += len(units)
+            total_mismatches += mismatches
+            words_phoneme_mismatches.append(mismatches)
+            # Words without any phoneme the model knows (numbers, symbols) cannot be judged, they pass
+            words_pronunciation_accuracy.append((len(units) - mismatches) / len(units) * 100 if units else 100.0)
+            phoneme_scores.append(word_scores)
+
+            if units and mismatches == len(units):
+                # Nothing of the word was heard
+                real_and_transcribed_words.append((word, '-'))
+                real_and_transcribed_words_ipa.append((compiled_target.words_ipa[word_idx], '-'))
+                mapped_words_indices.append(-1)
+                continue
+            heard_ipa = ''.join(
+                score["phoneme"] if score["gop"] >= self.gop_threshold else score["recognized"] for score in word_scores)
+            heard_word = self._heard_word(word, word_scores, len(units)) if mismatches else word
+            real_and_transcribed_words.append((word, heard_word))
+            real_and_transcribed_words_ipa.append((compiled_target.words_ipa[word_idx], heard_ipa))
+            mapped_words_indices.append(len(transcript_words))
+            transcript_words.append(heard_word)
+            transcript_ipa.append(heard_ipa)
+
+        # Like its words, a target without any phoneme the model knows passes
+        pronunciation_accuracy = (total_phonemes - total_mismatches) / total_phonemes * 100 if total_phonemes else 100.0
+        return {
+            'recording_transcript': ' '.join(transcript_words),
+            'real_and_transcribed_words': real_and_transcribed_words,
+            'recording_ipa': ' '.join(transcript_ipa),
+            'real_and_transcribed_words_ipa': real_and_transcribed_words_ipa,
+            'mapped_words_indices': mapped_words_indices,
+            'pronunciation_accuracy': np.round(pronunciation_accuracy),
+            'words_pronunciation_accuracy': words_pronunciation_accuracy,
+            'words_phoneme_edit_distance': words_phoneme_mismatches,
+            'pronunciation_categories': self._get_words_pronunciation_category(words_pronunciation_accuracy),
+            'phoneme_scores': phoneme_scores,
+            'target_text': target_text
+        }
+
+    def _heard_word(self, word: str, word_scores: List[Dict], unit_count: int) -> str:
+        """
+        `word` with the letters of its mispronounced phonemes replaced by '*', so the transcribed word and the
+        letter mask show where it went wrong. The phonemes are spread evenly over the word's letters.
+        """
+        letter_positions = [position for position, letter in enumerate(word) if letter.isalpha()]
+        heard = list(word)
+        for unit_idx in range(unit_count):
+            if unit_idx < len(word_scores) and word_scores[unit_idx]["gop"] >= self.gop_threshold:
+                continue
+            first = unit_idx * len(letter_positions) // unit_count
+            last = max((unit_idx + 1) * len(letter_positions) // unit_count, first + 1)
+            for position in letter_positions[first:last]:
+                heard[position] = '*'
+        return ''.join(heard)
+
+    def _align(self, log_probs: torch.Tensor, units: List[str]) -> Optional[List[Tuple[int, int]]]:
+        """Frame span [start, end) of every unit on the CTC Viterbi path, None when they cannot fit the audio."""
+        if not units:
+            return []
+        targets = [self.acoustic_model.vocab[unit] for unit in units]
+        # CTC needs a frame per unit plus a blank between repeated units
+        repeats = sum(1 for previous, current in zip(targets, targets[1:]) if previous == current)
+        if log_probs.shape[0] < len(targets) + repeats:
+            return None
+        alignment, scores = F.forced_align(
+            log_probs.unsqueeze(0), torch.tensor([targets], dtype=torch.int32), blank=self.acoustic_model.blank_id)
+        token_spans = F.merge_tokens(alignment[0], scores[0].exp(), blank=self.acoustic_model.blank_id)
+        return [(span.start, span.end) for span in token_spans]
+
+    def _goodness_of_pronunciation(self, frames: torch.Tensor, target_id: int) -> Tuple[float, str]:
+        """GOP of the target phoneme over its frames (<= 0) and the phoneme most likely heard there."""
+        competitors = frames.clone()
+        if len(self._special_ids):
+            competitors[:, self._special_ids] = float("-inf")
+        best = competitors.max(dim=-1).values
+        gop = float((frames[:, target_id] - best).mean())
+        competitors[:, self._blank_id] = float("-inf")
+        recognized_id = int(competitors.mean(dim=0).argmax())
+        return min(0.0, gop), self.acoustic_model.id_to_unit[recognized_id]
@@ -0,0 +1,129 @@
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from string import punctuation
+from typing import Any, Callable, Dict, List, Tuple
+
+from models.interfaces import ITextToPhonemModel
+from utils.word_metrics import CompiledPattern, compile_pattern
+
+
+@dataclass(frozen=True)
+class CompiledTarget:
+    """Everything about a target text that does not depend on the recording, computed once."""
+    text: str
+    words: Tuple[str, ...]
+    words_ipa: Tuple[str, ...]
+    # Lowercased IPA without punctuation, what the phoneme edit distance is computed on
+    words_phonemes: Tuple[str, ...]
+    words_patterns: Tuple[CompiledPattern, ...]
+
+
+def remove_punctuation(word: str) -> str:
+    """Remove punctuation from word."""
+    return ''.join([char for char in word if char not in punctuation])
+
+
+def compile_target(target_text: str, ipa_converter: ITextToPhonemModel) -> CompiledTarget:
+    words = tuple(target_text.split())
+    words_ipa = tuple(ipa_converter.convertToPhonem(word) for word in words)
+    words_phonemes = tuple(remove_punctuation(word_ipa).lower() for word_ipa in words_ipa)
+    return CompiledTarget(
+        text=target_text,
+        words=words,
+        words_ipa=words_ipa,
+        words_phonemes=words_phonemes,
+        words_patterns=tuple(compile_pattern(phonemes) for phonemes in words_phonemes),
+    )
+
+
+def get_assignment_target_texts(detail: Any) -> List[str]:
+    """Answers of the questions in an assignment's `detail` JSON, i.e. the texts students read aloud."""
+    if isinstance(detail, str):
+        try:
+            detail = json.loads(detail)
+        except ValueError:
+            return []
+    if not isinstance(detail, dict):
+        return []
+    target_texts = []
+    for question in detail.get("questions") or []:
+        answer = question.get("answer") if isinstance(question, dict) else None
+        if isinstance(answer, str) and answer.strip():
+            target_texts.append(answer)
+    return target_texts
+
+
+class CompiledTargetCache:
+    """
+    Compiled targets grouped per assignment, the least recently used assignments are evicted first.
+    Assignments are compiled when created or updated, other target texts lazily on first use. Target
+    texts come from clients, so each assignment keeps at most `max_texts_per_assignment` of them (least
+    recently used out) and memory stays bounded whatever ids and texts are sent.
+    """
+
+    def __init__(self, compile: Callable[[str], CompiledTarget], max_assignments: int = 1024,
+                 max_texts_per_assignment: int = 64):
+        self.compile = compile
+        self.max_assignments = max_assignments
+        self.max_texts_per_assignment = max_texts_per_assignment
+        self._assignments: "OrderedDict[int, OrderedDict[str, CompiledTarget]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, assignment_id: int, target_text: str) -> CompiledTarget:
+        with self._lock:
+            targets = self._assignments.get(assignment_id)
+            if targets is not None:
+                self._assignments.move_to_end(assignment_id)
+                compiled_target = targets.get(target_text)
+                if compiled_target is not None:
+                    targets.move_to_end(target_text)
+                    self.hits += 1
+                    return compiled_target
+            self.misses += 1
+
+        compiled_target = self.compile(target_text)
+        if self.max_texts_per_assignment <= 0:
+            return compiled_target
+        with self._lock:
+            targets = self._store(assignment_id)
+            compiled_target = targets.setdefault(target_text, compiled_target)
+            while len(targets) > self.max_texts_per_assignment:
+                targets.popitem(last=False)
+        return compiled_target
+
+    def compile_assignment(self, assignment_id: int, detail: Any) -> None:
+        """Replace the cached targets of an assignment with freshly compiled ones for its questions."""
+        compiled_targets = {text: self.compile(text) for text in get_assignment_target_texts(detail)}
+        with self._lock:
+            self._assignments.pop(assignment_id, None)
+            self._store(assignment_id).update(compiled_targets)
+
+    def invalidate(self, assignment_id: int) -> None:
+        with self._lock:
+            self._assignments.pop(assignment_id, None)
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "assignments": len(self._assignments),
+                "max_assignments": self.max_assignments,
+                "max_texts_per_assignment": self.max_texts_per_assignment,
+                "targets": sum(len(targets) for targets in self._assignments.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _store(self, assignment_id: int) -> "OrderedDict[str, CompiledTarget]":
+        targets = self._assignments.get(assignment_id)
+        if targets is None:
+            targets = self._assignments[assignment_id] = OrderedDict()
+            if len(self._assignments) > self.max_assignments:
+                self._assignments.popitem(last=False)
+        self._assignments.move_to_end(assignment_id)
+        return targets
@@ -0,0 +1,121 @@
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import torch
+
+from app.pronunciation_trainer import PronunciationTrainer
+from utils.audio_processing import preprocess_audio
+
+
+class ModelNotReadyError(Exception):
+    """Raised when the models are still loading (or failed to load)."""
+
+    def __init__(self, state: str):
+        super().__init__(f"Models are not ready yet (state: {state})")
+        self.state = state
+
+
+def warm_up(trainer: PronunciationTrainer, seconds: float = 1.0) -> None:
+    """
+    Run one synthetic decode and scoring pass, so the first real request does not pay for lazy
+    initialization (graph building, kernel selection, allocator growth, phoneme lookups).
+    """
+    rng = np.random.default_rng(0)
+    time_axis = np.arange(int(seconds * trainer.sampling_rate)) / trainer.sampling_rate
+    # A loud enough tone plus noise, so it is not mistaken for silence
+    signal = 0.3 * np.sin(2 * np.pi * 220 * time_axis) + 0.05 * rng.standard_normal(time_axis.shape)
+    audio = preprocess_audio(torch.from_numpy(signal.astype(np.float32)).unsqueeze(0))
+
+    if trainer.asr_model is None:
+        # Forced alignment engine: no separate ASR model, one full scoring pass covers everything
+        trainer.process_audio_for_given_text(audio, "Hello world")
+        return
+
+    # Straight to the model: going through the batching scheduler would start its thread, and the
+    # warm-up may run in a parent process that forks workers afterwards
+    trainer.asr_model.transcribe(audio)
+    if trainer.asr_scheduler is not None:
+        # Also warm the padded batch path used by micro-batching
+        trainer.asr_model.transcribe_batch([audio, audio])
+    trainer.score_transcript("Hello world", "Hello world")
+
+
+class ModelLoader:
+    """
+    Loads the pronunciation trainer on a background thread so the server can bind and answer liveness
+    probes right away. States: idle -> loading -> warming_up -> ready, or failed.
+    """
+
+    def __init__(self, factory: Callable[[], PronunciationTrainer], warm_up: bool = True):
+        self.factory = factory
+        self.warm_up = warm_up
+        self.state = "idle"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warm_up_seconds: Optional[float] = None
+        self._trainer: Optional[PronunciationTrainer] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Load in the background, unless `load()` already ran (e.g. in a preloading parent process)."""
+        if self._thread is None and self.state == "idle":
+            self._thread = threading.Thread(target=self._load, name="model-loader", daemon=True)
+            self._thread.start()
+
+    def load(self) -> bool:
+        """Load and warm up on the calling thread; returns whether the models are ready."""
+        if self.state == "idle":
+            self._load()
+        return self.is_ready
+
+    def _load(self) -> None:
+        try:
+            self.state = "loading"
+            started = time.monotonic()
+            trainer = self.factory()
+            self.load_seconds = time.monotonic() - started
+            print(f"Models loaded in {self.load_seconds:.1f}s")
+
+            if self.warm_up:
+                self.state = "warming_up"
+                started = time.monotonic()
+                try:
+                    warm_up(trainer)
+                    self.warm_up_seconds = time.monotonic() - started
+                    print(f"Warm-up decode took {self.warm_up_seconds:.1f}s")
+                except Exception as e:
+                    # The models did load, a failed warm-up only means a slower first request
+                    print(f"Warning: warm-up failed: {e}")
+
+            self._trainer = trainer
+            self.state = "ready"
+            self._ready.set()
+        except Exception as e:
+            traceback.print_exc()
+            self.error = str(e)
+            self.state = "failed"
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def get(self) -> PronunciationTrainer:
+        """The loaded trainer, or ModelNotReadyError while loading."""
+        if not self._ready.is_set():
+            raise ModelNotReadyError(self.state)
+        return self._trainer
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "error": self.error,
+            "load_seconds": self.load_seconds,
+            "warm_up_seconds": self.warm_up_seconds,
+        }
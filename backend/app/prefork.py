@@ -0,0 +1,127 @@
+import gc
+import os
+import signal
+import socket
+import time
+import traceback
+from typing import Callable, Dict, Optional, Tuple
+
+import torch
+import uvicorn
+
+# Exit code of a worker whose app failed to start (uvicorn's own code for a failed lifespan startup)
+_STARTUP_FAILURE = 3
+# A worker dying sooner than this after being spawned is restarted with backoff, and after that many
+# quick deaths in a row the server gives up instead of forking forever
+_MIN_UPTIME_SECONDS = 10
+_MAX_QUICK_RESTARTS = 5
+
+
+def serve_prefork(app, host: str, port: int, workers: int, preload: Optional[Callable[[], None]] = None,
+                  torch_threads: Optional[int] = None, log_level: str = "info") -> None:
+    """
+    Run `workers` uvicorn servers in forked child processes accepting on one shared listening socket.
+
+    `preload` runs in the parent before forking, so whatever it loads (the Whisper weights, the phoneme
+    lexicon) is shared copy-on-write by all workers instead of being loaded once per worker. Each worker
+    uses `torch_threads` intra-op threads (default: the CPUs split evenly between the workers).
+    Workers that die are restarted; SIGTERM/SIGINT are forwarded to all of them. A worker whose app fails
+    to start, or workers that keep dying right after being spawned, stop the server with SystemExit(1).
+    """
+    threads_per_worker = torch_threads or max(1, (os.cpu_count() or 1) // workers)
+
+    if preload is not None:
+        # GNU OpenMP's thread pool does not survive fork(): a child would hang on its first parallel op.
+        # Keep the parent single-threaded so every worker starts its own pool.
+        torch.set_num_threads(1)
+        started = time.monotonic()
+        preload()
+        print(f"Preloaded models in {time.monotonic() - started:.1f}s, forking {workers} workers")
+        # Move everything loaded so far out of the collector's generations, so GC passes in the workers
+        # do not write to (and un-share) the parent's pages
+        gc.collect()
+        gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    # pid -> (worker index, spawn time)
+    children: Dict[int, Tuple[int, float]] = {}
+    stopping = False
+    failed = False
+    quick_deaths = 0
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                exit_code = 0 if _run_worker(app, sock, threads_per_worker, log_level) else _STARTUP_FAILURE
+            except SystemExit as e:
+                # Some uvicorn versions exit by themselves when the startup fails
+                exit_code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(exit_code)
+        children[pid] = (index, time.monotonic())
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(workers):
+        spawn(index)
+    print(f"Serving on {host}:{port} with {workers} workers x {threads_per_worker} torch threads")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        child = children.pop(pid, None)
+        if child is None or stopping:
+            continue
+        index, spawned_at = child
+        exit_code = os.waitstatus_to_exitcode(status)
+        if exit_code == _STARTUP_FAILURE:
+            # Would fail the same way again (bad configuration, database unreachable, ...)
+            print(f"Worker {index} (pid {pid}) failed to start, stopping the server")
+            failed = True
+            stop(None, None)
+            continue
+        quick_deaths = quick_deaths + 1 if time.monotonic() - spawned_at < _MIN_UPTIME_SECONDS else 0
+        if quick_deaths > _MAX_QUICK_RESTARTS:
+            print(f"Workers keep dying right after starting ({quick_deaths} in a row), stopping the server")
+            failed = True
+            stop(None, None)
+            continue
+        delay = 2 ** (quick_deaths - 1) if quick_deaths else 1
+        print(f"Worker {index} (pid {pid}) exited with code {exit_code}, restarting it in {delay}s")
+        time.sleep(delay)
+        spawn(index)
+    sock.close()
+    if failed:
+        raise SystemExit(1)
+
+
+def _run_worker(app, sock: socket.socket, torch_threads: int, log_level: str) -> bool:
+    """Serve until shut down; False when the app never started (e.g. its startup event raised)."""
+    # uvicorn installs its own handlers for a graceful shutdown
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    torch.set_num_threads(torch_threads)
+    server = uvicorn.Server(uvicorn.Config(app, log_level=log_level))
+    server.run(sockets=[sock])
+    return server.started
@@ -1,30 +1,48 @@
 import torch
 import numpy as np
 import time
-from string import punctuation
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
 
-from models.whisper_asr import WhisperASRModel
+from app.compiled_target import CompiledTarget, compile_target, remove_punctuation
+from models.interfaces import ITextToPhonemModel, TranscriptionResult
+from models.whisper_asr import get_asr_model
+from models.asr_batching import BatchingASRScheduler
 from models.phoneme_converters import get_phonem_converter
 from utils.word_matching import get_best_mapped_words
-from utils.word_metrics import edit_distance_python
-from utils.audio_processing import preprocess_audio
+from utils.word_metrics import edit_distance_to_pattern
+from utils.audio_processing import preprocess_audio, trim_silence
 
 
 class PronunciationTrainer:
-    def __init__(self):
-        self.asr_model = WhisperASRModel()
-        self.ipa_converter = get_phonem_converter("en")
+    def __init__(self, asr_backend: str = "transformers", asr_max_batch_size: int = 1, asr_max_wait_ms: float = 20.0,
+                 trim_silence: bool = True, ipa_converter: ITextToPhonemModel = None):
+        self.asr_model = get_asr_model(asr_backend)
+        self.trim_silence = trim_silence
+        # Micro-batch decodes across concurrent callers when batching is enabled
+        self.asr_scheduler = None
+        if asr_max_batch_size > 1:
+            self.asr_scheduler = BatchingASRScheduler(
+                self.asr_model, max_batch_size=asr_max_batch_size, max_wait_ms=asr_max_wait_ms)
+        # A converter can be shared with other users of the phoneme cache
+        self.ipa_converter = ipa_converter if ipa_converter is not None else get_phonem_converter("en")
         self.sampling_rate = 16000
         self.categories_thresholds = np.array([80, 60, 59])
+        # Everything besides the audio and target text that changes a result
+        self.model_version = f"{self.asr_model.model_version}|trim_silence={trim_silence}"
 
-    def process_audio_for_given_text(self, recorded_audio: torch.Tensor, target_text: str) -> Dict:
+    def compile_target(self, target_text: str) -> CompiledTarget:
+        """Target-side analysis (tokens, IPA, phoneme patterns), reusable across recordings of the same text."""
+        return compile_target(target_text, self.ipa_converter)
+
+    def process_audio_for_given_text(self, recorded_audio: torch.Tensor, target_text: str,
+                                     compiled_target: CompiledTarget = None) -> Dict:
         """
         Main method to process audio and compare with target text for pronunciation scoring.
         
         Args:
             recorded_audio: Audio tensor
             target_text: Target text to compare against
+            compiled_target: Precompiled `target_text`, compiled here when not provided
             
         Returns:
             Dictionary containing pronunciation analysis results
@@ -32,13 +50,34 @@ class PronunciationTrainer:
         # Get transcript from audio
         recording_transcript, recording_ipa, word_locations = self._get_audio_transcript(recorded_audio)
         
+        return self.score_transcript(recording_transcript, target_text, recording_ipa, compiled_target)
+
+    def score_transcript(self, recording_transcript: str, target_text: str, recording_ipa: str = None,
+                         compiled_target: CompiledTarget = None) -> Dict:
+        """
+        Score an already transcribed recording against the target text.
+        
+        Args:
+            recording_transcript: Transcript of the recording
+            target_text: Target text to compare against
+            recording_ipa: IPA of the transcript, converted here when not provided
+            compiled_target: Precompiled `target_text`, compiled here when not provided
+            
+        Returns:
+            Dictionary containing pronunciation analysis results
+        """
+        if recording_ipa is None:
+            recording_ipa = self.ipa_converter.convertToPhonem(recording_transcript)
+        if compiled_target is None:
+            compiled_target = self.compile_target(target_text)
+        
         # Match transcribed words with target words
         real_and_transcribed_words, real_and_transcribed_words_ipa, mapped_words_indices = self._match_sample_and_recorded_words(
-            target_text, recording_transcript)
+            compiled_target, recording_transcript)
         
         # Calculate pronunciation accuracy
-        pronunciation_accuracy, current_words_pronunciation_accuracy = self._get_pronunciation_accuracy(
-            real_and_transcribed_words_ipa)
+        pronunciation_accuracy, current_words_pronunciation_accuracy, current_words_phoneme_mismatches = self._get_pronunciation_accuracy(
+            compiled_target, real_and_transcribed_words_ipa)
         
         # Categorize pronunciation quality
         pronunciation_categories = self._get_words_pronunciation_category(
@@ -49,43 +88,111 @@ class PronunciationTrainer:
             'real_and_transcribed_words': real_and_transcribed_words,
             'recording_ipa': recording_ipa,
             'real_and_transcribed_words_ipa': real_and_transcribed_words_ipa,
+            'mapped_words_indices': mapped_words_indices,
             'pronunciation_accuracy': pronunciation_accuracy,
+            'words_pronunciation_accuracy': current_words_pronunciation_accuracy,
+            'words_phoneme_edit_distance': current_words_phoneme_mismatches,
             'pronunciation_categories': pronunciation_categories,
             'target_text': target_text
         }
         
         return result
 
+    def process_batch(self, recorded_audios: Sequence[torch.Tensor], target_texts: Sequence[str],
+                      compiled_targets: Sequence[CompiledTarget] = None,
+                      batch_size: int = 8) -> Iterator[Tuple[int, Union[Dict, Exception]]]:
+        """
+        Score many recordings, decoding them `batch_size` clips per ASR call.
+        
+        Args:
+            recorded_audios: Audio tensors
+            target_texts: Target text of each recording
+            compiled_targets: Optional precompiled targets, one per recording (None entries are compiled here)
+            batch_size: Number of clips decoded together
+            
+        Yields:
+            (index, result) as soon as the batch containing the recording is scored. When scoring a
+            recording fails, the exception is yielded in place of its result and the batch carries on.
+        """
+        if compiled_targets is None:
+            compiled_targets = [None] * len(recorded_audios)
+        for batch_start in range(0, len(recorded_audios), batch_size):
+            # Clips that cannot be prepared (e.g. empty) fail on their own, the rest is decoded together
+            prepared = {}
+            for idx in range(batch_start, min(batch_start + batch_size, len(recorded_audios))):
+                try:
+                    prepared[idx] = self._prepare_audio(recorded_audios[idx])
+                except Exception as e:
+                    yield idx, e
+            if not prepared:
+                continue
+
+            speech_audios = [speech_audio for _, speech_audio, _ in prepared.values()]
+            try:
+                transcriptions = self.asr_model.transcribe_batch(speech_audios)
+            except Exception:
+                # One clip can break the whole batched decode, give every clip its own result or error
+                transcriptions = []
+                for speech_audio in speech_audios:
+                    try:
+                        transcriptions.append(self.asr_model.transcribe(speech_audio))
+                    except Exception as e:
+                        transcriptions.append(e)
+
+            for (idx, (recorded_audio, _, offset_in_samples)), transcription in zip(prepared.items(), transcriptions):
+                try:
+                    if isinstance(transcription, Exception):
+                        raise transcription
+                    recording_transcript, _ = self._get_transcript_and_words_locations(
+                        transcription, recorded_audio.shape[1], offset_in_samples)
+                    yield idx, self.score_transcript(
+                        recording_transcript, target_texts[idx], compiled_target=compiled_targets[idx])
+                except Exception as e:
+                    yield idx, e
+
+    def transcribe(self, recorded_audio: torch.Tensor) -> TranscriptionResult:
+        """Run ASR on already preprocessed audio, through the batching scheduler when enabled."""
+        if self.asr_scheduler is not None:
+            return self.asr_scheduler.submit(recorded_audio)
+        return self.asr_model.transcribe(recorded_audio)
+
     def _get_audio_transcript(self, recorded_audio: torch.Tensor) -> Tuple[str, str, List]:
         """Process audio and get transcript with word locations."""
-        recorded_audio = preprocess_audio(recorded_audio)
-        self.asr_model.processAudio(recorded_audio)
+        recorded_audio, speech_audio, offset_in_samples = self._prepare_audio(recorded_audio)
+        transcription = self.transcribe(speech_audio)
         
         recording_transcript, word_locations = self._get_transcript_and_words_locations(
-            recorded_audio.shape[1])
+            transcription, recorded_audio.shape[1], offset_in_samples)
         recording_ipa = self.ipa_converter.convertToPhonem(recording_transcript)
         
         return recording_transcript, recording_ipa, word_locations
 
-    def _get_transcript_and_words_locations(self, audio_length_in_samples: int) -> Tuple[str, List]:
-        """Get transcript and word locations from ASR model."""
-        audio_transcript = self.asr_model.getTranscript()
-        word_locations_in_samples = self.asr_model.getWordLocations()
-        
+    def _prepare_audio(self, recorded_audio: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor, int]:
+        """Preprocessed audio, the part of it to decode and that part's offset in samples."""
+        recorded_audio = preprocess_audio(recorded_audio)
+        # Only decode the voiced part, word locations are shifted back by the offset
+        speech_audio, offset_in_samples = recorded_audio, 0
+        if self.trim_silence:
+            speech_audio, offset_in_samples = trim_silence(recorded_audio, self.sampling_rate)
+        return recorded_audio, speech_audio, offset_in_samples
+
+    def _get_transcript_and_words_locations(self, transcription: TranscriptionResult,
+                                            audio_length_in_samples: int, offset_in_samples: int = 0) -> Tuple[str, List]:
+        """Get transcript and word locations (in original-sample coordinates) from an ASR result."""
         # Apply fade duration to word locations
         fade_duration_in_samples = 0.05 * self.sampling_rate
         word_locations_in_samples = [
-            (int(np.maximum(0, word['start_ts'] - fade_duration_in_samples)), 
-             int(np.minimum(audio_length_in_samples - 1, word['end_ts'] + fade_duration_in_samples))) 
-            for word in word_locations_in_samples
+            (int(np.maximum(0, offset_in_samples + word.start_ts - fade_duration_in_samples)), 
+             int(np.minimum(audio_length_in_samples - 1, offset_in_samples + word.end_ts + fade_duration_in_samples))) 
+            for word in transcription.word_locations
         ]
         
-        return audio_transcript, word_locations_in_samples
+        return transcription.transcript, word_locations_in_samples
 
-    def _match_sample_and_recorded_words(self, real_text: str, recorded_transcript: str) -> Tuple[List, List, List]:
+    def _match_sample_and_recorded_words(self, compiled_target: CompiledTarget, recorded_transcript: str) -> Tuple[List, List, List]:
         """Match transcribed words with target words."""
         words_estimated = recorded_transcript.split()
-        words_real = real_text.split()
+        words_real = list(compiled_target.words)
         
         mapped_words, mapped_words_indices = get_best_mapped_words(words_estimated, words_real)
         
@@ -98,24 +205,27 @@ class PronunciationTrainer:
             
             real_and_transcribed_words.append((words_real[word_idx], mapped_words[word_idx]))
             real_and_transcribed_words_ipa.append((
-                self.ipa_converter.convertToPhonem(words_real[word_idx]),
+                compiled_target.words_ipa[word_idx],
                 self.ipa_converter.convertToPhonem(mapped_words[word_idx])
             ))
         
         return real_and_transcribed_words, real_and_transcribed_words_ipa, mapped_words_indices
 
-    def _get_pronunciation_accuracy(self, real_and_transcribed_words_ipa: List) -> Tuple[float, List]:
+    def _get_pronunciation_accuracy(self, compiled_target: CompiledTarget,
+                                    real_and_transcribed_words_ipa: List) -> Tuple[float, List, List]:
         """Calculate pronunciation accuracy based on phoneme differences."""
         total_mismatches = 0.
         number_of_phonemes = 0.
         current_words_pronunciation_accuracy = []
+        current_words_phoneme_mismatches = []
         
-        for pair in real_and_transcribed_words_ipa:
-            real_without_punctuation = self._remove_punctuation(pair[0]).lower()
-            number_of_word_mismatches = edit_distance_python(
-                real_without_punctuation, self._remove_punctuation(pair[1]).lower())
+        for word_idx, pair in enumerate(real_and_transcribed_words_ipa):
+            real_without_punctuation = compiled_target.words_phonemes[word_idx]
+            number_of_word_mismatches = edit_distance_to_pattern(
+                compiled_target.words_patterns[word_idx], self._remove_punctuation(pair[1]).lower())
             
             total_mismatches += number_of_word_mismatches
+            current_words_phoneme_mismatches.append(number_of_word_mismatches)
             number_of_phonemes_in_word = len(real_without_punctuation)
             number_of_phonemes += number_of_phonemes_in_word
             
@@ -126,11 +236,11 @@ class PronunciationTrainer:
         percentage_of_correct_pronunciations = (
             number_of_phonemes - total_mismatches) / number_of_phonemes * 100
         
-        return np.round(percentage_of_correct_pronunciations), current_words_pronunciation_accuracy
+        return np.round(percentage_of_correct_pronunciations), current_words_pronunciation_accuracy, current_words_phoneme_mismatches
 
     def _remove_punctuation(self, word: str) -> str:
         """Remove punctuation from word."""
-        return ''.join([char for char in word if char not in punctuation])
+        return remove_punctuation(word)
 
     def _get_words_pronunciation_category(self, accuracies: List) -> List:
         """Categorize pronunciation accuracy into quality levels."""
@@ -0,0 +1,125 @@
+import numpy as np
+import torch
+from typing import Dict, List
+
+from app.pronunciation_trainer import PronunciationTrainer
+from utils.audio_processing import preprocess_audio
+
+
+class StreamingPronunciationSession:
+    """
+    Incremental pronunciation analysis for audio arriving in PCM16 chunks (16 kHz, mono).
+
+    Every `step_seconds` of new audio, the not yet finalized tail (at most `window_seconds`) is decoded.
+    Words ending more than `stability_seconds` before the end of the buffer are finalized: they are never
+    decoded again and the window slides past them. Target words are reported as soon as the alignment
+    against the finalized transcript settles, so only the last few words remain when the child stops.
+    """
+
+    def __init__(self, trainer: PronunciationTrainer, target_text: str, window_seconds: float = 8.0,
+                 step_seconds: float = 0.5, stability_seconds: float = 0.6):
+        self.trainer = trainer
+        self.target_text = target_text
+        self.compiled_target = trainer.compile_target(target_text)
+        self.sampling_rate = trainer.sampling_rate
+        self.window_in_samples = int(window_seconds * self.sampling_rate)
+        self.step_in_samples = int(step_seconds * self.sampling_rate)
+        self.stability_in_samples = int(stability_seconds * self.sampling_rate)
+
+        self._pcm = bytearray()
+        self._committed_offset = 0
+        self._committed_words = []
+        self._samples_since_decode = 0
+        self._number_of_emitted_words = 0
+
+    @property
+    def number_of_samples(self) -> int:
+        return len(self._pcm) // 2
+
+    def add_chunk(self, pcm16: bytes) -> List[Dict]:
+        """Append little-endian PCM16 samples and return the word events that became final."""
+        self._pcm.extend(pcm16)
+        self._samples_since_decode += len(pcm16) // 2
+        if self._samples_since_decode < self.step_in_samples:
+            return []
+        self._samples_since_decode = 0
+        if self._decode_pending_audio(final=False):
+            return self._get_settled_word_events(final=False)
+        return []
+
+    def finish(self) -> List[Dict]:
+        """Decode the remaining tail and return the last word events followed by the final result."""
+        self._decode_pending_audio(final=True)
+        events = self._get_settled_word_events(final=True)
+
+        result = self.trainer.score_transcript(
+            ' '.join(self._committed_words), self.target_text, compiled_target=self.compiled_target)
+        pronunciation_score = max(0.0, float(result['pronunciation_accuracy']))
+        events.append({
+            'type': 'final',
+            'pronunciation_score': pronunciation_score,
+            'target_text': result['target_text'],
+            'transcribed_text': result['recording_transcript'],
+            'pronunciation_categories': [int(category) for category in result['pronunciation_categories']],
+        })
+        return events
+
+    def _decode_pending_audio(self, final: bool) -> bool:
+        """Decode the unfinalized window and commit stable words. Returns True when words were committed."""
+        end = self.number_of_samples
+        # Nothing was recognised for a whole window (silence, noise), slide past it
+        if end - self._committed_offset > self.window_in_samples:
+            self._committed_offset = end - self.window_in_samples
+
+        # count drops a trailing odd byte when a chunk was split mid-sample
+        window = np.frombuffer(self._pcm, dtype='<i2', count=end)[self._committed_offset:end]
+        if not np.any(window):
+            return False
+        recorded_audio = preprocess_audio(torch.from_numpy(window.astype(np.float32)).unsqueeze(0))
+        transcription = self.trainer.transcribe(recorded_audio)
+
+        stable_until = len(window) if final else len(window) - self.stability_in_samples
+        committed_until = None
+        for word_location in transcription.word_locations:
+            if word_location.end_ts is None or word_location.end_ts > stable_until:
+                break
+            self._committed_words.extend(word_location.word.split())
+            committed_until = word_location.end_ts
+
+        if final:
+            self._committed_offset = end
+        elif committed_until is not None:
+            self._committed_offset += int(committed_until)
+        return committed_until is not None
+
+    def _get_settled_word_events(self, final: bool) -> List[Dict]:
+        """Per-word results for target words whose alignment can no longer change."""
+        if not self._committed_words and not final:
+            return []
+        result = self.trainer.score_transcript(
+            ' '.join(self._committed_words), self.target_text, compiled_target=self.compiled_target)
+
+        if final:
+            settled_until = len(result['real_and_transcribed_words'])
+        else:
+            # Target words up to the last one matched by a finalized word are settled
+            matched = [idx for idx, estimated_idx in enumerate(result['mapped_words_indices']) if estimated_idx != -1]
+            settled_until = matched[-1] + 1 if matched else 0
+
+        events = []
+        for word_idx in range(self._number_of_emitted_words, settled_until):
+            target_word, transcribed_word = result['real_and_transcribed_words'][word_idx]
+            target_phonemes, transcribed_phonemes = result['real_and_transcribed_words_ipa'][word_idx]
+            events.append({
+                'type': 'word',
+                'index': word_idx,
+                'target_word': target_word,
+                'transcribed_word': transcribed_word,
+                'target_phonemes': target_phonemes,
+                'transcribed_phonemes': transcribed_phonemes,
+                'phoneme_edit_distance': int(result['words_phoneme_edit_distance'][word_idx]),
+                'accuracy': float(result['words_pronunciation_accuracy'][word_idx]),
+                'category': int(result['pronunciation_categories'][word_idx]),
+            })
+        self._number_of_emitted_words = max(self._number_of_emitted_words, settled_until)
+        return events
@@ -0,0 +1,109 @@
+"""
+Compare ASR backends on latency, peak RSS and transcript agreement.
+
+Each backend runs in its own subprocess so RSS numbers are not polluted by the other model.
+
+Usage (from the backend directory):
+    python -m benchmarks.asr_backends recording1.wav recording2.mp3 --repeats 5
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+BACKENDS = ["transformers", "ctranslate2"]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(backend: str, paths: list, repeats: int):
+    """Load one backend, decode every clip `repeats` times and print a JSON report."""
+    from models.whisper_asr import get_asr_model
+    from utils.audio_processing import load_audio_file, preprocess_audio
+
+    clips = [preprocess_audio(load_audio_file(path)) for path in paths]
+    rss_before_model = _peak_rss_mb()
+
+    started = time.perf_counter()
+    model = get_asr_model(backend)
+    load_seconds = time.perf_counter() - started
+
+    # Warm-up so lazy initialisation is not counted as latency
+    model.transcribe(clips[0])
+
+    latencies = []
+    transcripts = []
+    for clip in clips:
+        clip_latencies = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            result = model.transcribe(clip)
+            clip_latencies.append(time.perf_counter() - started)
+        latencies.append(statistics.median(clip_latencies))
+        transcripts.append(result.transcript)
+
+    print(json.dumps({
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "median_latency_seconds": statistics.median(latencies),
+        "total_latency_seconds": sum(latencies),
+        "model_rss_mb": _peak_rss_mb() - rss_before_model,
+        "peak_rss_mb": _peak_rss_mb(),
+        "transcripts": transcripts,
+    }))
+
+
+def word_agreement(reference: str, hypothesis: str) -> float:
+    """1 - word error rate of `hypothesis` against `reference`."""
+    from utils.word_metrics import edit_distance_python
+
+    reference_words = reference.lower().split()
+    hypothesis_words = hypothesis.lower().split()
+    if not reference_words:
+        return 1.0 if not hypothesis_words else 0.0
+    errors = edit_distance_python(reference_words, hypothesis_words)
+    return max(0.0, 1.0 - errors / len(reference_words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Audio files with speech to decode")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.paths, args.repeats)
+        return
+
+    reports = {}
+    for backend in args.backends:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.asr_backends", "--worker", backend,
+             "--repeats", str(args.repeats), *args.paths],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        reports[backend] = json.loads(output.strip().splitlines()[-1])
+
+    reference = reports.get("transformers")
+    print(f"{'backend':<14}{'load s':>9}{'median s':>10}{'total s':>9}{'model MB':>10}{'peak MB':>9}{'agreement':>11}")
+    for backend, report in reports.items():
+        agreement = "-"
+        if reference is not None and backend != "transformers":
+            scores = [word_agreement(ref, hyp) for ref, hyp in zip(reference["transcripts"], report["transcripts"])]
+            agreement = f"{statistics.mean(scores):.1%}"
+        print(f"{backend:<14}{report['load_seconds']:>9.2f}{report['median_latency_seconds']:>10.3f}"
+              f"{report['total_latency_seconds']:>9.2f}{report['model_rss_mb']:>10.0f}"
+              f"{report['peak_rss_mb']:>9.0f}{agreement:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Per-request cost of decoding an upload: temp file + audioread versus the in-memory decode path.
+
+Reports median latency and peak traced allocations for a synthetic 5 s stereo 48 kHz clip
+(WAV, and FLAC/OGG when soundfile is installed) plus any files given on the command line.
+
+Usage (from the backend directory):
+    python -m benchmarks.audio_decode [recording.m4a ...] --repeats 20
+"""
+import argparse
+import io
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+import wave
+
+import audioread
+import numpy as np
+
+from utils.audio_processing import audioread_load, decode_audio_bytes, soundfile
+
+
+def synthetic_clips(seconds: float = 5.0, sample_rate: int = 48000) -> dict:
+    samples = (np.random.default_rng(0).standard_normal((int(seconds * sample_rate), 2)) * 3000).astype('<i2')
+    clips = {}
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(2)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.tobytes())
+    clips['synthetic.wav'] = buffer.getvalue()
+
+    if soundfile is not None:
+        for extension, audio_format in (('flac', 'FLAC'), ('ogg', 'OGG')):
+            buffer = io.BytesIO()
+            soundfile.write(buffer, samples / 32768.0, sample_rate, format=audio_format)
+            clips[f'synthetic.{extension}'] = buffer.getvalue()
+    return clips
+
+
+def decode_via_temp_file(content: bytes, file_extension: str):
+    """What /analyze used to do: write the upload to disk and let audioread reopen it."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
+        temp_file.write(content)
+        temp_file_path = temp_file.name
+    try:
+        return audioread_load(temp_file_path)
+    finally:
+        os.unlink(temp_file_path)
+
+
+def measure(decode, content: bytes, file_extension: str, repeats: int):
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        decode(content, file_extension)
+        latencies.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    decode(content, file_extension)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(latencies), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', help='Extra audio files to include')
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    clips = synthetic_clips()
+    for path in args.paths:
+        with open(path, 'rb') as audio_file:
+            clips[os.path.basename(path)] = audio_file.read()
+
+    print(f"{'clip':<22}{'temp file ms':>14}{'in-memory ms':>14}{'speed-up':>10}{'temp file MB':>14}{'in-memory MB':>14}")
+    for name, content in clips.items():
+        file_extension = os.path.splitext(name)[1].lower()
+        try:
+            baseline_latency, baseline_peak = measure(decode_via_temp_file, content, file_extension, args.repeats)
+        except audioread.NoBackendError:
+            print(f"{name:<22}  skipped, no audioread backend (install ffmpeg) for the temp file baseline")
+            continue
+        latency, peak = measure(decode_audio_bytes, content, file_extension, args.repeats)
+        print(f"{name:<22}{baseline_latency * 1000:>14.2f}{latency * 1000:>14.2f}{baseline_latency / latency:>9.1f}x"
+              f"{baseline_peak / 2 ** 20:>14.2f}{peak / 2 ** 20:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
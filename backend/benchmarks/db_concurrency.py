@@ -0,0 +1,103 @@
+"""
+Concurrent dashboard reads against a PostgREST stand-in, blocking client versus the async repository.
+
+"blocking" is what the routes did before: a synchronous HTTP call (as the sync Supabase client makes)
+inside an `async def` handler, which holds the event loop for the whole round-trip, so concurrent
+handlers run one after another. "async repository" awaits `db.repository.Repository`, whose pooled
+client keeps up to SUPABASE_MAX_CONNECTIONS requests in flight. Latencies are measured from the moment
+all reads arrive, like requests queued at the server. The stand-in (benchmarks.postgrest_stub) runs in
+its own process and answers after `--delay-ms`.
+
+Usage (from the backend directory):
+    python -m benchmarks.db_concurrency --reads 200 --delay-ms 20
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from db.postgrest import AsyncPostgrestClient
+from db.repository import Repository
+
+
+def start_stub(delay_ms: float):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen([sys.executable, "-m", "benchmarks.postgrest_stub",
+                                "--port", str(port), "--delay-ms", str(delay_ms)], stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.get(f"{base_url}/_stub/stats")
+            break
+        except httpx.TransportError:
+            time.sleep(0.1)
+    httpx.post(f"{base_url}/assignments", json=[
+        {"detail": {"title": f"Letter {i}"}, "type": 1, "assigned_to": "hsh_108"} for i in range(20)])
+    return process, base_url
+
+
+async def run_blocking(base_url: str, reads: int):
+    client = httpx.Client(base_url=base_url)
+    started = time.perf_counter()
+
+    async def handler():
+        client.get("/assignments", params={"select": "*", "assigned_to": "eq.hsh_108"}).json()
+        return time.perf_counter() - started
+
+    latencies = await asyncio.gather(*[handler() for _ in range(reads)])
+    client.close()
+    return time.perf_counter() - started, latencies
+
+
+async def run_async(base_url: str, reads: int, max_connections: int):
+    repository = Repository(AsyncPostgrestClient(base_url, max_connections=max_connections))
+    started = time.perf_counter()
+
+    async def handler():
+        await repository.list_assignments(50, assigned_to="hsh_108")
+        return time.perf_counter() - started
+
+    latencies = await asyncio.gather(*[handler() for _ in range(reads)])
+    total = time.perf_counter() - started
+    await repository.aclose()
+    return total, latencies
+
+
+def summary(name: str, total: float, latencies: list, connections: int) -> str:
+    latencies = sorted(latencies)
+    return (f"{name:<18}{total:>9.2f}{statistics.median(latencies) * 1000:>10.1f}"
+            f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>10.1f}{connections:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--delay-ms", type=float, default=20)
+    parser.add_argument("--max-connections", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'client':<18}{'total s':>9}{'p50 ms':>10}{'p95 ms':>10}{'connections':>13}")
+    for name in ("blocking", "async repository"):
+        process, base_url = start_stub(args.delay_ms)
+        try:
+            if name == "blocking":
+                total, latencies = asyncio.run(run_blocking(base_url, args.reads))
+            else:
+                total, latencies = asyncio.run(run_async(base_url, args.reads, args.max_connections))
+            # Minus the connections made while starting and seeding the stand-in
+            connections = httpx.get(f"{base_url}/_stub/stats").json()["connections"] - 3
+            print(summary(name, total, latencies, connections))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
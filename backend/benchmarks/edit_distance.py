@@ -0,0 +1,106 @@
+"""
+Microbenchmarks for the Levenshtein engine against the NumPy-matrix reference implementation.
+
+Every case checks that both implementations return identical distances before timing them.
+The bit-parallel engine is always measured; the compiled backend (rapidfuzz) only when installed.
+
+Usage (from the backend directory):
+    python -m benchmarks.edit_distance --repeats 5
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from utils import word_metrics
+from utils.word_metrics import edit_distance_python
+
+IPA_SYMBOLS = list("abdefhijklmnoprstuvwzæðŋɑɔəɛɪʃʊʌʒθˈ")
+LETTERS = list("abcdefghijklmnopqrstuvwxyz")
+
+
+def random_word(rng: random.Random, alphabet: list, min_length: int = 2, max_length: int = 10) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(min_length, max_length)))
+
+
+def mutate(rng: random.Random, word: str, alphabet: list, rate: float = 0.2) -> str:
+    """Typical mispronunciation: a few substitutions, insertions and deletions."""
+    result = []
+    for symbol in word:
+        roll = rng.random()
+        if roll < rate / 3:
+            continue
+        if roll < 2 * rate / 3:
+            result.append(rng.choice(alphabet))
+            continue
+        result.append(symbol)
+        if roll < rate:
+            result.append(rng.choice(alphabet))
+    return "".join(result)
+
+
+def build_cases(rng: random.Random) -> dict:
+    words = [random_word(rng, LETTERS) for _ in range(2000)]
+    phonemes = [random_word(rng, IPA_SYMBOLS) for _ in range(2000)]
+    passage_1000 = [random_word(rng, LETTERS) for _ in range(1000)]
+    passage_ipa = " ".join(random_word(rng, IPA_SYMBOLS) for _ in range(300))
+    return {
+        "word pairs (2000)": [(word, mutate(rng, word, LETTERS)) for word in words],
+        "phoneme pairs (2000)": [(word, mutate(rng, word, IPA_SYMBOLS)) for word in phonemes],
+        "IPA passage, ~2k symbols": [(passage_ipa, mutate(rng, passage_ipa, IPA_SYMBOLS))],
+        "1000-word passage as word lists": [(passage_1000, [mutate(rng, word, LETTERS) for word in passage_1000])],
+    }
+
+
+def time_pairs(distance, pairs: list, repeats: int):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        results = [distance(seq1, seq2) for seq1, seq2 in pairs]
+        best = min(best, time.perf_counter() - started)
+    return best, results
+
+
+def bit_parallel_distance(seq1, seq2) -> int:
+    if len(seq1) > len(seq2):
+        seq1, seq2 = seq2, seq1
+    return word_metrics._myers_distance(word_metrics._pattern_bitmasks(seq1), len(seq1), seq2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    engines = {"bit-parallel": bit_parallel_distance}
+    if word_metrics._rapidfuzz_levenshtein is not None:
+        engines["compiled"] = word_metrics._rapidfuzz_levenshtein.distance
+
+    print(f"{'case':<34}{'reference s':>13}" + "".join(f"{name + ' s':>16}{'speed-up':>10}" for name in engines))
+    for name, pairs in build_cases(rng).items():
+        reference_time, reference_results = time_pairs(edit_distance_python, pairs, 1)
+        line = f"{name:<34}{reference_time:>13.4f}"
+        for engine in engines.values():
+            engine_time, engine_results = time_pairs(engine, pairs, args.repeats)
+            assert [int(result) for result in reference_results] == engine_results, f"mismatch in {name}"
+            line += f"{engine_time:>16.4f}{reference_time / engine_time:>9.0f}x"
+        print(line)
+
+    # Matrix API on a read-aloud sized problem
+    transcript = [random_word(rng, LETTERS) for _ in range(300)]
+    target = [mutate(rng, word, LETTERS) for word in transcript]
+    started = time.perf_counter()
+    reference_matrix = np.array([[edit_distance_python(seq1, seq2) for seq2 in target] for seq1 in transcript])
+    reference_time = time.perf_counter() - started
+    started = time.perf_counter()
+    matrix = word_metrics.edit_distance_matrix(transcript, target)
+    matrix_time = time.perf_counter() - started
+    assert np.array_equal(reference_matrix, matrix)
+    print(f"{'300x300 word matrix':<34}{reference_time:>13.4f}{matrix_time:>16.4f}{reference_time / matrix_time:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+AI feedback calls against a local stub of the chat completions API.
+
+Compares the former blocking client (one `requests.post` per call, each opening its own connection)
+with the pooled async `AIFeedbackGenerator`, then checks that a slow API falls back to the template
+feedback as soon as the latency budget is spent. The stub answers after `--delay-ms` and counts the
+TCP connections it accepts.
+
+Usage (from the backend directory):
+    python -m benchmarks.feedback_latency --calls 100 --concurrency 10 --delay-ms 50
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from utils.ai_feedback import AIFeedbackGenerator, _generate_fallback_feedback
+
+FEEDBACK_ARGS = dict(
+    pronunciation_score=75.0,
+    target_text="The cat sat on the mat",
+    transcribed_text="The cat sad on the mat",
+    word_comparisons=[{"target_word": "sat", "transcribed_word": "sad",
+                       "target_phonemes": "sæt", "transcribed_phonemes": "sæd"}],
+    overall_quality="Good",
+    is_letter_correct_all_words="111 111 110 11 111 111",
+)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay_seconds: float):
+        self.delay_seconds = delay_seconds
+        self.connections = 0
+        self._lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), StubHandler)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes, avoid Nagle stalls on kept-alive connections
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.delay_seconds)
+        body = json.dumps({"choices": [{"message": {"content": "做得好!\n\nWell done!"}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def blocking_call(base_url: str) -> float:
+    """What the generator did before: a fresh connection and a blocking request per call."""
+    started = time.perf_counter()
+    response = requests.post(f"{base_url}/chat/completions", headers={"Authorization": "Bearer stub"},
+                             data=json.dumps({"model": "GPT-4o", "messages": []}), timeout=8)
+    response.json()
+    return time.perf_counter() - started
+
+
+def run_blocking(base_url: str, calls: int, concurrency: int):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda _: blocking_call(base_url), range(calls)))
+    return time.perf_counter() - started, latencies
+
+
+async def run_pooled(generator: AIFeedbackGenerator, calls: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call():
+        async with semaphore:
+            started = time.perf_counter()
+            await generator.generate_feedback(**FEEDBACK_ARGS)
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    # The generator prints every prompt and response
+    with contextlib.redirect_stdout(io.StringIO()):
+        latencies = await asyncio.gather(*[call() for _ in range(calls)])
+    return time.perf_counter() - started, latencies
+
+
+async def check_budget(budget_ms: float) -> None:
+    server = start_stub(budget_ms / 1000 * 3)
+    generator = AIFeedbackGenerator(api_key="stub", base_url=server.base_url, latency_budget_ms=budget_ms)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        feedback = await generator.generate_feedback(**FEEDBACK_ARGS)
+    elapsed = time.perf_counter() - started
+    await generator.aclose()
+    server.shutdown()
+    fallback = feedback == _generate_fallback_feedback(FEEDBACK_ARGS["pronunciation_score"], "Good")
+    print(f"stub answering in {budget_ms * 3:.0f} ms, budget {budget_ms:.0f} ms: "
+          f"returned after {elapsed * 1000:.0f} ms, template fallback: {fallback}")
+
+
+def start_stub(delay_seconds: float) -> StubServer:
+    server = StubServer(delay_seconds)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def summary(name: str, total: float, latencies: list, connections: int) -> str:
+    return (f"{name:<22}{total:>9.2f}{statistics.mean(latencies) * 1000:>10.1f}"
+            f"{sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000:>10.1f}{connections:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--delay-ms", type=float, default=50)
+    parser.add_argument("--budget-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    print(f"{'client':<22}{'total s':>9}{'mean ms':>10}{'p95 ms':>10}{'connections':>13}")
+    server = start_stub(args.delay_ms / 1000)
+    total, latencies = run_blocking(server.base_url, args.calls, args.concurrency)
+    print(summary("blocking requests", total, latencies, server.connections))
+    server.shutdown()
+
+    server = start_stub(args.delay_ms / 1000)
+    generator = AIFeedbackGenerator(api_key="stub", base_url=server.base_url, latency_budget_ms=10_000)
+
+    async def pooled():
+        try:
+            return await run_pooled(generator, args.calls, args.concurrency)
+        finally:
+            await generator.aclose()
+
+    total, latencies = asyncio.run(pooled())
+    print(summary("pooled async", total, latencies, server.connections))
+    server.shutdown()
+
+    asyncio.run(check_budget(args.budget_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+A like storm on a few popular posts against a PostgREST stand-in, one RPC per tap versus the write-behind
+like buffer (db.like_buffer.LikeBuffer).
+
+Taps arrive `--concurrency` at a time, spread over `--posts` posts. Reports tap latency, the number of
+like RPCs that reached the database and whether the final counts add up. The stand-in
+(benchmarks.postgrest_stub) runs in its own process and answers after `--delay-ms`.
+
+Usage (from the backend directory):
+    python -m benchmarks.like_buffer --taps 2000 --posts 5 --delay-ms 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from benchmarks.db_concurrency import start_stub
+from db.like_buffer import LikeBuffer
+from db.postgrest import AsyncPostgrestClient
+from db.repository import Repository
+
+MODES = ["one rpc per tap", "write-behind"]
+
+
+async def run(mode: str, base_url: str, args) -> list:
+    repository = Repository(AsyncPostgrestClient(base_url))
+    buffer = None
+    if mode == "write-behind":
+        buffer = LikeBuffer(repository, flush_interval_seconds=args.flush_interval_ms / 1000,
+                            max_pending=args.max_events)
+        buffer.start()
+
+    async def tap(number: int) -> float:
+        started = time.perf_counter()
+        post_id = number % args.posts + 1
+        if buffer is not None:
+            await buffer.like("posts", post_id)
+        else:
+            await repository.increment_post_likes(post_id)
+        return time.perf_counter() - started
+
+    latencies = []
+    for start in range(0, args.taps, args.concurrency):
+        latencies += await asyncio.gather(*[tap(number) for number in range(start, min(start + args.concurrency, args.taps))])
+    if buffer is not None:
+        await buffer.stop()
+    await repository.aclose()
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--taps", type=int, default=2000)
+    parser.add_argument("--posts", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay-ms", type=float, default=20)
+    parser.add_argument("--flush-interval-ms", type=float, default=250)
+    parser.add_argument("--max-events", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'likes':<18}{'total s':>9}{'p50 ms':>9}{'p95 ms':>9}{'rpcs':>7}  counts")
+    for mode in MODES:
+        process, base_url = start_stub(args.delay_ms)
+        try:
+            httpx.post(f"{base_url}/posts", json=[{"author": "bench", "title": f"Post {i}", "likes": 0}
+                                                  for i in range(args.posts)])
+            requests_before = httpx.get(f"{base_url}/_stub/stats").json()["requests"]
+            started = time.perf_counter()
+            latencies = asyncio.run(run(mode, base_url, args))
+            total = time.perf_counter() - started
+            rpcs = httpx.get(f"{base_url}/_stub/stats").json()["requests"] - requests_before
+            likes = sum(post["likes"] for post in httpx.get(f"{base_url}/posts").json())
+            print(f"{mode:<18}{total:>9.2f}{statistics.median(latencies) * 1000:>9.1f}"
+                  f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>9.1f}{rpcs:>7}  "
+                  f"{'ok' if likes == args.taps else f'{likes} of {args.taps}'}")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
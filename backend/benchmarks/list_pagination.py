@@ -0,0 +1,98 @@
+"""
+Latency of a list route's database read on a large table: the old unbounded `select=*` against one
+keyset page (first page and a page near the end) as `db.repository.Repository` now reads them.
+
+Seeds `--rows` forum posts by one author (in bulk inserts of `--batch`) into the PostgREST server at
+SUPABASE_REST_URL, e.g. a local PostgREST over Postgres with the (created_at, id) indexes from the
+README, then times each read `--repeats` times. `--stub` runs the in-memory stand-in
+(benchmarks.postgrest_stub) in a subprocess instead; it scans and sorts every table on each request, so
+there the deep page shows payload savings only, not the index seek.
+
+Usage (from the backend directory):
+    SUPABASE_REST_URL=http://127.0.0.1:3000 python -m benchmarks.list_pagination --rows 100000
+    python -m benchmarks.list_pagination --stub --rows 100000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+from benchmarks.db_concurrency import start_stub
+from db.postgrest import AsyncPostgrestClient
+from db.repository import Repository, encode_cursor
+
+
+async def seed(client: AsyncPostgrestClient, author: str, rows: int, batch: int) -> None:
+    for start in range(0, rows, batch):
+        await client.insert("posts", [{"author": author, "title": f"Post {i}", "body": "x" * 200}
+                                      for i in range(start, min(start + batch, rows))])
+
+
+async def timed(read, repeats: int):
+    latencies, size = [], 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        size = len(await read())
+        latencies.append(time.perf_counter() - started)
+    return sorted(latencies), size
+
+
+async def run(base_url: str, api_key: str, rows: int, batch: int, limit: int, repeats: int) -> None:
+    client = AsyncPostgrestClient(base_url, api_key=api_key, timeout_seconds=120)
+    repository = Repository(client)
+    # A fresh author per run, so earlier runs do not change the table being read
+    author = f"bench-{uuid.uuid4().hex[:8]}"
+    started = time.perf_counter()
+    await seed(client, author, rows, batch)
+    print(f"seeded {rows} posts in {time.perf_counter() - started:.1f}s")
+
+    # Cursor of the row just before the last page
+    tail = await client.select("posts", "created_at,id", eq={"author": author},
+                               order="created_at.desc,id.desc", limit=limit + 1)
+    deep_cursor = encode_cursor(tail[-1])
+
+    async def full_scan():
+        return await client.select("posts", eq={"author": author})
+
+    async def first_page():
+        return (await repository.list_posts(author, limit)).rows
+
+    async def deep_page():
+        return (await repository.list_posts(author, limit, deep_cursor)).rows
+
+    print(f"{'read':<22}{'rows':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, read in (("select=* (before)", full_scan), ("first page", first_page), ("deep page", deep_page)):
+        latencies, size = await timed(read, repeats)
+        p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+        print(f"{name:<22}{size:>8}{statistics.median(latencies) * 1000:>10.1f}{p95 * 1000:>10.1f}")
+    await repository.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=1000, help="Rows per bulk insert while seeding")
+    parser.add_argument("--limit", type=int, default=50, help="Page size")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--stub", action="store_true", help="Use the in-memory PostgREST stand-in")
+    args = parser.parse_args()
+
+    process = None
+    if args.stub:
+        process, base_url = start_stub(0)
+    else:
+        base_url = os.getenv("SUPABASE_REST_URL")
+        if not base_url:
+            parser.error("set SUPABASE_REST_URL or pass --stub")
+    try:
+        asyncio.run(run(base_url, os.getenv("SUPABASE_KEY"), args.rows, args.batch, args.limit, args.repeats))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+In-memory stand-in for the PostgREST API, enough of it for the routes of this app.
+
+Supports `select=` column lists, `col=eq.value` filters, `or=(...)` / `and=(...)` trees of eq/gt/lt
+and is.null conditions (keyset cursors), `order=col.asc,col2.desc` (NULLs last), `limit=`, inserts
+(`Prefer: return=representation`), PATCH updates and the `increment_post_likes` /
+`increment_comment_likes` functions with their batched `add_post_likes` / `add_comment_likes` variants. Every answer is delayed by `--delay-ms` to mimic the network and
+database round-trip, and accepted TCP connections are counted (`GET /_stub/stats`).
+
+Run the API against it (from the backend directory):
+    python -m benchmarks.postgrest_stub --port 3000 --delay-ms 20
+    SUPABASE_REST_URL=http://127.0.0.1:3000 python main.py
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+from urllib.parse import parse_qsl, urlsplit
+
+RPC_COUNTERS = {"increment_post_likes": ("posts", "p_id"), "increment_comment_likes": ("comments", "c_id")}
+# Batched variants: arrays of ids and of the likes to add to each
+RPC_BATCH_COUNTERS = {"add_post_likes": ("posts", "p_ids", "p_counts"),
+                      "add_comment_likes": ("comments", "c_ids", "c_counts")}
+
+
+class PostgrestStub(ThreadingHTTPServer):
+    daemon_threads = True
+    # Pools open up to SUPABASE_MAX_CONNECTIONS at once, the default backlog of 5 resets some of them
+    request_queue_size = 128
+
+    def __init__(self, port: int = 0, delay_seconds: float = 0.0):
+        self.delay_seconds = delay_seconds
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", port), PostgrestStubHandler)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "PostgrestStub":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def seed(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        with self.lock:
+            for row in rows:
+                self._insert(table, row)
+
+    def _insert(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        rows = self.tables.setdefault(table, [])
+        row = {"id": len(rows) + 1, "created_at": datetime.now(timezone.utc).isoformat(), **row}
+        rows.append(row)
+        return row
+
+
+def _matches(row: Dict[str, Any], filters: Dict[str, str]) -> bool:
+    return all(str(row.get(column)).lower() == value.lower() for column, value in filters.items())
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas outside parentheses and double quotes."""
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in text:
+        if char == '"' and not current.endswith("\\"):
+            quoted = not quoted
+        elif not quoted and char in "()":
+            depth += 1 if char == "(" else -1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    return parts + [current]
+
+
+_OPERATORS = {"eq": lambda a, b: a == b, "gt": lambda a, b: a > b, "lt": lambda a, b: a < b,
+              "gte": lambda a, b: a >= b, "lte": lambda a, b: a <= b}
+
+
+def _condition(expression: str) -> Callable[[Dict[str, Any]], bool]:
+    """Row predicate for `col.op.value`, `and(...)` or `or(...)` of a PostgREST logic tree."""
+    for operator in ("and", "or"):
+        if expression.startswith(operator + "("):
+            parts = [_condition(part) for part in _split_top_level(expression[len(operator) + 1:-1])]
+            combine = all if operator == "and" else any
+            return lambda row: combine(part(row) for part in parts)
+    column, operator, value = expression.split(".", 2)
+    if value.startswith('"'):
+        value = value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    if operator == "is":
+        return lambda row: row.get(column) is None
+    compare = _OPERATORS[operator]
+
+    def predicate(row: Dict[str, Any]) -> bool:
+        actual = row.get(column)
+        if isinstance(actual, (int, float)):
+            return compare(actual, type(actual)(value))
+        return compare(str(actual), value)
+    return predicate
+
+
+class PostgrestStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes, avoid Nagle stalls on kept-alive connections
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _parse(self):
+        url = urlsplit(self.path)
+        query = dict(parse_qsl(url.query))
+        table = url.path.strip("/")
+        filters = {column: value[3:] for column, value in query.items() if value.startswith("eq.")}
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length)) if length else None
+        return table, query, filters, body
+
+    def _answer(self, status: int, payload: Any) -> None:
+        time.sleep(self.server.delay_seconds)
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        table, query, filters, _ = self._parse()
+        if table == "_stub/stats":
+            self._answer(200, {"connections": self.server.connections, "requests": self.server.requests})
+            return
+        with self.server.lock:
+            self.server.requests += 1
+            rows = [row for row in self.server.tables.get(table, []) if _matches(row, filters)]
+        for operator in ("or", "and"):
+            if operator in query:
+                predicate = _condition(operator + query[operator])
+                rows = [row for row in rows if predicate(row)]
+        if "order" in query:
+            # Stable sorts, least significant column first
+            for term in reversed(query["order"].split(",")):
+                column, direction = (term.split(".") + ["asc"])[:2]
+                rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=direction == "desc")
+        if "limit" in query:
+            rows = rows[:int(query["limit"])]
+        columns = query.get("select", "*")
+        if columns != "*":
+            known = {column for row in self.server.tables.get(table, []) for column in row}
+            unknown = [column for column in columns.split(",") if known and column not in known]
+            if unknown:
+                self._answer(400, {"code": "42703", "message": f"column {table}.{unknown[0]} does not exist"})
+                return
+            rows = [{column: row.get(column) for column in columns.split(",")} for row in rows]
+        self._answer(200, rows)
+
+    def do_POST(self):
+        table, _, _, body = self._parse()
+        with self.server.lock:
+            self.server.requests += 1
+            if table[4:] in RPC_BATCH_COUNTERS:
+                target_table, ids, counts = RPC_BATCH_COUNTERS[table[4:]]
+                added = dict(zip(body[ids], body[counts]))
+                result = [row for row in self.server.tables.get(target_table, []) if row["id"] in added]
+                for row in result:
+                    row["likes"] = (row.get("likes") or 0) + added[row["id"]]
+            elif table.startswith("rpc/"):
+                target_table, parameter = RPC_COUNTERS[table[4:]]
+                rows = [row for row in self.server.tables.get(target_table, []) if row["id"] == body[parameter]]
+                for row in rows:
+                    row["likes"] = (row.get("likes") or 0) + 1
+                result = rows[0] if rows else None
+            else:
+                result = [self.server._insert(table, row) for row in (body if isinstance(body, list) else [body])]
+        self._answer(200 if table.startswith("rpc/") else 201, result)
+
+    def do_PATCH(self):
+        table, _, filters, body = self._parse()
+        with self.server.lock:
+            self.server.requests += 1
+            rows = [row for row in self.server.tables.get(table, []) if _matches(row, filters)]
+            for row in rows:
+                row.update(body)
+        self._answer(200, rows)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--delay-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    server = PostgrestStub(args.port, args.delay_ms / 1000)
+    print(f"PostgREST stand-in on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
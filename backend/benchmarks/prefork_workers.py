@@ -0,0 +1,192 @@
+"""
+Throughput versus memory of the API server at several worker counts.
+
+For every worker count the server (`python main.py`) is started with `WEB_WORKERS=n`, once with the
+models preloaded in the parent and shared copy-on-write by the forked workers (`WEB_PRELOAD=true`) and
+once with every worker loading its own copy (`WEB_PRELOAD=false`). Once all workers report ready,
+`--requests` uploads are sent to `/analyze` from `--concurrency` client threads. Memory is summed over
+the server's process tree: RSS counts shared pages once per process, PSS splits them between the
+processes sharing them, so PSS is the memory the node actually spends.
+
+The result cache is disabled so every request runs ASR. The server needs the usual environment
+(SUPABASE_URL / SUPABASE_KEY); `include_ai_feedback` is off, so no LLM calls are made.
+
+Usage (from the backend directory):
+    python -m benchmarks.prefork_workers --workers 1 2 4 8 --requests 64 --concurrency 16
+    python -m benchmarks.prefork_workers --audio recording.wav --target-text "The cat sat on the mat"
+"""
+import argparse
+import io
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+
+def synthetic_wav(seconds: float = 3.0, sampling_rate: int = 16000) -> bytes:
+    """A voiced-sounding tone with noise, long enough to keep Whisper busy."""
+    rng = np.random.default_rng(0)
+    time_axis = np.arange(int(seconds * sampling_rate)) / sampling_rate
+    signal = 0.3 * np.sin(2 * np.pi * 180 * time_axis) * (1 + np.sin(2 * np.pi * 3 * time_axis)) / 2
+    signal += 0.02 * rng.standard_normal(time_axis.shape)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sampling_rate)
+        wav.writeframes((np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree(pid: int) -> list:
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            for child in children.read().split():
+                pids.extend(process_tree(int(child)))
+    except OSError:
+        pass
+    return pids
+
+
+def memory_mb(pid: int) -> tuple:
+    """(RSS, PSS) in MB summed over the process tree, from /proc/<pid>/smaps_rollup (Linux only)."""
+    rss = pss = 0
+    for tree_pid in process_tree(pid):
+        try:
+            with open(f"/proc/{tree_pid}/smaps_rollup") as rollup:
+                for line in rollup:
+                    if line.startswith("Rss:"):
+                        rss += int(line.split()[1])
+                    elif line.startswith("Pss:"):
+                        pss += int(line.split()[1])
+        except OSError:
+            pass
+    return rss / 1024, pss / 1024
+
+
+def wait_until_ready(base_url: str, workers: int, timeout: float) -> float:
+    """Poll /ready over fresh connections until `workers` distinct pids answered 200; returns the wait."""
+    started = time.perf_counter()
+    ready_pids = set()
+    with ThreadPoolExecutor(max_workers=workers * 2) as pool:
+        while len(ready_pids) < workers:
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"only {len(ready_pids)}/{workers} workers ready after {timeout:.0f}s")
+
+            def probe(_):
+                try:
+                    response = requests.get(f"{base_url}/ready", timeout=5)
+                    return response.json().get("pid") if response.status_code == 200 else None
+                except requests.RequestException:
+                    return None
+
+            ready_pids.update(pid for pid in pool.map(probe, range(workers * 4)) if pid is not None)
+            time.sleep(0.2)
+    return time.perf_counter() - started
+
+
+def run_load(base_url: str, audio: bytes, target_text: str, requests_total: int, concurrency: int):
+    def analyze(_):
+        started = time.perf_counter()
+        response = requests.post(
+            f"{base_url}/analyze",
+            files={"audio_file": ("recording.wav", audio, "audio/wav")},
+            data={"target_text": target_text, "include_ai_feedback": "false"},
+            timeout=300,
+        )
+        return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(analyze, range(requests_total)))
+    total = time.perf_counter() - started
+    latencies = sorted(latency for latency, status in results if status == 200)
+    errors = sum(1 for _, status in results if status != 200)
+    return total, latencies, errors
+
+
+def benchmark(workers: int, preload: bool, args, audio: bytes) -> dict:
+    port = free_port()
+    env = dict(os.environ, WEB_WORKERS=str(workers), WEB_PRELOAD=str(preload).lower(), PORT=str(port),
+               RESULT_CACHE_SIZE="0", RESULT_CACHE_DB="", INFERENCE_QUEUE_SIZE=str(args.concurrency),
+               LOG_LEVEL="WARNING")
+    server = subprocess.Popen([sys.executable, "main.py"], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        started = time.perf_counter()
+        while True:
+            try:
+                requests.get(f"{base_url}/health", timeout=1)
+                break
+            except requests.RequestException:
+                if server.poll() is not None or time.perf_counter() - started > args.timeout:
+                    raise RuntimeError("server did not start")
+                time.sleep(0.2)
+        ready_seconds = time.perf_counter() - started + wait_until_ready(base_url, workers, args.timeout)
+        rss_idle, pss_idle = memory_mb(server.pid)
+        total, latencies, errors = run_load(base_url, audio, args.target_text, args.requests, args.concurrency)
+        rss, pss = memory_mb(server.pid)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    return {
+        "ready_seconds": ready_seconds,
+        "throughput": len(latencies) / total,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else float("nan"),
+        "errors": errors,
+        "rss_idle_mb": rss_idle,
+        "pss_idle_mb": pss_idle,
+        "rss_mb": rss,
+        "pss_mb": pss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--audio", help="Recording to upload (default: 3 s synthetic tone)")
+    parser.add_argument("--target-text", default="The cat sat on the mat")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for the workers to be ready")
+    args = parser.parse_args()
+
+    if args.audio:
+        with open(args.audio, "rb") as audio_file:
+            audio = audio_file.read()
+    else:
+        audio = synthetic_wav()
+
+    print(f"{'workers':>7}{'mode':>10}{'ready s':>9}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}"
+          f"{'RSS idle':>10}{'PSS idle':>10}{'RSS MB':>9}{'PSS MB':>9}")
+    for workers in args.workers:
+        for preload in ([True] if workers == 1 else [True, False]):
+            report = benchmark(workers, preload, args, audio)
+            mode = "-" if workers == 1 else ("shared" if preload else "copies")
+            print(f"{workers:>7}{mode:>10}{report['ready_seconds']:>9.1f}{report['throughput']:>8.2f}"
+                  f"{report['p50_ms']:>9.0f}{report['p95_ms']:>9.0f}{report['errors']:>8}"
+                  f"{report['rss_idle_mb']:>10.0f}{report['pss_idle_mb']:>10.0f}"
+                  f"{report['rss_mb']:>9.0f}{report['pss_mb']:>9.0f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
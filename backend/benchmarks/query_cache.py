@@ -0,0 +1,122 @@
+"""
+App launches against a PostgREST stand-in, with and without the read-through query cache.
+
+Every launch reads the launching child's assignments and the student list, as the apps do on start;
+every `--write-every`th launch also creates an assignment, which invalidates the cached assignment
+lists. "memory" is the in-process TTL/LRU tier, "memory + redis" adds the shared tier on the Redis
+stand-in (benchmarks.redis_stub) with `--workers` caches playing separate worker processes, so entries
+loaded by one worker are found by the others. Reports latency per launch, database reads and hit rate.
+
+Usage (from the backend directory):
+    python -m benchmarks.query_cache --launches 500 --children 20 --delay-ms 20
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.db_concurrency import start_stub
+from db.postgrest import AsyncPostgrestClient
+from db.query_cache import QueryCache, RedisQueryTier
+from db.repository import Repository
+from utils.cache import TTLCache
+
+MODES = ["no cache", "memory", "memory + redis"]
+
+
+def start_redis_stub() -> tuple:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen([sys.executable, "-m", "benchmarks.redis_stub", "--port", str(port)],
+                               stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            break
+        except OSError:
+            time.sleep(0.1)
+    return process, f"redis://127.0.0.1:{port}"
+
+
+async def run(mode: str, base_url: str, redis_url: str, args) -> tuple:
+    repository = Repository(AsyncPostgrestClient(base_url))
+    workers = args.workers if mode == "memory + redis" else 1
+    caches = [QueryCache(TTLCache(max_size=256, ttl_seconds=60),
+                         RedisQueryTier(redis_url) if mode == "memory + redis" else None)
+              for _ in range(workers)]
+
+    async def read(cache, table, params, load):
+        if mode == "no cache":
+            return await load()
+        return (await cache.get_or_load(table, params, load)).value
+
+    async def launch(number: int) -> float:
+        started = time.perf_counter()
+        cache = caches[number % workers]
+        child = f"child_{number % args.children}"
+        if number % args.write_every == args.write_every - 1:
+            await repository.create_assignment({"assigned_to": child, "type": 1, "detail": {"title": "New"}})
+            if mode != "no cache":
+                await cache.invalidate("assignments")
+
+        async def assignments():
+            return (await repository.list_assignments(50, assigned_to=child)).rows
+
+        async def students():
+            return (await repository.list_students(50)).rows
+
+        await asyncio.gather(read(cache, "assignments", {"assigned_to": child}, assignments),
+                             read(cache, "students", {}, students))
+        return time.perf_counter() - started
+
+    # Launches arrive in waves of `--concurrency`
+    latencies = []
+    for start in range(0, args.launches, args.concurrency):
+        latencies += await asyncio.gather(*[launch(number)
+                                            for number in range(start, min(start + args.concurrency, args.launches))])
+    hits = sum(cache.hits for cache in caches)
+    lookups = hits + sum(cache.misses for cache in caches)
+    for cache in caches:
+        await cache.aclose()
+    await repository.aclose()
+    return sorted(latencies), hits / lookups if lookups else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--launches", type=int, default=500)
+    parser.add_argument("--children", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--write-every", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--delay-ms", type=float, default=20)
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    args = parser.parse_args()
+
+    print(f"{'cache':<16}{'p50 ms':>9}{'p95 ms':>9}{'db reads':>10}{'hit rate':>10}")
+    for mode in args.modes:
+        stub, base_url = start_stub(args.delay_ms)
+        redis, redis_url = start_redis_stub() if mode == "memory + redis" else (None, None)
+        try:
+            reads_before = httpx.get(f"{base_url}/_stub/stats").json()["requests"]
+            latencies, hit_rate = asyncio.run(run(mode, base_url, redis_url, args))
+            # Minus the assignment inserts
+            reads = (httpx.get(f"{base_url}/_stub/stats").json()["requests"] - reads_before
+                     - args.launches // args.write_every)
+            print(f"{mode:<16}{statistics.median(latencies) * 1000:>9.1f}"
+                  f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>9.1f}{reads:>10}{hit_rate:>10.2f}")
+        finally:
+            for process in (stub, redis):
+                if process is not None:
+                    process.terminate()
+                    process.wait()
+
+
+if __name__ == "__main__":
+    main()
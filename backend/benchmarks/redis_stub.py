@@ -0,0 +1,98 @@
+"""
+In-memory stand-in for a Redis server, enough of the protocol (RESP2) for the query cache's shared tier.
+
+Supports PING, GET, SET (with EX / PX), INCR / INCRBY, DEL and FLUSHALL; other commands answer an
+error. `INFO` returns the number of commands served as `commands:<n>`.
+
+Point the API at it (from the backend directory):
+    python -m benchmarks.redis_stub --port 6380
+    QUERY_CACHE_REDIS_URL=redis://127.0.0.1:6380 python main.py
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class RedisStub:
+    def __init__(self):
+        self.values: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.commands = 0
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.values[key]
+            return None
+        return value
+
+    def execute(self, arguments: List[bytes]) -> bytes:
+        self.commands += 1
+        command = arguments[0].upper()
+        if command == b"PING":
+            return b"+PONG\r\n"
+        if command == b"GET":
+            return _bulk(self._get(arguments[1]))
+        if command == b"SET":
+            expires_at = None
+            options = [argument.upper() for argument in arguments[3:]]
+            for unit, scale in ((b"EX", 1.0), (b"PX", 0.001)):
+                if unit in options:
+                    expires_at = time.monotonic() + float(arguments[3 + options.index(unit) + 1]) * scale
+            self.values[arguments[1]] = (arguments[2], expires_at)
+            return b"+OK\r\n"
+        if command in (b"INCR", b"INCRBY"):
+            value = int(self._get(arguments[1]) or 0) + (int(arguments[2]) if command == b"INCRBY" else 1)
+            self.values[arguments[1]] = (str(value).encode(), None)
+            return b":%d\r\n" % value
+        if command == b"DEL":
+            return b":%d\r\n" % sum(self.values.pop(key, None) is not None for key in arguments[1:])
+        if command == b"FLUSHALL":
+            self.values.clear()
+            return b"+OK\r\n"
+        if command == b"INFO":
+            return _bulk(b"commands:%d\r\n" % self.commands)
+        return b"-ERR unknown command '" + arguments[0] + b"'\r\n"
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                arguments = []
+                for _ in range(int(header[1:])):
+                    length = int((await reader.readline())[1:])
+                    arguments.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(self.execute(arguments))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+async def serve(port: int) -> None:
+    stub = RedisStub()
+    server = await asyncio.start_server(stub.handle, "127.0.0.1", port)
+    print(f"Redis stand-in on redis://127.0.0.1:{server.sockets[0].getsockname()[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args()
+    asyncio.run(serve(args.port))
+
+
+if __name__ == "__main__":
+    main()
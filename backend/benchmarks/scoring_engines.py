@@ -0,0 +1,92 @@
+"""
+Compare the scoring engines on latency, peak RSS and scores for the same recordings.
+
+"whisper" transcribes freely and aligns the texts, "ctc_alignment" force-aligns the audio to the target's
+phonemes with a CTC phoneme model. Each engine runs in its own subprocess so RSS numbers are not polluted
+by the other model.
+
+Usage (from the backend directory):
+    python -m benchmarks.scoring_engines "The cat sat on the mat" recording1.wav recording2.wav --repeats 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.asr_backends import _peak_rss_mb
+
+ENGINES = ["whisper", "ctc_alignment"]
+
+
+def run_worker(engine: str, target_text: str, paths: list, repeats: int):
+    """Build one engine, score every clip `repeats` times and print a JSON report."""
+    from utils.audio_processing import load_audio_file
+
+    clips = [load_audio_file(path) for path in paths]
+    rss_before_model = _peak_rss_mb()
+
+    started = time.perf_counter()
+    if engine == "whisper":
+        from app.pronunciation_trainer import PronunciationTrainer
+        trainer = PronunciationTrainer()
+    else:
+        from app.alignment_trainer import AlignmentPronunciationTrainer
+        trainer = AlignmentPronunciationTrainer()
+    load_seconds = time.perf_counter() - started
+
+    compiled_target = trainer.compile_target(target_text)
+    # Warm-up so lazy initialisation is not counted as latency
+    trainer.process_audio_for_given_text(clips[0], target_text, compiled_target)
+
+    latencies = []
+    scores = []
+    for clip in clips:
+        clip_latencies = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            result = trainer.process_audio_for_given_text(clip, target_text, compiled_target)
+            clip_latencies.append(time.perf_counter() - started)
+        latencies.append(statistics.median(clip_latencies))
+        scores.append(float(result["pronunciation_accuracy"]))
+
+    print(json.dumps({
+        "engine": engine,
+        "load_seconds": load_seconds,
+        "median_latency_seconds": statistics.median(latencies),
+        "total_latency_seconds": sum(latencies),
+        "model_rss_mb": _peak_rss_mb() - rss_before_model,
+        "peak_rss_mb": _peak_rss_mb(),
+        "scores": scores,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("target_text", help="Text read aloud in every recording")
+    parser.add_argument("paths", nargs="+", help="Recordings of the target text")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--engines", nargs="+", default=ENGINES, choices=ENGINES)
+    parser.add_argument("--worker", choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.target_text, args.paths, args.repeats)
+        return
+
+    print(f"{'engine':<15}{'load s':>9}{'median s':>10}{'total s':>9}{'model MB':>10}{'peak MB':>9}  scores")
+    for engine in args.engines:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.scoring_engines", "--worker", engine,
+             "--repeats", str(args.repeats), args.target_text, *args.paths],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        report = json.loads(output.strip().splitlines()[-1])
+        print(f"{engine:<15}{report['load_seconds']:>9.2f}{report['median_latency_seconds']:>10.3f}"
+              f"{report['total_latency_seconds']:>9.2f}{report['model_rss_mb']:>10.0f}"
+              f"{report['peak_rss_mb']:>9.0f}  {' '.join(f'{score:.0f}' for score in report['scores'])}")
+
+
+if __name__ == "__main__":
+    main()
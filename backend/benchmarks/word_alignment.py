@@ -0,0 +1,68 @@
+"""
+Word alignment for long read-aloud passages: full-matrix dtwalign versus the banded in-house aligner.
+
+Reports time and peak traced memory, and whether both produce the same word mapping.
+dtwalign is no longer a dependency; install it to get the baseline column.
+
+Usage (from the backend directory):
+    python -m benchmarks.word_alignment
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks.word_distance_matrix import simulate_reading
+from utils.word_matching import get_best_mapped_words, get_resulting_string, get_word_distance_matrix
+
+try:
+    from dtwalign import dtw_from_distance_matrix
+except ImportError:
+    dtw_from_distance_matrix = None
+
+PASSAGE_LENGTHS = [10, 100, 1000, 3000]
+
+
+def dtwalign_mapped_words(words_estimated: list, words_real: list):
+    word_distance_matrix = get_word_distance_matrix(words_estimated, words_real)
+    alignment = dtw_from_distance_matrix(word_distance_matrix.T)
+    mapped_indices = alignment.get_warping_path()[:len(words_estimated)]
+    return get_resulting_string(mapped_indices, words_estimated, words_real)
+
+
+def measure(function, *args):
+    """Wall time of a plain run, then peak memory of a second, traced run (tracing slows Python code down)."""
+    started = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if dtw_from_distance_matrix is not None:
+        # Keep numba's JIT compilation out of the first measurement
+        dtwalign_mapped_words(["warm", "up"], ["warm", "up"])
+    print(f"{'words':>6}{'dtwalign s':>12}{'dtwalign MB':>13}{'banded s':>10}{'banded MB':>11}{'same mapping':>14}")
+    for number_of_words in PASSAGE_LENGTHS:
+        words_estimated, words_real = simulate_reading(rng, number_of_words)
+        banded_time, banded_peak, banded = measure(get_best_mapped_words, words_estimated, words_real)
+        if dtw_from_distance_matrix is None:
+            print(f"{number_of_words:>6}{'-':>12}{'-':>13}{banded_time:>10.3f}{banded_peak / 2 ** 20:>11.1f}{'-':>14}")
+            continue
+        baseline_time, baseline_peak, baseline = measure(dtwalign_mapped_words, words_estimated, words_real)
+        same = baseline[0] == banded[0] and [int(idx) for idx in baseline[1]] == [int(idx) for idx in banded[1]]
+        print(f"{number_of_words:>6}{baseline_time:>12.3f}{baseline_peak / 2 ** 20:>13.1f}"
+              f"{banded_time:>10.3f}{banded_peak / 2 ** 20:>11.1f}{str(same):>14}")
+
+
+if __name__ == "__main__":
+    main()
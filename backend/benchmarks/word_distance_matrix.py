@@ -0,0 +1,84 @@
+"""
+Word distance matrix construction for 10, 100 and 1,000-word reading passages.
+
+Compares the original double loop over `edit_distance_python` with the batched construction in
+`get_word_distance_matrix` (deduplicated words, one vectorized or compiled pass). Transcripts are
+simulated as the passage with ~20% of the words mispronounced, dropped or repeated.
+
+Usage (from the backend directory):
+    python -m benchmarks.word_distance_matrix [--include-slow-baseline]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.edit_distance import LETTERS, mutate, random_word
+from utils import word_metrics
+from utils.word_matching import get_word_distance_matrix
+
+PASSAGE_LENGTHS = [10, 100, 1000]
+
+
+def baseline_word_distance_matrix(words_estimated: list, words_real: list) -> np.ndarray:
+    """The original O(E*R) Python double loop."""
+    word_distance_matrix = np.zeros((len(words_estimated) + 1, len(words_real)))
+    for idx_estimated in range(len(words_estimated)):
+        for idx_real in range(len(words_real)):
+            word_distance_matrix[idx_estimated, idx_real] = word_metrics.edit_distance_python(
+                words_estimated[idx_estimated], words_real[idx_real])
+    for idx_real in range(len(words_real)):
+        word_distance_matrix[len(words_estimated), idx_real] = len(words_real[idx_real])
+    return word_distance_matrix
+
+
+def simulate_reading(rng: random.Random, number_of_words: int):
+    # A small vocabulary, like real passages, so repeated words exercise the deduplication
+    vocabulary = [random_word(rng, LETTERS, 1, 9) for _ in range(max(5, number_of_words // 3))]
+    words_real = [rng.choice(vocabulary) for _ in range(number_of_words)]
+    words_estimated = []
+    for word in words_real:
+        roll = rng.random()
+        if roll < 0.05:
+            continue
+        words_estimated.append(mutate(rng, word, LETTERS) if roll < 0.2 else word)
+        if roll > 0.97:
+            words_estimated.append(word)
+    return words_estimated, words_real
+
+
+def best_time(function, *args, repeats: int = 3):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--include-slow-baseline", action="store_true",
+                        help="Also run the original loop on 1,000 words (takes about a minute)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    compiled = word_metrics._rapidfuzz_cdist is not None
+    print(f"compiled backend: {'rapidfuzz' if compiled else 'not installed, using bit-parallel/vectorized'}")
+    print(f"{'words':>6}{'baseline s':>13}{'batched s':>12}{'speed-up':>10}")
+    for number_of_words in PASSAGE_LENGTHS:
+        words_estimated, words_real = simulate_reading(rng, number_of_words)
+        batched_time, batched = best_time(get_word_distance_matrix, words_estimated, words_real)
+
+        if number_of_words >= 1000 and not args.include_slow_baseline:
+            print(f"{number_of_words:>6}{'skipped':>13}{batched_time:>12.4f}{'-':>10}")
+            continue
+        baseline_time, baseline = best_time(baseline_word_distance_matrix, words_estimated, words_real, repeats=1)
+        assert np.array_equal(baseline, batched), "batched matrix differs from the baseline"
+        print(f"{number_of_words:>6}{baseline_time:>13.4f}{batched_time:>12.4f}{baseline_time / batched_time:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
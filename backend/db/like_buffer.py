@@ -0,0 +1,132 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+from db.repository import Repository
+from utils.cache import TTLCache
+
+
+class LikeBuffer:
+    """
+    Write-behind buffer for the like counters of posts and comments. Likes are summed in memory per item
+    and written with one batched RPC per table every `flush_interval_seconds`, or as soon as
+    `max_pending` likes are waiting, instead of one single-row update per tap.
+
+    The first like of an item is written through: that checks the item exists and returns its row, whose
+    count (plus the likes buffered since) is the optimistic count answered for later likes. Buffered likes
+    are lost if the process dies before the next flush; `stop()` flushes them on shutdown. A flush that
+    fails keeps its likes for the next one, so a like may be counted twice but is not dropped.
+    """
+
+    def __init__(self, repository: Repository, flush_interval_seconds: float = 0.25, max_pending: int = 100,
+                 known_items: int = 10000, known_ttl_seconds: float = 60):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self._increment_one = {"posts": repository.increment_post_likes,
+                               "comments": repository.increment_comment_likes}
+        self._add_many = {"posts": repository.add_post_likes, "comments": repository.add_comment_likes}
+        # Last row read from the database per (table, id); re-checked once it expires
+        self._known = TTLCache(max_size=known_items, ttl_seconds=known_ttl_seconds)
+        # Whether the table's increment RPC answers a list of rows, so optimistic answers keep its shape
+        self._answers_list: Dict[str, bool] = {table: False for table in self._increment_one}
+        self._pending: Dict[str, Dict[int, int]] = {table: {} for table in self._increment_one}
+        self._in_flight: Dict[str, Dict[int, int]] = {table: {} for table in self._increment_one}
+        self._pending_likes = 0
+        self._flush_lock = asyncio.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._written_through_total = 0
+        self._buffered_total = 0
+        self._flushes_total = 0
+        self._failed_flushes_total = 0
+
+    def start(self) -> None:
+        """Start the periodic flush, must be called from the running event loop."""
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write out whatever is still buffered."""
+        if self._task is not None:
+            # Not cancelled: a flush in progress finishes instead of abandoning its RPC halfway
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def like(self, table: str, item_id: int) -> Any:
+        """
+        Count one like of `item_id` in `table` ("posts" or "comments"). Returns what the increment RPC
+        returns (the item's row, or a list holding it) with the optimistic like count, or None when the
+        item does not exist.
+        """
+        row = self._known.get((table, item_id))
+        if row is None:
+            data = await self._increment_one[table](item_id)
+            row = data[0] if isinstance(data, list) and data else data
+            if row:
+                self._answers_list[table] = isinstance(data, list)
+                self._known.set((table, item_id), row)
+                self._written_through_total += 1
+            return data or None
+
+        pending = self._pending[table]
+        pending[item_id] = pending.get(item_id, 0) + 1
+        self._pending_likes += 1
+        self._buffered_total += 1
+        if self._pending_likes >= self.max_pending and self._wake is not None:
+            self._wake.set()
+        likes = (row.get("likes") or 0) + self._in_flight[table].get(item_id, 0) + pending[item_id]
+        row = {**row, "likes": likes}
+        return [row] if self._answers_list[table] else row
+
+    async def flush(self, table: Optional[str] = None) -> None:
+        """Write the buffered likes of `table` (default: all tables) now, e.g. before reading the counts."""
+        async with self._flush_lock:
+            for name in [table] if table is not None else list(self._pending):
+                if not self._pending[name]:
+                    continue
+                counts = self._in_flight[name] = self._pending[name]
+                self._pending[name] = {}
+                self._pending_likes -= sum(counts.values())
+                try:
+                    rows = await self._add_many[name](counts)
+                    self._flushes_total += 1
+                    for row in rows or []:
+                        self._known.set((name, row["id"]), row)
+                except asyncio.CancelledError:
+                    # The call may or may not have been applied, keep the likes rather than drop them
+                    self._requeue(name, counts)
+                    raise
+                except Exception as e:
+                    print(f"Flushing {sum(counts.values())} {name} likes failed, retrying with the next flush: {e!r}")
+                    self._failed_flushes_total += 1
+                    self._requeue(name, counts)
+                finally:
+                    self._in_flight[name] = {}
+
+    def _requeue(self, table: str, counts: Dict[int, int]) -> None:
+        for item_id, count in counts.items():
+            self._pending[table][item_id] = self._pending[table].get(item_id, 0) + count
+        self._pending_likes += sum(counts.values())
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "flush_interval_seconds": self.flush_interval_seconds,
+            "max_pending": self.max_pending,
+            "pending_likes": self._pending_likes,
+            "written_through_total": self._written_through_total,
+            "buffered_total": self._buffered_total,
+            "flushes_total": self._flushes_total,
+            "failed_flushes_total": self._failed_flushes_total,
+        }
@@ -0,0 +1,138 @@
+import asyncio
+import random
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Answers worth retrying: rate limiting and the gateway/database being briefly unavailable
+_RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+
+class PostgrestError(Exception):
+    """A PostgREST request failed; `status_code` is None when no HTTP answer was received."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, code: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
+
+class AsyncPostgrestClient:
+    """
+    Minimal async client for the PostgREST API behind Supabase (`<SUPABASE_URL>/rest/v1`), or any plain
+    PostgREST server. One pooled httpx client is shared by all requests. Every call has a timeout, and
+    failed calls are retried with jittered exponential backoff when that is safe: reads on transport
+    errors and retryable statuses, writes only when the connection could not be made at all.
+    """
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, timeout_seconds: float = 5.0,
+                 max_connections: int = 50, retries: int = 2, backoff_seconds: float = 0.1):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout_seconds = timeout_seconds
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self._client: Optional[httpx.AsyncClient] = None
+        self.requests_total = 0
+        self.retries_total = 0
+        self.errors_total = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared client, so connections to PostgREST are kept alive and reused across requests."""
+        if self._client is None:
+            headers = {"Accept": "application/json"}
+            if self.api_key:
+                headers.update({"apikey": self.api_key, "Authorization": f"Bearer {self.api_key}"})
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=httpx.Timeout(self.timeout_seconds),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    async def select(self, table: str, columns: str = "*", eq: Optional[Dict[str, Any]] = None,
+                     order: Optional[str] = None, limit: Optional[int] = None,
+                     params: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        Rows of `table`. `eq` adds equality filters, `order` is a PostgREST order (e.g. "created_at.asc"),
+        `params` are passed through as raw PostgREST query parameters (e.g. {"or": "(...)"}).
+        """
+        query = {"select": columns, **self._eq_filters(eq)}
+        if order is not None:
+            query["order"] = order
+        if limit is not None:
+            query["limit"] = str(limit)
+        query.update(params or {})
+        return await self._request("GET", f"/{table}", params=query, idempotent=True)
+
+    async def insert(self, table: str, rows: Any) -> List[Dict[str, Any]]:
+        """Insert one row (dict) or several (list of dicts) and return the inserted rows."""
+        return await self._request("POST", f"/{table}", json=rows, headers={"Prefer": "return=representation"})
+
+    async def update(self, table: str, values: Dict[str, Any], eq: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Update the rows matching `eq` and return them."""
+        return await self._request("PATCH", f"/{table}", params=self._eq_filters(eq), json=values,
+                                   headers={"Prefer": "return=representation"})
+
+    async def rpc(self, function: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Call a database function; the result is whatever it returns (row, rows or scalar)."""
+        return await self._request("POST", f"/rpc/{function}", json=params or {})
+
+    async def _request(self, method: str, path: str, params: Optional[Dict[str, str]] = None, json: Any = None,
+                       headers: Optional[Dict[str, str]] = None, idempotent: bool = False) -> Any:
+        client = self._get_client()
+        attempt = 0
+        while True:
+            self.requests_total += 1
+            try:
+                response = await client.request(method, path, params=params, json=json, headers=headers)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # The request never reached the server, retrying cannot apply a write twice
+                error, retryable = PostgrestError(f"{method} {path}: {e!r}"), True
+            except httpx.TransportError as e:
+                error, retryable = PostgrestError(f"{method} {path}: {e!r}"), idempotent
+            else:
+                if response.status_code < 400:
+                    return response.json() if response.content else None
+                error = self._error_from_response(response)
+                retryable = idempotent and response.status_code in _RETRYABLE_STATUS_CODES
+
+            if not retryable or attempt >= self.retries:
+                self.errors_total += 1
+                raise error
+            # Full jitter, so clients that failed together do not retry together
+            await asyncio.sleep(random.uniform(0, self.backoff_seconds * 2 ** attempt))
+            attempt += 1
+            self.retries_total += 1
+
+    @staticmethod
+    def _eq_filters(eq: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        return {column: f"eq.{str(value).lower() if isinstance(value, bool) else value}"
+                for column, value in (eq or {}).items()}
+
+    @staticmethod
+    def _error_from_response(response: httpx.Response) -> PostgrestError:
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if not isinstance(body, dict):
+            body = {}
+        message = body.get("message") or response.text or response.reason_phrase
+        return PostgrestError(message, status_code=response.status_code, code=body.get("code"))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "requests_total": self.requests_total,
+            "retries_total": self.retries_total,
+            "errors_total": self.errors_total,
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
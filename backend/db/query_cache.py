@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils.cache import TTLCache, content_key
+
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # optional dependency, only needed with QUERY_CACHE_REDIS_URL
+    aioredis = None
+    RedisError = OSError
+
+
+@dataclass(frozen=True)
+class CachedQuery:
+    value: Any
+    # Strong validator of `value`, sent as ETag and compared with If-None-Match
+    etag: str
+
+
+def make_etag(value: Any) -> str:
+    return f'"{content_key(value)[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names `etag` (weak comparison, as HTTP specifies for GET)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class RedisQueryTier:
+    """
+    Shared tier in a Redis-compatible server (Redis, Valkey, or benchmarks.redis_stub for local runs), so
+    every worker and instance sees the same entries and invalidations. The database stays the source of
+    truth: a failing server is counted and treated as a miss, never as an error of the request.
+    """
+
+    def __init__(self, url: str, prefix: str = "querycache:", timeout_seconds: float = 0.5):
+        if aioredis is None:
+            raise ImportError("redis is required for QUERY_CACHE_REDIS_URL: pip install redis")
+        # RESP2, which every Redis-compatible server speaks (RESP3 needs Redis 6+)
+        self.client = aioredis.from_url(url, protocol=2, socket_timeout=timeout_seconds,
+                                        socket_connect_timeout=timeout_seconds)
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def generation(self, table: str) -> Optional[int]:
+        """Shared generation of `table`, None when the server cannot be reached."""
+        try:
+            return int(await self.client.get(f"{self.prefix}generation:{table}") or 0)
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            self.errors += 1
+            print(f"Query cache: reading the generation of {table} from Redis failed: {e!r}")
+            return None
+
+    async def bump_generation(self, table: str) -> None:
+        try:
+            await self.client.incr(f"{self.prefix}generation:{table}")
+        except (RedisError, OSError, asyncio.TimeoutError) as e:
+            # Other workers keep serving their entries for this table until the TTL runs out
+            self.errors += 1
+            print(f"Query cache: invalidating {table} in Redis failed: {e!r}")
+
+    async def get(self, key: str) -> Optional[CachedQuery]:
+        try:
+            payload = await self.client.get(self.prefix + key)
+        except (RedisError, OSError, asyncio.TimeoutError):
+            self.errors += 1
+            return None
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry = json.loads(payload)
+        return CachedQuery(entry["value"], entry["etag"])
+
+    async def set(self, key: str, entry: CachedQuery, ttl_seconds: Optional[float]) -> None:
+        payload = json.dumps({"value": entry.value, "etag": entry.etag}, separators=(",", ":"), default=str)
+        try:
+            await self.client.set(self.prefix + key, payload, px=int(ttl_seconds * 1000) if ttl_seconds else None)
+        except (RedisError, OSError, asyncio.TimeoutError):
+            self.errors += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "errors": self.errors,
+        }
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class QueryCache:
+    """
+    Read-through cache of database reads, keyed per table and query parameters. A write invalidates its
+    whole table by bumping the table's generation, which is part of every key: entries cached before the
+    write are never served again and age out of the LRU/TTL tiers. Concurrent misses of one key share a
+    single database read.
+    """
+
+    def __init__(self, memory: TTLCache, redis: Optional[RedisQueryTier] = None):
+        self.memory = memory
+        self.redis = redis
+        self._generations: Dict[str, int] = {}
+        # Per key being loaded: its lock and the number of requests holding or waiting for it
+        self._locks: Dict[str, List] = {}
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, table: str, params: Dict[str, Any],
+                          load: Callable[[], Awaitable[Any]]) -> CachedQuery:
+        """The cached result of the query `params` on `table`, running `load()` (JSON-encodable) on a miss."""
+        remote_generation = await self.redis.generation(table) if self.redis is not None else 0
+        if remote_generation is None:
+            # Cannot tell whether another worker invalidated the table, read the database
+            self.bypassed += 1
+            value = await load()
+            return CachedQuery(value, make_etag(value))
+
+        key = content_key(table, self._generations.get(table, 0), remote_generation, params)
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        lock_and_users = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        lock_and_users[1] += 1
+        try:
+            async with lock_and_users[0]:
+                # Another request may have loaded it while this one waited
+                entry = self.memory.get(key)
+                if entry is None and self.redis is not None:
+                    entry = await self.redis.get(key)
+                    if entry is not None:
+                        self.memory.set(key, entry)
+                if entry is not None:
+                    self.hits += 1
+                    return entry
+
+                self.misses += 1
+                value = await load()
+                entry = CachedQuery(value, make_etag(value))
+                self.memory.set(key, entry)
+                if self.redis is not None:
+                    await self.redis.set(key, entry, self.memory.ttl_seconds)
+        finally:
+            # Dropped only once nobody waits for it, a later miss of the key must not get a second lock
+            lock_and_users[1] -= 1
+            if not lock_and_users[1]:
+                del self._locks[key]
+        return entry
+
+    async def invalidate(self, table: str) -> None:
+        """Forget every cached query of `table`; call after each write to it."""
+        self._generations[table] = self._generations.get(table, 0) + 1
+        self.invalidations += 1
+        if self.redis is not None:
+            await self.redis.bump_generation(table)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bypassed": self.bypassed,
+            "invalidations": self.invalidations,
+            "memory": self.memory.get_metrics(),
+            "redis": self.redis.get_metrics() if self.redis is not None else None,
+        }
+
+    async def aclose(self) -> None:
+        if self.redis is not None:
+            await self.redis.aclose()
+
+
+def get_query_cache() -> QueryCache:
+    """
+    Query cache from QUERY_CACHE_SIZE / QUERY_CACHE_TTL_SECONDS, with the shared Redis tier when
+    QUERY_CACHE_REDIS_URL is set.
+    """
+    ttl_seconds = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "60"))
+    redis_url = os.getenv("QUERY_CACHE_REDIS_URL")
+    return QueryCache(
+        TTLCache(max_size=int(os.getenv("QUERY_CACHE_SIZE", "256")), ttl_seconds=ttl_seconds or None),
+        RedisQueryTier(redis_url) if redis_url else None,
+    )
@@ -0,0 +1,193 @@
+import base64
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from db.postgrest import AsyncPostgrestClient, PostgrestError
+
+_COLUMN_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# Keyset pagination walks the rows in this order (rows without created_at last); the cursor holds the last
+# row's values
+_KEYSET_COLUMNS = ("created_at", "id")
+_KEYSET_ORDER = "created_at.asc.nullslast,id.asc"
+
+
+class PageRequestError(ValueError):
+    """Malformed `fields` or `cursor` of a list request."""
+
+
+@dataclass
+class Page:
+    rows: List[Dict[str, Any]]
+    # Pass back as `cursor` to get the next page, None on the last page
+    next_cursor: Optional[str]
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Column names of a `fields=a,b,c` projection, None when no projection was asked for."""
+    if fields is None or not fields.strip():
+        return None
+    columns = [column.strip() for column in fields.split(",") if column.strip()]
+    for column in columns:
+        if not _COLUMN_NAME.match(column):
+            raise PageRequestError(f'Invalid field name "{column}"')
+    return columns
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    payload = json.dumps([row[column] for column in _KEYSET_COLUMNS], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise PageRequestError("Invalid cursor") from None
+    if row_id is None:
+        raise PageRequestError("Invalid cursor")
+    return created_at, row_id
+
+
+def _quote(value: Any) -> str:
+    """A value inside a PostgREST logic tree, double-quoted so dots, colons and commas are kept."""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class Repository:
+    """The app's queries against Supabase, one coroutine per operation of the CRUD routes."""
+
+    def __init__(self, client: AsyncPostgrestClient):
+        self.client = client
+
+    async def _list_page(self, table: str, limit: int, cursor: Optional[str] = None, fields: Optional[str] = None,
+                         eq: Optional[Dict[str, Any]] = None, hidden: Sequence[str] = ()) -> Page:
+        """
+        One page of `table` in (created_at, id) order, starting after `cursor`. Keyset pagination: the
+        database seeks straight to the cursor on the (created_at, id) index, so deep pages cost the same as
+        the first one. `fields` projects the columns (the keyset columns are fetched for the cursor and
+        dropped again when not asked for); `hidden` columns are never returned, naming one in `fields` is
+        an error, and so is a column the table does not have (or a cursor the database rejects).
+        """
+        columns = parse_fields(fields)
+        if columns is not None:
+            for column in columns:
+                if column in hidden:
+                    raise PageRequestError(f'Field "{column}" cannot be selected')
+        select = "*" if columns is None else ",".join(dict.fromkeys([*columns, *_KEYSET_COLUMNS]))
+        params = {}
+        if cursor is not None:
+            created_at, row_id = decode_cursor(cursor)
+            if created_at is None:
+                # Past the last created_at, only rows without one are left
+                params["and"] = f"(created_at.is.null,id.gt.{_quote(row_id)})"
+            else:
+                params["or"] = (f"(created_at.gt.{_quote(created_at)},"
+                                f"and(created_at.eq.{_quote(created_at)},id.gt.{_quote(row_id)}),"
+                                f"created_at.is.null)")
+        try:
+            # One extra row tells whether there is a next page
+            rows = await self.client.select(table, select, eq=eq, order=_KEYSET_ORDER, limit=limit + 1,
+                                            params=params)
+        except PostgrestError as e:
+            # PostgREST answers 400 for requests it cannot run, e.g. an unknown column in `fields`
+            if e.status_code == 400:
+                raise PageRequestError(str(e)) from e
+            raise
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        rows = rows[:limit]
+
+        dropped = set(hidden) if columns is None else set(hidden) | (set(_KEYSET_COLUMNS) - set(columns))
+        if dropped:
+            rows = [{column: value for column, value in row.items() if column not in dropped} for row in rows]
+        return Page(rows=rows, next_cursor=next_cursor)
+
+    # Submissions
+    async def create_submission(self, row: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self.client.insert("submissions", row)
+
+    async def update_submission(self, submission_id: int, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self.client.update("submissions", values, eq={"id": submission_id})
+
+    async def list_submissions(self, assignment_id: int, limit: int, cursor: Optional[str] = None,
+                               fields: Optional[str] = None) -> Page:
+        return await self._list_page("submissions", limit, cursor, fields, eq={"assignment_id": assignment_id})
+
+    # Assignments
+    async def list_assignments(self, limit: int, cursor: Optional[str] = None, fields: Optional[str] = None,
+                               assigned_to: Optional[str] = None) -> Page:
+        eq = {"assigned_to": assigned_to} if assigned_to is not None else None
+        return await self._list_page("assignments", limit, cursor, fields, eq=eq)
+
+    async def create_assignment(self, row: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self.client.insert("assignments", row)
+
+    async def update_assignment(self, assignment_id: int, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self.client.update("assignments", values, eq={"id": assignment_id})
+
+    # Students
+    async def list_students(self, limit: int, cursor: Optional[str] = None, fields: Optional[str] = None) -> Page:
+        # Password hashes never leave the database through this route
+        return await self._list_page("students", limit, cursor, fields, hidden=("pw_hash",))
+
+    async def create_student(self, row: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self.client.insert("students", row)
+
+    # Forum
+    async def create_post(self, row: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self.client.insert("posts", row)
+
+    async def list_posts(self, author: str, limit: int, cursor: Optional[str] = None,
+                         fields: Optional[str] = None) -> Page:
+        return await self._list_page("posts", limit, cursor, fields, eq={"author": author})
+
+    async def increment_post_likes(self, post_id: int) -> Any:
+        return await self.client.rpc("increment_post_likes", {"p_id": post_id})
+
+    async def add_post_likes(self, counts: Dict[int, int]) -> List[Dict[str, Any]]:
+        """Add counts[post_id] likes to every post in one call, returns the updated posts."""
+        return await self.client.rpc("add_post_likes", {"p_ids": list(counts), "p_counts": list(counts.values())})
+
+    async def create_comment(self, row: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self.client.insert("comments", row)
+
+    async def list_comments(self, post_id: int, limit: int, cursor: Optional[str] = None,
+                            fields: Optional[str] = None) -> Page:
+        return await self._list_page("comments", limit, cursor, fields, eq={"post": post_id})
+
+    async def increment_comment_likes(self, comment_id: int) -> Any:
+        return await self.client.rpc("increment_comment_likes", {"c_id": comment_id})
+
+    async def add_comment_likes(self, counts: Dict[int, int]) -> List[Dict[str, Any]]:
+        """Add counts[comment_id] likes to every comment in one call, returns the updated comments."""
+        return await self.client.rpc("add_comment_likes",
+                                     {"c_ids": list(counts), "c_counts": list(counts.values())})
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def get_repository() -> Repository:
+    """
+    Repository for SUPABASE_URL / SUPABASE_KEY. SUPABASE_REST_URL points it at another PostgREST root
+    instead, e.g. a local PostgREST + Postgres stand-in (the key is optional there).
+    """
+    supabase_url = os.getenv("SUPABASE_URL")
+    supabase_key = os.getenv("SUPABASE_KEY")
+    rest_url = os.getenv("SUPABASE_REST_URL")
+
+    if rest_url is None:
+        if not supabase_url or not supabase_key:
+            raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables.")
+        rest_url = f"{supabase_url.rstrip('/')}/rest/v1"
+
+    return Repository(AsyncPostgrestClient(
+        rest_url,
+        api_key=supabase_key,
+        timeout_seconds=float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "5")),
+        max_connections=int(os.getenv("SUPABASE_MAX_CONNECTIONS", "50")),
+        retries=int(os.getenv("SUPABASE_RETRIES", "2")),
+        backoff_seconds=float(os.getenv("SUPABASE_RETRY_BACKOFF_MS", "100")) / 1000,
+    ))
@@ -1,24 +1,38 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+import functools
+import hashlib
+import json
 import logging
 import os
-import tempfile
 from typing import Optional
 
 from db_init import initialize_database
-from supabase import create_client, Client
+from db.like_buffer import LikeBuffer
+from db.query_cache import CachedQuery, QueryCache, etag_matches, get_query_cache
+from db.repository import PageRequestError, Repository, get_repository
 
 import torch
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, Query, Body, Path
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, Response, Query, Body, Path, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from typing import Optional, List,  Any, Dict
 
+from app.compiled_target import CompiledTargetCache, compile_target
+from app.model_lifecycle import ModelLoader, ModelNotReadyError
 from app.pronunciation_trainer import PronunciationTrainer
-from utils.audio_processing import load_audio_file
-from utils.helpers import get_ai_feedback, _get_quality_description
+from app.streaming_session import StreamingPronunciationSession
+from models.phoneme_converters import get_phonem_converter
+from utils.audio_processing import load_audio_bytes
+from utils.helpers import close_ai_feedback, get_ai_feedback, _get_quality_description
 from utils.ai_feedback import _generate_fallback_feedback
 from utils.word_matching import getWhichLettersWereTranscribedCorrectly, get_best_mapped_words
+from utils.cache import SQLiteCache, TTLCache, TieredCache, content_key
+from utils.feedback_jobs import FeedbackJobQueue, FeedbackQueueFullError
+from utils.inference_executor import InferenceExecutor, InferenceQueueFullError
 # Load environment variables from .env file
 load_dotenv()
 
@@ -58,32 +72,265 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Text-to-IPA is quick to set up and also needed by the assignment routes, so it does not wait for Whisper
+phoneme_converter = get_phonem_converter("en")
+
 # Initialize pronunciation trainer and AI feedback generator
-pronunciation_trainer = PronunciationTrainer()
+# The trainer (Whisper weights) is loaded and warmed up on a background thread once the server is up,
+# see /health and /ready; model routes answer 503 until then.
+# ASR_BATCH_MAX_SIZE > 1 enables micro-batching of concurrent decodes; pair it with
+# INFERENCE_WORKERS >= ASR_BATCH_MAX_SIZE so enough requests can wait on the same batch.
+# SCORING_ENGINE=ctc_alignment scores by forced alignment with a CTC phoneme model instead of Whisper.
+SCORING_ENGINE = os.getenv("SCORING_ENGINE", "whisper")
+
+
+def _create_trainer() -> PronunciationTrainer:
+    trim_silence = os.getenv("VAD_TRIM", "true").lower() == "true"
+    if SCORING_ENGINE == "whisper":
+        return PronunciationTrainer(
+            asr_backend=os.getenv("ASR_BACKEND", "transformers"),
+            asr_max_batch_size=int(os.getenv("ASR_BATCH_MAX_SIZE", "1")),
+            asr_max_wait_ms=float(os.getenv("ASR_BATCH_MAX_WAIT_MS", "20")),
+            trim_silence=trim_silence,
+            ipa_converter=phoneme_converter,
+        )
+    elif SCORING_ENGINE == "ctc_alignment":
+        from app.alignment_trainer import AlignmentPronunciationTrainer
+        return AlignmentPronunciationTrainer(
+            trim_silence=trim_silence,
+            ipa_converter=phoneme_converter,
+            gop_threshold=float(os.getenv("CTC_GOP_THRESHOLD", "-1.0")),
+        )
+    else:
+        raise ValueError(f'Unknown scoring engine "{SCORING_ENGINE}", use "whisper" or "ctc_alignment"')
+
+
+model_loader = ModelLoader(_create_trainer, warm_up=os.getenv("MODEL_WARMUP", "true").lower() == "true")
 ai_feedback_generator = None
 
-supabase_client: Client = None
+# Target-side analysis of assignment texts, compiled on assignment create/update or on first /analyze
+compiled_targets = CompiledTargetCache(
+    functools.partial(compile_target, ipa_converter=phoneme_converter),
+    max_assignments=int(os.getenv("COMPILED_TARGET_CACHE_SIZE", "1024")),
+    max_texts_per_assignment=int(os.getenv("COMPILED_TARGET_TEXTS_PER_ASSIGNMENT", "64")),
+)
+
+# Dedicated pool for ASR/scoring so a long decode never blocks the event loop (CRUD routes keep flowing).
+# The admission queue is bounded: once INFERENCE_WORKERS + INFERENCE_QUEUE_SIZE jobs are in flight,
+# /analyze answers 429 with a Retry-After hint.
+inference_executor = InferenceExecutor(
+    max_workers=int(os.getenv("INFERENCE_WORKERS", "1")),
+    max_queue_size=int(os.getenv("INFERENCE_QUEUE_SIZE", "16")),
+)
+
+# Whole /analyze results by audio bytes + target text + model version, so retried uploads skip ASR.
+# RESULT_CACHE_DB adds a SQLite tier that survives restarts.
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "86400"))
+result_cache = TieredCache(
+    TTLCache(max_size=int(os.getenv("RESULT_CACHE_SIZE", "1000")), ttl_seconds=RESULT_CACHE_TTL_SECONDS),
+    SQLiteCache(os.getenv("RESULT_CACHE_DB"), ttl_seconds=RESULT_CACHE_TTL_SECONDS) if os.getenv("RESULT_CACHE_DB") else None,
+)
+
+# Deferred AI feedback (/analyze with defer_ai_feedback=true) is generated by these background workers
+feedback_jobs = FeedbackJobQueue(
+    workers=int(os.getenv("FEEDBACK_WORKERS", "4")),
+    max_pending=int(os.getenv("FEEDBACK_MAX_PENDING", "256")),
+    retention_seconds=float(os.getenv("FEEDBACK_RETENTION_SECONDS", "600")),
+)
+FEEDBACK_SSE_HEARTBEAT_SECONDS = 15
+
+# /analyze/batch: items per request, clips per ASR call and threads decoding the uploads
+ANALYZE_BATCH_MAX_ITEMS = int(os.getenv("ANALYZE_BATCH_MAX_ITEMS", "64"))
+ANALYZE_BATCH_ASR_SIZE = int(os.getenv("ANALYZE_BATCH_ASR_SIZE", "8"))
+ANALYZE_BATCH_DECODE_WORKERS = int(os.getenv("ANALYZE_BATCH_DECODE_WORKERS", "4"))
+
+# Send the AI feedback prompt without the letter mask, in parallel with computing it
+AI_FEEDBACK_CONCURRENT = os.getenv("AI_FEEDBACK_CONCURRENT", "false").lower() == "true"
+
+ALLOWED_AUDIO_EXTENSIONS = {'.wav', '.mp3', '.ogg', '.m4a', '.flac'}
+
+# Async PostgREST access with pooled connections, so CRUD routes never block the event loop
+repository: Repository = None
+# Assignment and student lists change rarely: read-through cache, invalidated by the write routes
+query_cache: QueryCache = None
+# Write-behind like counters, batched into one RPC per table (needs add_post_likes / add_comment_likes)
+LIKE_WRITE_BEHIND = os.getenv("LIKE_WRITE_BEHIND", "false").lower() == "true"
+like_buffer: Optional[LikeBuffer] = None
+# List routes return pages of (created_at, id)-ordered rows, see next_cursor
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
 # Database Startup
 @app.on_event("startup")
 async def startup_event():
 
-    # initialize supabase
-    global supabase_client
+    # Returns immediately, models load in the background
+    model_loader.start()
+    feedback_jobs.start()
+
+    # initialize supabase (raises when SUPABASE_URL / SUPABASE_KEY are missing)
+    global repository, query_cache, like_buffer
+    repository = get_repository()
+    query_cache = get_query_cache()
+    if LIKE_WRITE_BEHIND:
+        like_buffer = LikeBuffer(
+            repository,
+            flush_interval_seconds=float(os.getenv("LIKE_FLUSH_INTERVAL_MS", "250")) / 1000,
+            max_pending=int(os.getenv("LIKE_FLUSH_MAX_EVENTS", "100")),
+        )
+        like_buffer.start()
+
+    # Initialize database with default data
+    # initialize_database()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    inference_executor.shutdown(wait=False)
+    await feedback_jobs.stop()
+    await close_ai_feedback()
+    result_cache.close()
+    if like_buffer is not None:
+        # Buffered likes go out before the database client closes
+        await like_buffer.stop()
+    if repository is not None:
+        await repository.aclose()
+    if query_cache is not None:
+        await query_cache.aclose()
+
+
+@app.get("/health")
+async def health():
+    """Liveness: the process is up and its event loop responds, whether or not the models are loaded."""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 200 once the models are loaded and warmed up, 503 while loading or after a failed load."""
+    # pid tells workers apart when several serve the same port
+    status = {**model_loader.get_status(), "pid": os.getpid()}
+    if not model_loader.is_ready:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
+
+def _get_trainer() -> PronunciationTrainer:
+    """The loaded trainer; answers 503 with a Retry-After hint while the models are still loading."""
+    try:
+        return model_loader.get()
+    except ModelNotReadyError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Models are not ready yet ({e.state}), please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+
+
+@app.get("/metrics/inference")
+async def get_inference_metrics():
+    """Queue depth, throughput counters and wait/run times of the inference pool."""
+    metrics = inference_executor.get_metrics()
+    metrics["models"] = model_loader.get_status()
+    if model_loader.is_ready and model_loader.get().asr_scheduler is not None:
+        metrics["asr_batching"] = model_loader.get().asr_scheduler.get_metrics()
+    metrics["phoneme_cache"] = phoneme_converter.get_metrics()
+    metrics["compiled_targets"] = compiled_targets.get_metrics()
+    metrics["feedback_jobs"] = feedback_jobs.get_metrics()
+    return metrics
+
+
+@app.get("/metrics/caches")
+async def get_cache_metrics():
+    """Size and hit rate of the response caches."""
+    feedback_generator = get_ai_feedback()
+    return {
+        "ai_feedback": feedback_generator.get_metrics() if feedback_generator else None,
+        "analysis_results": result_cache.get_metrics(),
+        "database_queries": query_cache.get_metrics() if query_cache is not None else None,
+    }
+
+
+@app.get("/metrics/database")
+async def get_database_metrics():
+    """Request, retry and error counters of the PostgREST client, and of the like buffer."""
+    if repository is None:
+        return None
+    metrics = repository.client.get_metrics()
+    metrics["like_buffer"] = like_buffer.get_metrics() if like_buffer is not None else None
+    return metrics
+
 
-    # Load Supabase URL and Key from environment variables
+def _run_pronunciation_analysis(audio_bytes: bytes, file_extension: str, target_text: str,
+                                assignment_id: Optional[int] = None, include_letter_mask: bool = True) -> Dict[str, Any]:
+    """
+    Blocking part of /analyze, executed on the inference pool.
+    Loads the audio, runs ASR + pronunciation scoring and computes the per-letter correctness mask
+    (left as None when include_letter_mask is False, so the caller can compute it later).
+    With an assignment_id, the target side comes precompiled from the assignment cache.
+    """
+    compiled_target = None
+    if assignment_id is not None:
+        compiled_target = compiled_targets.get(assignment_id, target_text)
 
+    # Load and process audio
+    logger.info("Loading audio file")
+    audio_tensor = load_audio_bytes(audio_bytes, file_extension)
+    logger.debug(
+        "Audio loaded"
+    )
+    
+    # Process pronunciation
+    logger.info("Processing pronunciation")
+    result = model_loader.get().process_audio_for_given_text(audio_tensor, target_text, compiled_target)
+    logger.debug(
+        "Pronunciation processed"
+    )
     
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
+    return {
+        "result": result,
+        "word_comparisons": _get_word_comparisons(result),
+        "is_letter_correct_all_words": _get_letter_correctness(result) if include_letter_mask else None,
+    }
 
-    if not supabase_url or not supabase_key:
-        raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables.")
 
-    # Initialize the Supabase client
-    supabase_client = create_client(supabase_url, supabase_key)
+def _get_word_comparisons(result: Dict[str, Any]) -> List[Dict[str, str]]:
+    # Prepare word comparisons for response
+    return [
+        {
+            "target_word": pair[0],
+            "transcribed_word": pair[1],
+            "target_phonemes": ipa_pair[0],
+            "transcribed_phonemes": ipa_pair[1]
+        }
+        for pair, ipa_pair in zip(
+            result["real_and_transcribed_words"], 
+            result["real_and_transcribed_words_ipa"]
+        )
+    ]
+
 
-    # Initialize database with default data
-    # initialize_database()
+def _get_letter_correctness(result: Dict[str, Any]) -> str:
+    """Per-letter '1'/'0' mask of every target word, words separated (and followed) by a space."""
+    real_transcripts = ' '.join([word[0] for word in result['real_and_transcribed_words']])
+    matched_transcripts = ' '.join([word[1] for word in result['real_and_transcribed_words']])
+    
+    words_real = real_transcripts.lower().split()
+    mapped_words = matched_transcripts.split()
+    
+    
+    is_letter_correct_all_words = ''
+    for idx, word_real in enumerate(words_real):
+
+        mapped_letters, mapped_letters_indices = get_best_mapped_words(
+            mapped_words[idx], word_real)
+        mapped_letters = list(map(lambda x: x.lower(), mapped_letters))
+        word_real = word_real.lower()
+        is_letter_correct = getWhichLettersWereTranscribedCorrectly(
+            word_real, mapped_letters)
+
+        is_letter_correct_all_words += ''.join([str(is_correct) for is_correct in is_letter_correct]) + ' '
+
+    return is_letter_correct_all_words
 
 
 @app.post("/analyze")
@@ -91,7 +338,9 @@ async def analyze(
     request: Request,
     audio_file: UploadFile = File(..., description="Audio file to analyze"),
     target_text: str = Form(..., description="Target text to compare against"),
-    include_ai_feedback: bool = Form(True, description="Whether to include AI-generated feedback")
+    include_ai_feedback: bool = Form(True, description="Whether to include AI-generated feedback"),
+    assignment_id: Optional[int] = Form(None, description="Assignment the target text belongs to, reuses its precompiled target"),
+    defer_ai_feedback: bool = Form(False, description="Return the score right away and generate AI feedback in the background")
 ):
     """
     Check pronunciation accuracy of uploaded audio against target text by converting to IPA phonemes and comparing.
@@ -100,6 +349,9 @@ async def analyze(
         audio_file: Audio file (supports common formats like wav, mp3, ogg)
         target_text: Target text to compare pronunciation against
         include_ai_feedback: Whether to include AI-generated feedback (default: True)
+        assignment_id: Optional assignment the target text belongs to
+        defer_ai_feedback: Answer without waiting for the LLM; `ai_feedback` is then null and the
+            feedback is fetched from /feedback/{feedback_job_id} (or its SSE stream)
     
     Returns:
         JSON response with pronunciation analysis results and AI feedback
@@ -117,144 +369,135 @@ async def analyze(
             raise HTTPException(status_code=400, detail="Target text cannot be empty")
         
         # Check file type
-        allowed_extensions = {'.wav', '.mp3', '.ogg', '.m4a', '.flac'}
         file_extension = os.path.splitext(audio_file.filename)[1].lower()
-        if file_extension not in allowed_extensions:
+        if file_extension not in ALLOWED_AUDIO_EXTENSIONS:
             logger.warning(
                 "Unsupported file type"
             )
             raise HTTPException(
                 status_code=400, 
-                detail=f"Unsupported file type. Allowed: {', '.join(sorted(allowed_extensions))}"
+                detail=f"Unsupported file type. Allowed: {', '.join(sorted(ALLOWED_AUDIO_EXTENSIONS))}"
             )
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            content = await audio_file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-
-        logger.debug(
-            "Saved uploaded file to temp path"        )
+        # Decode straight from the uploaded bytes, no temp file round-trip
+        content = await audio_file.read()
+        logger.debug("Read uploaded file into memory")
         
-        try:
-            # Load and process audio
-            logger.info("Loading audio file")
-            audio_tensor = load_audio_file(temp_file_path)
-            logger.debug(
-                "Audio loaded"
-            )
-            
-            # Process pronunciation
-            logger.info("Processing pronunciation")
-            result = pronunciation_trainer.process_audio_for_given_text(audio_tensor, target_text)
-            logger.debug(
-                "Pronunciation processed"
-            )
-            
-            # Prepare word comparisons for response
-            word_comparisons = [
-                {
-                    "target_word": pair[0],
-                    "transcribed_word": pair[1],
-                    "target_phonemes": ipa_pair[0],
-                    "transcribed_phonemes": ipa_pair[1]
-                }
-                for pair, ipa_pair in zip(
-                    result["real_and_transcribed_words"], 
-                    result["real_and_transcribed_words_ipa"]
+        feedback_generator = get_ai_feedback() if include_ai_feedback else None
+        defer_feedback = defer_ai_feedback and feedback_generator is not None
+        # With AI_FEEDBACK_CONCURRENT the LLM call overlaps the letter mask computation
+        overlap_feedback = AI_FEEDBACK_CONCURRENT and feedback_generator is not None and not defer_feedback
+
+        # Retries and re-reviews upload the same bytes, a cached analysis skips decoding and ASR entirely
+        result_key = content_key(hashlib.sha256(content).hexdigest(), target_text, _get_trainer().model_version)
+        analysis = await result_cache.aget(result_key)
+        if analysis is not None:
+            logger.info("Analysis served from result cache")
+            overlap_feedback = False
+        else:
+            try:
+                analysis = await inference_executor.run(
+                    _run_pronunciation_analysis, content, file_extension, target_text, assignment_id,
+                    not overlap_feedback)
+            except InferenceQueueFullError as e:
+                logger.warning("Inference queue full, rejecting request", extra={"client_host": client_host})
+                raise HTTPException(
+                    status_code=429,
+                    detail="Server is busy analyzing other recordings, please retry shortly",
+                    headers={"Retry-After": str(e.retry_after)}
                 )
-            ]
-            
-            real_transcripts = ' '.join([word[0] for word in result['real_and_transcribed_words']])
-            matched_transcripts = ' '.join([word[1] for word in result['real_and_transcribed_words']])
-            
-            words_real = real_transcripts.lower().split()
-            mapped_words = matched_transcripts.split()
-            
-            
-            is_letter_correct_all_words = ''
-            for idx, word_real in enumerate(words_real):
-
-                mapped_letters, mapped_letters_indices = get_best_mapped_words(
-                    mapped_words[idx], word_real)
-                mapped_letters = list(map(lambda x: x.lower(), mapped_letters))
-                word_real = word_real.lower()
-                is_letter_correct = getWhichLettersWereTranscribedCorrectly(
-                    word_real, mapped_letters)
-
-                is_letter_correct_all_words += ''.join([str(is_correct) for is_correct in is_letter_correct]) + ' '
-            # Get overall quality description
-            overall_quality = _get_quality_description(result["pronunciation_accuracy"])
-            logger.info(
-                "Computed overall quality"
-            )
-            
-            # Generate AI feedback if include_ai_feedback is True
-            ai_feedback = None
-            if include_ai_feedback:
-                logger.info("Attempting AI feedback generation")
-                feedback_generator = get_ai_feedback()
-                if feedback_generator:
-                    logger.debug("AI feedback generator available")
-                    ai_feedback = feedback_generator.generate_feedback(
-                        pronunciation_score=float(result["pronunciation_accuracy"]),
-                        target_text=result["target_text"],
-                        transcribed_text=result["recording_transcript"],
-                        word_comparisons=word_comparisons,
-                        overall_quality=overall_quality,
-                        is_letter_correct_all_words=is_letter_correct_all_words.strip()
-                    )
+            if not overlap_feedback:
+                await result_cache.aset(result_key, analysis)
+        result = analysis["result"]
+        word_comparisons = analysis["word_comparisons"]
+        is_letter_correct_all_words = analysis["is_letter_correct_all_words"]
+
+        # Get overall quality description
+        overall_quality = _get_quality_description(result["pronunciation_accuracy"])
+        logger.info(
+            "Computed overall quality"
+        )
+        
+        # Generate AI feedback if include_ai_feedback is True
+        ai_feedback = None
+        feedback_job = None
+        if include_ai_feedback:
+            logger.info("Attempting AI feedback generation")
+            if feedback_generator:
+                logger.debug("AI feedback generator available")
+                generate_feedback = functools.partial(
+                    feedback_generator.generate_feedback,
+                    pronunciation_score=float(result["pronunciation_accuracy"]),
+                    target_text=result["target_text"],
+                    transcribed_text=result["recording_transcript"],
+                    word_comparisons=word_comparisons,
+                    overall_quality=overall_quality,
+                    is_letter_correct_all_words=None if overlap_feedback else is_letter_correct_all_words.strip()
+                )
+                if defer_feedback:
+                    try:
+                        feedback_job = feedback_jobs.submit(generate_feedback)
+                        logger.info("AI feedback deferred")
+                    except FeedbackQueueFullError:
+                        logger.warning("Feedback queue full, using fallback")
+                        ai_feedback = _generate_fallback_feedback(
+                            pronunciation_score=float(result["pronunciation_accuracy"]),
+                            overall_quality=overall_quality
+                        )
+                elif overlap_feedback:
+                    # The prompt went out without the letter mask, compute it while the LLM answers
+                    feedback_task = asyncio.create_task(generate_feedback())
+                    is_letter_correct_all_words = await asyncio.to_thread(_get_letter_correctness, result)
+                    await result_cache.aset(result_key, {**analysis, "is_letter_correct_all_words": is_letter_correct_all_words})
+                    ai_feedback = await feedback_task
                     logger.info("AI feedback generated")
                 else:
-                    logger.warning("AI feedback generator unavailable, using fallback")
-                    ai_feedback = _generate_fallback_feedback(
-                        pronunciation_score=float(result["pronunciation_accuracy"]),
-                        overall_quality=overall_quality
-                    )
+                    ai_feedback = await generate_feedback()
+                    logger.info("AI feedback generated")
             else:
-                logger.info("AI feedback skipped per request, using fallback")
+                logger.warning("AI feedback generator unavailable, using fallback")
                 ai_feedback = _generate_fallback_feedback(
                     pronunciation_score=float(result["pronunciation_accuracy"]),
                     overall_quality=overall_quality
                 )
-                
-            if result["pronunciation_accuracy"] < 0:
-                result["pronunciation_accuracy"] = 0
-            # Prepare response
-            response = {
-                "success": True,
-                "pronunciation_score": float(result["pronunciation_accuracy"]),
-                "target_text": result["target_text"],
-                "transcribed_text": result["recording_transcript"],
-                "word_comparisons": word_comparisons,  # Detailed comparison info
-                "overall_quality": overall_quality,
-                "ai_feedback": ai_feedback,
-                "is_letter_correct_all_words": is_letter_correct_all_words.strip(),
-                "length_of_target_text": len(result["target_text"]),
-                "length_of_analyzed_text": len(is_letter_correct_all_words.strip())
-                
-            }
-    
-            logger.info(
-                "Analysis completed successfully",
-                extra={
-                    "client_host": client_host,
-                    "pronunciation_score": response["pronunciation_score"],
-                    "target_len": len(response["target_text"]),
-                    "transcribed_len": len(response["transcribed_text"] or ""),
-                },
+        else:
+            logger.info("AI feedback skipped per request, using fallback")
+            ai_feedback = _generate_fallback_feedback(
+                pronunciation_score=float(result["pronunciation_accuracy"]),
+                overall_quality=overall_quality
             )
-            return response
             
-        finally:
-            # Clean up temporary file
-            if 'temp_file_path' in locals() and os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                    logger.debug("Temporary file removed", extra={"client_host": client_host, "temp_file_path": temp_file_path})
-                except Exception as cleanup_err:
-                    logger.exception("Failed to remove temporary file", extra={"client_host": client_host, "temp_file_path": temp_file_path})
+        if result["pronunciation_accuracy"] < 0:
+            result["pronunciation_accuracy"] = 0
+        # Prepare response
+        response = {
+            "success": True,
+            "pronunciation_score": float(result["pronunciation_accuracy"]),
+            "target_text": result["target_text"],
+            "transcribed_text": result["recording_transcript"],
+            "word_comparisons": word_comparisons,  # Detailed comparison info
+            "overall_quality": overall_quality,
+            "ai_feedback": ai_feedback,
+            "feedback_job_id": feedback_job.job_id if feedback_job is not None else None,
+            "is_letter_correct_all_words": is_letter_correct_all_words.strip(),
+            "length_of_target_text": len(result["target_text"]),
+            "length_of_analyzed_text": len(is_letter_correct_all_words.strip())
+            
+        }
+        if "phoneme_scores" in result:
+            # Per-phoneme GOP scores and timings of the forced alignment engine
+            response["phoneme_scores"] = result["phoneme_scores"]
+
+        logger.info(
+            "Analysis completed successfully",
+            extra={
+                "client_host": client_host,
+                "pronunciation_score": response["pronunciation_score"],
+                "target_len": len(response["target_text"]),
+                "transcribed_len": len(response["transcribed_text"] or ""),
+            },
+        )
+        return response
                 
     except HTTPException:
         # Already meaningful; FastAPI will handle, but log at appropriate level
@@ -264,6 +507,222 @@ async def analyze(
         logger.exception("Unhandled error in /analyze", extra={"client_host": client_host})
         raise HTTPException(status_code=500, detail=f"Error processing audio: {str(e)}")
     
+@app.get("/feedback/{job_id}")
+async def get_feedback(job_id: str = Path(...)):
+    """Deferred AI feedback: status is pending, done or failed; ai_feedback is set once done."""
+    job = feedback_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired feedback job")
+    return job.to_dict()
+
+
+@app.get("/feedback/{job_id}/events")
+async def stream_feedback(job_id: str = Path(...)):
+    """Server-sent events: one `feedback` event when the job finishes, comment heartbeats until then."""
+    job = feedback_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired feedback job")
+
+    async def events():
+        while not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=FEEDBACK_SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+        yield f"event: feedback\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def _decode_batch_item(item: Dict[str, Any]):
+    """Decoded audio of a batch item, or the exception that prevented decoding it."""
+    try:
+        return load_audio_bytes(item["content"], item["file_extension"])
+    except Exception as e:
+        return e
+
+
+def _batch_error_line(item: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+    return {"index": item["index"], "filename": item["filename"], "success": False,
+            "error": str(error) or type(error).__name__}
+
+
+def _run_batch_analysis(items: List[Dict[str, Any]], assignment_id: Optional[int], emit) -> None:
+    """
+    Blocking part of /analyze/batch, executed on the inference pool as a single job.
+    Uploads are decoded in parallel, then scored `ANALYZE_BATCH_ASR_SIZE` clips per ASR call.
+    `emit` is called with one NDJSON record per item as soon as that item is done.
+    """
+    with ThreadPoolExecutor(max_workers=ANALYZE_BATCH_DECODE_WORKERS, thread_name_prefix="batch-decode") as decode_pool:
+        decoded = list(decode_pool.map(_decode_batch_item, items))
+
+    scored_items, audios = [], []
+    for item, audio in zip(items, decoded):
+        if isinstance(audio, Exception):
+            emit(_batch_error_line(item, audio))
+            continue
+        scored_items.append(item)
+        audios.append(audio)
+
+    target_texts = [item["target_text"] for item in scored_items]
+    targets = [
+        compiled_targets.get(assignment_id, target_text) if assignment_id is not None else None
+        for target_text in target_texts
+    ]
+    for position, result in model_loader.get().process_batch(
+            audios, target_texts, targets, batch_size=ANALYZE_BATCH_ASR_SIZE):
+        item = scored_items[position]
+        if isinstance(result, Exception):
+            emit(_batch_error_line(item, result))
+            continue
+        is_letter_correct_all_words = _get_letter_correctness(result).strip()
+        line = {
+            "index": item["index"],
+            "filename": item["filename"],
+            "success": True,
+            "pronunciation_score": max(0.0, float(result["pronunciation_accuracy"])),
+            "target_text": result["target_text"],
+            "transcribed_text": result["recording_transcript"],
+            "word_comparisons": _get_word_comparisons(result),
+            "overall_quality": _get_quality_description(result["pronunciation_accuracy"]),
+            "is_letter_correct_all_words": is_letter_correct_all_words,
+            "length_of_target_text": len(result["target_text"]),
+            "length_of_analyzed_text": len(is_letter_correct_all_words),
+        }
+        if "phoneme_scores" in result:
+            line["phoneme_scores"] = result["phoneme_scores"]
+        emit(line)
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(
+    audio_files: List[UploadFile] = File(..., description="Audio files to analyze"),
+    target_texts: List[str] = Form(..., description="Target text of each audio file, in the same order"),
+    assignment_id: Optional[int] = Form(None, description="Assignment the target texts belong to")
+):
+    """
+    Bulk pronunciation scoring, e.g. to regrade a whole class.
+    
+    Streams one JSON object per line (NDJSON) as each item completes, in completion order.
+    Every line carries the item's `index` and `filename`; failed items have `success: false` and an `error`.
+    AI feedback is not generated here.
+    """
+    if len(audio_files) != len(target_texts):
+        raise HTTPException(status_code=400, detail="Provide exactly one target_text per audio file")
+    if len(audio_files) > ANALYZE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {ANALYZE_BATCH_MAX_ITEMS} items per batch")
+
+    _get_trainer()
+    items = []
+    for index, (audio_file, target_text) in enumerate(zip(audio_files, target_texts)):
+        file_extension = os.path.splitext(audio_file.filename)[1].lower()
+        if file_extension not in ALLOWED_AUDIO_EXTENSIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported file type for {audio_file.filename}. Allowed: {', '.join(sorted(ALLOWED_AUDIO_EXTENSIONS))}"
+            )
+        if not target_text.strip():
+            raise HTTPException(status_code=400, detail=f"Target text of {audio_file.filename} cannot be empty")
+        items.append({
+            "index": index,
+            "filename": audio_file.filename,
+            "file_extension": file_extension,
+            "target_text": target_text,
+            "content": await audio_file.read(),
+        })
+
+    loop = asyncio.get_running_loop()
+    lines: asyncio.Queue = asyncio.Queue()
+
+    def emit(line: Dict[str, Any]) -> None:
+        loop.call_soon_threadsafe(lines.put_nowait, line)
+
+    try:
+        job = asyncio.ensure_future(inference_executor.run(_run_batch_analysis, items, assignment_id, emit))
+    except InferenceQueueFullError as e:
+        logger.warning("Inference queue full, rejecting batch")
+        raise HTTPException(
+            status_code=429,
+            detail="Server is busy analyzing other recordings, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    # Runs after every emitted line, call_soon_threadsafe callbacks keep their order
+    job.add_done_callback(lambda _: lines.put_nowait(None))
+    logger.info("Batch analysis started", extra={"items": len(items)})
+
+    async def stream_lines():
+        while True:
+            line = await lines.get()
+            if line is None:
+                break
+            yield json.dumps(line) + "\n"
+        if job.exception() is not None:
+            logger.error("Batch analysis failed", exc_info=job.exception())
+            yield json.dumps({"success": False, "error": f"Error processing batch: {job.exception()}"}) + "\n"
+
+    return StreamingResponse(stream_lines(), media_type="application/x-ndjson")
+
+
+@app.websocket("/analyze/stream")
+async def analyze_stream(websocket: WebSocket, target_text: str = Query(...)):
+    """
+    Streaming pronunciation analysis.
+    
+    The client sends binary messages with little-endian PCM16 mono audio at 16 kHz while the child speaks,
+    then the text message "end". The server pushes JSON events:
+        {"type": "word", ...}   per target word as soon as its alignment is final
+        {"type": "final", ...}  overall score once the remaining tail is decoded, then the socket closes
+        {"type": "error", ...}  on failure (e.g. inference queue full, with retry_after in seconds)
+    """
+    await websocket.accept()
+    if not target_text.strip():
+        await websocket.send_json({"type": "error", "detail": "Target text cannot be empty"})
+        await websocket.close(code=1008)
+        return
+    if not model_loader.is_ready:
+        await websocket.send_json({"type": "error", "detail": "Models are not ready yet, please retry shortly", "retry_after": 5})
+        await websocket.close(code=1013)
+        return
+
+    if model_loader.get().asr_model is None:
+        # Streaming scores partial transcripts, the forced alignment engine does not produce any
+        await websocket.send_json({"type": "error", "detail": "Streaming analysis requires SCORING_ENGINE=whisper"})
+        await websocket.close(code=1003)
+        return
+
+    session = StreamingPronunciationSession(model_loader.get(), target_text)
+    logger.info("Streaming analysis session opened")
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                logger.info("Streaming client disconnected before end")
+                return
+            if message.get("bytes") is not None:
+                events = await inference_executor.run(session.add_chunk, message["bytes"])
+            elif message.get("text") == "end":
+                events = await inference_executor.run(session.finish)
+                for event in events:
+                    await websocket.send_json(event)
+                await websocket.close()
+                logger.info("Streaming analysis completed")
+                return
+            else:
+                continue
+            for event in events:
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        logger.info("Streaming client disconnected")
+    except InferenceQueueFullError as e:
+        logger.warning("Inference queue full, closing streaming session")
+        await websocket.send_json({"type": "error", "detail": "Server is busy, please retry shortly", "retry_after": e.retry_after})
+        await websocket.close(code=1013)
+    except Exception as e:
+        logger.exception("Unhandled error in /analyze/stream")
+        await websocket.send_json({"type": "error", "detail": f"Error processing audio: {str(e)}"})
+        await websocket.close(code=1011)
+
+    
 # SUBMISSIONS
 @app.post("/submissions")
 async def create_submission(payload: Dict[str, Any] = Body(...)):
@@ -277,9 +736,9 @@ async def create_submission(payload: Dict[str, Any] = Body(...)):
             **payload,
             "created_at": datetime.now(timezone.utc).isoformat()
         }
-        res = supabase_client.table("submissions").insert(enriched).execute()
+        data = await repository.create_submission(enriched)
         
-        return {"data": res.data}
+        return {"data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -301,44 +760,66 @@ async def update_submission_grade_feedback(
             update_fields["feedback"] = feedback
         if not update_fields:
             raise HTTPException(status_code=400, detail="Nothing to update.")
-        res = (
-            supabase_client.table("submissions")
-            .update(update_fields)
-            .eq("id", submission_id)
-            .execute()
-        )
-        return {"data": res.data}
+        data = await repository.update_submission(submission_id, update_fields)
+        return {"data": data}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/submissions")
-async def get_submissions_by_assignment(assignment_id: int = Query(...)):
+async def get_submissions_by_assignment(
+    assignment_id: int = Query(...),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+):
     """
-    Get submissions filtered by assignment_id.
+    Get submissions filtered by assignment_id, one page at a time.
     """
     try:
-        res = (
-            supabase_client.table("submissions")
-            .select("*")
-            .eq("assignment_id", assignment_id)
-            .execute()
-        )
-        return {"data": res.data}
+        page = await repository.list_submissions(assignment_id, limit, cursor, fields)
+        return {"data": page.rows, "next_cursor": page.next_cursor}
+    except PageRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
         
+def _not_modified(request: Request, response: Response, entry: CachedQuery) -> Optional[Response]:
+    """
+    Set the ETag of a cached read; a 304 to return instead when the client's copy is still current, which
+    carries the headers already set on `response` (e.g. X-Next-Cursor).
+    """
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers={**response.headers, **headers})
+    response.headers.update(headers)
+    return None
+
 # ASSIGNMENTS
 @app.get("/assignments")
-async def get_assignments(assigned_to: Optional[str] = Query(None)):
-    """Get all assignments or filter by assigned_to when provided."""
+async def get_assignments(
+    request: Request,
+    response: Response,
+    assigned_to: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+):
+    """
+    Get all assignments or filter by assigned_to when provided, one page at a time.
+    Served from the query cache; answers 304 when If-None-Match names the current ETag.
+    """
     try:
-        query = supabase_client.table("assignments").select("*")
-        if assigned_to is not None:
-            query = query.eq("assigned_to", assigned_to)
-        res = query.execute()
-        return {"data": res.data}
+        async def load():
+            page = await repository.list_assignments(limit, cursor, fields, assigned_to=assigned_to)
+            return {"data": page.rows, "next_cursor": page.next_cursor}
+
+        entry = await query_cache.get_or_load(
+            "assignments", {"assigned_to": assigned_to, "limit": limit, "cursor": cursor, "fields": fields}, load)
+        return _not_modified(request, response, entry) or entry.value
+    except PageRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -354,9 +835,15 @@ async def create_assignment(payload: Dict[str, Any] = Body(...)):
             **payload,
             "created_at": datetime.now(timezone.utc).isoformat()
         }
-        res = supabase_client.table("assignments").insert(enriched).execute()
+        try:
+            data = await repository.create_assignment(enriched)
+        finally:
+            # Also after a failed call, which may still have been applied (e.g. a timeout)
+            await query_cache.invalidate("assignments")
+        for assignment in data or []:
+            compiled_targets.compile_assignment(assignment["id"], assignment.get("detail"))
 
-        return {"data": res.data}
+        return {"data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -371,13 +858,14 @@ async def update_assignment(
     try:
         if not payload:
             raise HTTPException(status_code=400, detail="No fields provided.")
-        res = (
-            supabase_client.table("assignments")
-            .update(payload)
-            .eq("id", assignment_id)
-            .execute()
-        )
-        return {"data": res.data}
+        try:
+            data = await repository.update_assignment(assignment_id, payload)
+        finally:
+            await query_cache.invalidate("assignments")
+        compiled_targets.invalidate(assignment_id)
+        for assignment in data or []:
+            compiled_targets.compile_assignment(assignment["id"], assignment.get("detail"))
+        return {"data": data}
     except HTTPException:
         raise
     except Exception as e:
@@ -386,15 +874,30 @@ async def update_assignment(
 # STUDENTS
 
 @app.get("/students", response_model=List[Dict[str, Any]])
-async def get_all_students():
+async def get_all_students(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+):
     """
-    Retrieve all student details from the database.
-    Returns a list of all students with their complete information.
+    Retrieve student details from the database, one page at a time.
+    Returns a list of students without pw_hash (naming it in fields answers 400); the cursor of the next page
+    is sent in the X-Next-Cursor header. Served from the query cache, with ETag / If-None-Match.
     """
     try:
-        # Fetch all students from the students table
-        res = supabase_client.table("students").select("*").execute()
-        return res.data
+        async def load():
+            page = await repository.list_students(limit, cursor, fields)
+            return {"data": page.rows, "next_cursor": page.next_cursor}
+
+        entry = await query_cache.get_or_load(
+            "students", {"limit": limit, "cursor": cursor, "fields": fields}, load)
+        if entry.value["next_cursor"] is not None:
+            response.headers["X-Next-Cursor"] = entry.value["next_cursor"]
+        return _not_modified(request, response, entry) or entry.value["data"]
+    except PageRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving students: {str(e)}")
 
@@ -409,8 +912,11 @@ async def create_student(payload: Dict[str, Any] = Body(...)):
             **payload,
             "created_at": datetime.now(timezone.utc).isoformat()
         }
-        res = supabase_client.table("students").insert(enriched).execute()
-        return {"data": res.data}
+        try:
+            data = await repository.create_student(enriched)
+        finally:
+            await query_cache.invalidate("students")
+        return {"data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -427,29 +933,29 @@ async def create_forum_post(payload: Dict[str, Any] = Body(...)):
             **payload,
             "created_at": datetime.now(timezone.utc).isoformat()
         }
-        res = (
-            supabase_client
-            .table("posts")
-            .insert(enriched)
-            .execute()
-        )
-        return {"data": res.data}
+        data = await repository.create_post(enriched)
+        return {"data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/posts")
-async def get_forum_posts_by_author(author: str = Query(...)):
+async def get_forum_posts_by_author(
+    author: str = Query(...),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+):
     """
-    Get forum posts by author.
+    Get forum posts by author, one page at a time.
     """
     try:
-        res = (
-            supabase_client.table("posts")
-            .select("*")
-            .eq("author", author)
-            .execute()
-        )
-        return {"data": res.data}
+        if like_buffer is not None:
+            # Read-your-writes: buffered likes land before the counts are read
+            await like_buffer.flush("posts")
+        page = await repository.list_posts(author, limit, cursor, fields)
+        return {"data": page.rows, "next_cursor": page.next_cursor}
+    except PageRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -459,14 +965,17 @@ async def get_forum_posts_by_author(author: str = Query(...)):
 async def increment_post_likes(post_id: int = Path(...)) -> Dict[str, Any]:
     """
     Increment the 'likes' column by 1 for the specified post via RPC.
-    Returns the updated row.
+    Returns the updated row; with LIKE_WRITE_BEHIND the like is buffered and the count is optimistic.
     """
     try:
-        rpc_res = supabase_client.rpc("increment_post_likes", {"p_id": post_id}).execute()
-        if not rpc_res.data:
+        if like_buffer is not None:
+            data = await like_buffer.like("posts", post_id)
+        else:
+            data = await repository.increment_post_likes(post_id)
+        if not data:
             # When the function doesn't update any row (e.g., id not found)
             raise HTTPException(status_code=404, detail="Post not found")
-        return {"data": rpc_res.data}
+        return {"data": data}
     except HTTPException:
         raise
     except Exception as e:
@@ -484,31 +993,28 @@ async def create_comment(payload: Dict[str, Any] = Body(...)):
             **payload,
             "created_at": datetime.now(timezone.utc).isoformat()
         }
-        res = (
-            supabase_client
-            .table("comments")
-            .insert(enriched)
-            .execute()
-        )
-        return {"data": res.data}
+        data = await repository.create_comment(enriched)
+        return {"data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/comments")
-async def get_comments_by_post(post_id: int = Query(..., alias="post_id")):
+async def get_comments_by_post(
+    post_id: int = Query(..., alias="post_id"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+):
     """
-    Get comments for a given post id.
+    Get comments for a given post id, oldest first, one page at a time.
     """
     try:
-        res = (
-            supabase_client
-            .table("comments")
-            .select("*")
-            .eq("post", post_id)
-            .order("created_at", desc=False)
-            .execute()
-        )
-        return {"data": res.data}
+        if like_buffer is not None:
+            await like_buffer.flush("comments")
+        page = await repository.list_comments(post_id, limit, cursor, fields)
+        return {"data": page.rows, "next_cursor": page.next_cursor}
+    except PageRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -516,14 +1022,17 @@ async def get_comments_by_post(post_id: int = Query(..., alias="post_id")):
 async def increment_comment_likes(comment_id: int = Path(...)) -> Dict[str, Any]:
     """
     Increment the 'likes' column by 1 for the specified comment via RPC.
-    Returns the updated row.
+    Returns the updated row; with LIKE_WRITE_BEHIND the like is buffered and the count is optimistic.
     """
     try:
-        rpc_res = supabase_client.rpc("increment_comment_likes", {"c_id": comment_id}).execute()
-        if not rpc_res.data:
+        if like_buffer is not None:
+            data = await like_buffer.like("comments", comment_id)
+        else:
+            data = await repository.increment_comment_likes(comment_id)
+        if not data:
             # When the function doesn't update any row (e.g., id not found)
             raise HTTPException(status_code=404, detail="Comment not found")
-        return {"data": rpc_res.data}
+        return {"data": data}
     except HTTPException:
         raise
     except Exception as e:
@@ -536,5 +1045,28 @@ if __name__ == "__main__":
     host = "0.0.0.0"
     port = int(os.getenv("PORT", "8000"))
     
-    logger.info(f"Starting server on {host}:{port}")
-    uvicorn.run(app, host=host, port=port)
\ No newline at end of file
+    # WEB_WORKERS > 1 forks that many server processes after loading the models once in this process,
+    # so they share the weights copy-on-write (WEB_PRELOAD=false loads one copy per worker instead)
+    web_workers = int(os.getenv("WEB_WORKERS", "1"))
+    if web_workers > 1:
+        from app.prefork import serve_prefork
+
+        preload = os.getenv("WEB_PRELOAD", "true").lower() == "true"
+        if preload and SCORING_ENGINE == "whisper" and os.getenv("ASR_BACKEND", "transformers") == "ctranslate2":
+            # CTranslate2 starts native worker threads when the model is built, they do not survive fork()
+            logger.warning("WEB_PRELOAD is not supported with ASR_BACKEND=ctranslate2, loading per worker")
+            preload = False
+
+        def preload_models():
+            if not model_loader.load():
+                raise RuntimeError(f"Model preload failed: {model_loader.error}")
+
+        logger.info(f"Starting {web_workers} workers on {host}:{port} (preload={preload})")
+        serve_prefork(
+            app, host, port, web_workers,
+            preload=preload_models if preload else None,
+            torch_threads=int(os.getenv("TORCH_THREADS_PER_WORKER", "0")) or None,
+        )
+    else:
+        logger.info(f"Starting server on {host}:{port}")
+        uvicorn.run(app, host=host, port=port)
\ No newline at end of file
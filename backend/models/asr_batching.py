@@ -0,0 +1,109 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Union
+
+import numpy as np
+import torch
+
+from .interfaces import TranscriptionResult
+
+
+class _PendingDecode:
+    def __init__(self, audio: Union[np.ndarray, torch.Tensor]):
+        self.audio = audio
+        self.future = Future()
+
+
+class BatchingASRScheduler:
+    """
+    Dynamic micro-batching in front of an ASR model exposing `transcribe_batch`.
+
+    Callers (typically inference pool threads) block in `submit`; a single scheduler thread
+    collects clips until either `max_batch_size` is reached or `max_wait_ms` has elapsed since
+    the first clip arrived, decodes them as one padded batch and routes each result back.
+    """
+
+    def __init__(self, asr_model, max_batch_size: int = 8, max_wait_ms: float = 20.0):
+        self.asr_model = asr_model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches_total = 0
+        self._clips_total = 0
+        self._worker = None
+        self._worker_pid = None
+
+    def submit(self, audio: Union[np.ndarray, torch.Tensor]) -> TranscriptionResult:
+        """Queue a clip for the next batch and wait for its transcription."""
+        self._ensure_worker()
+        pending = _PendingDecode(audio)
+        self._queue.put(pending)
+        return pending.future.result()
+
+    def _ensure_worker(self):
+        # Threads do not survive fork(): start the scheduler thread lazily in whichever process submits,
+        # so workers forked from a preloading parent each get their own
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+                self._worker = threading.Thread(target=self._run, name="asr-batching", daemon=True)
+                self._worker.start()
+                self._worker_pid = os.getpid()
+
+    def _collect_batch(self, first: _PendingDecode) -> List[_PendingDecode]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if pending is None:
+                # Shutdown requested, finish the current batch first
+                self._queue.put(None)
+                break
+            batch.append(pending)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect_batch(first)
+            try:
+                results = self.asr_model.transcribe_batch([pending.audio for pending in batch])
+            except Exception as e:
+                for pending in batch:
+                    pending.future.set_exception(e)
+                continue
+            for pending, result in zip(batch, results):
+                pending.future.set_result(result)
+            with self._lock:
+                self._batches_total += 1
+                self._clips_total += len(batch)
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches_total": self._batches_total,
+                "clips_total": self._clips_total,
+                "average_batch_size": self._clips_total / self._batches_total if self._batches_total else 0.0,
+            }
+
+    def shutdown(self):
+        if self._worker is None or self._worker_pid != os.getpid():
+            return
+        self._queue.put(None)
+        self._worker.join()
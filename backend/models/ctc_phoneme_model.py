@@ -0,0 +1,80 @@
+import os
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+import torch
+
+# eng_to_ipa writes some phonemes differently from the espeak-based vocabularies of wav2vec2 phoneme
+# models; each unit is replaced by its espeak spelling when the model knows that one
+_ESPEAK_SPELLINGS = {
+    "ʧ": "tʃ", "ʤ": "dʒ", "r": "ɹ", "ər": "ɚ",
+    "i": "iː", "u": "uː", "ɑ": "ɑː", "ɔ": "ɔː",
+}
+_STRESS_MARKS = "ˈˌ"
+
+
+class CTCPhonemeModel:
+    """
+    A wav2vec2-style CTC acoustic model over phonemes. One non-autoregressive forward pass gives the
+    per-frame phoneme log-posteriors that forced alignment and goodness-of-pronunciation work on.
+    """
+
+    def __init__(self, model_name: str = "facebook/wav2vec2-lv-60-espeak-cv-ft"):
+        # Imported here so the API process can bind before transformers is loaded
+        from transformers import AutoTokenizer, Wav2Vec2FeatureExtractor, Wav2Vec2ForCTC
+
+        # do_phonemize=False: only the vocabulary is needed, not the phonemizer backend
+        tokenizer = AutoTokenizer.from_pretrained(model_name, do_phonemize=False)
+        self.feature_extractor = Wav2Vec2FeatureExtractor.from_pretrained(model_name)
+        self.model = Wav2Vec2ForCTC.from_pretrained(model_name).eval()
+        self.vocab: Dict[str, int] = tokenizer.get_vocab()
+        self.blank_id = tokenizer.pad_token_id
+        self.special_ids = set(tokenizer.all_special_ids)
+        self.id_to_unit = {index: unit for unit, index in self.vocab.items()}
+        self._max_unit_length = max(len(unit) for unit in self.vocab)
+        self.sample_rate = 16000
+        self.frame_seconds = self.model.config.inputs_to_logits_ratio / self.sample_rate
+        # Identifies the weights in result cache keys
+        self.model_version = f"ctc:{model_name}"
+
+    def log_posteriors(self, audios: Sequence[Union[np.ndarray, torch.Tensor]]) -> List[torch.Tensor]:
+        """Frame-level log-posteriors (frames x vocabulary) of each clip, all clips in one padded forward pass."""
+        inputs = []
+        for audio in audios:
+            if isinstance(audio, torch.Tensor):
+                audio = audio.detach().cpu().numpy()
+            inputs.append(audio[0])
+        features = self.feature_extractor(inputs, sampling_rate=self.sample_rate, return_tensors="pt",
+                                          padding=True, return_attention_mask=True)
+        with torch.inference_mode():
+            logits = self.model(features.input_values, attention_mask=features.attention_mask).logits
+            lengths = self.model._get_feat_extract_output_lengths(features.attention_mask.sum(-1))
+        log_probs = torch.log_softmax(logits.float(), dim=-1)
+        return [log_probs[index, :int(length)] for index, length in enumerate(lengths)]
+
+    def units_for_ipa(self, ipa: str) -> List[str]:
+        """
+        Split an IPA word (as written by eng_to_ipa) into units of the model's vocabulary, longest match
+        first. Stress marks, punctuation and symbols the model does not know are dropped.
+        """
+        ipa = "".join(char for char in ipa if char not in _STRESS_MARKS)
+        units = []
+        position = 0
+        while position < len(ipa):
+            for length in range(min(self._max_unit_length, len(ipa) - position), 0, -1):
+                piece = ipa[position:position + length]
+                spelling = _ESPEAK_SPELLINGS.get(piece)
+                if spelling is not None and spelling in self.vocab:
+                    units.append(spelling)
+                    break
+                if piece in self.vocab and self.vocab[piece] not in self.special_ids and piece.strip():
+                    units.append(piece)
+                    break
+            else:
+                length = 1
+            position += length
+        return units
+
+
+def get_ctc_phoneme_model() -> CTCPhonemeModel:
+    return CTCPhonemeModel(os.getenv("CTC_PHONEME_MODEL", "facebook/wav2vec2-lv-60-espeak-cv-ft"))
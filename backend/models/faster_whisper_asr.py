@@ -0,0 +1,70 @@
+import os
+from dataclasses import asdict
+from typing import List, Union
+
+import numpy as np
+import torch
+
+from .interfaces import IASRModel, TranscriptionResult, WordLocation
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError:  # optional dependency, only needed for ASR_BACKEND=ctranslate2
+    WhisperModel = None
+
+
+class FasterWhisperASRModel(IASRModel):
+    """
+    Whisper running on CTranslate2 with int8 weights (faster-whisper).
+    Much cheaper than the fp32 transformers pipeline on CPU-only nodes, same word-location format.
+    """
+
+    def __init__(self, model_name="base", compute_type="int8", cpu_threads: int = 0, num_workers: int = 1):
+        if WhisperModel is None:
+            raise ImportError("faster-whisper is required for the ctranslate2 ASR backend: pip install faster-whisper")
+        # num_workers > 1 lets several threads decode concurrently on the same loaded weights
+        self.model = WhisperModel(model_name, device="cpu", compute_type=compute_type,
+                                  cpu_threads=cpu_threads, num_workers=num_workers)
+        self._last_result = TranscriptionResult(transcript="", word_locations=())
+        # Identifies the weights in result cache keys
+        self.model_version = f"ctranslate2:{model_name}:{compute_type}"
+        self.sample_rate = 16000
+
+    def transcribe(self, audio: Union[np.ndarray, torch.Tensor]) -> TranscriptionResult:
+        if isinstance(audio, torch.Tensor):
+            audio = audio.detach().cpu().numpy()
+        segments, _ = self.model.transcribe(audio[0].astype(np.float32), language="en",
+                                            beam_size=1, word_timestamps=True)
+
+        transcript = ""
+        word_locations = []
+        for segment in segments:
+            transcript += segment.text
+            for word_info in segment.words or []:
+                word_locations.append(WordLocation(word=word_info.word,
+                                                   start_ts=word_info.start * self.sample_rate,
+                                                   end_ts=word_info.end * self.sample_rate))
+        return TranscriptionResult(transcript=transcript, word_locations=tuple(word_locations))
+
+    def transcribe_batch(self, audios: List[Union[np.ndarray, torch.Tensor]]) -> List[TranscriptionResult]:
+        """CTranslate2 parallelises through num_workers rather than padded batches, decode one by one."""
+        return [self.transcribe(audio) for audio in audios]
+
+    def processAudio(self, audio: Union[np.ndarray, torch.Tensor]):
+        self._last_result = self.transcribe(audio)
+
+    def getTranscript(self) -> str:
+        return self._last_result.transcript
+
+    def getWordLocations(self) -> list:
+        return [asdict(word_location) for word_location in self._last_result.word_locations]
+
+
+def get_faster_whisper_model() -> FasterWhisperASRModel:
+    """Build the CTranslate2 model from ASR_CT2_* environment settings."""
+    return FasterWhisperASRModel(
+        model_name=os.getenv("ASR_CT2_MODEL", "base"),
+        compute_type=os.getenv("ASR_CT2_COMPUTE_TYPE", "int8"),
+        cpu_threads=int(os.getenv("ASR_CT2_CPU_THREADS", "0")),
+        num_workers=int(os.getenv("ASR_CT2_NUM_WORKERS", "1")),
+    )
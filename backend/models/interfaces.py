@@ -1,18 +1,42 @@
 import abc
 import numpy as np
-from typing import Union
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+
+@dataclass(frozen=True)
+class WordLocation:
+    """A transcribed word and its location in the audio, in samples."""
+    word: str
+    start_ts: Optional[float]
+    end_ts: float
+    tag: str = "processed"
+
+
+@dataclass(frozen=True)
+class TranscriptionResult:
+    """Immutable output of a single ASR decode."""
+    transcript: str
+    word_locations: Tuple[WordLocation, ...]
 
 
 class IASRModel(metaclass=abc.ABCMeta):
     @classmethod
     def __subclasshook__(cls, subclass):
-        return (hasattr(subclass, 'getTranscript') and
+        return (hasattr(subclass, 'transcribe') and
+                callable(subclass.transcribe) and
+                hasattr(subclass, 'getTranscript') and
                 callable(subclass.getTranscript) and
                 hasattr(subclass, 'getWordLocations') and
                 callable(subclass.getWordLocations) and
                 hasattr(subclass, 'processAudio') and
                 callable(subclass.processAudio))
 
+    @abc.abstractmethod
+    def transcribe(self, audio: Union[np.ndarray, 'torch.Tensor']) -> TranscriptionResult:
+        """Decode the audio without touching model state, safe to call from several threads"""
+        raise NotImplementedError
+
     @abc.abstractmethod
     def getTranscript(self) -> str:
         """Get the transcripts of the processed audio"""
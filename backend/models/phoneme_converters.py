@@ -1,20 +1,83 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
 import eng_to_ipa
+from eng_to_ipa.transcribe import _punct_replace_word, cmu_to_ipa, get_top, preserve_punc
 from .interfaces import ITextToPhonemModel
 
+_CMU_DICT_PATH = os.path.join(os.path.dirname(eng_to_ipa.__file__), "resources", "CMU_dict.db")
+
+
+def load_cmu_lexicon(path: str = _CMU_DICT_PATH) -> Dict[str, List[str]]:
+    """
+    Read the whole CMU dictionary shipped with eng_to_ipa into memory (word -> CMU pronunciations).
+    eng_to_ipa opens the sqlite file and runs a query on every convert() call; this is done once.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        lexicon = {}
+        for word, phonemes in connection.execute("SELECT word, phonemes FROM dictionary"):
+            lexicon.setdefault(word, []).append(phonemes)
+        return lexicon
+    finally:
+        connection.close()
+
 
 class EngPhonemConverter(ITextToPhonemModel):
-    def __init__(self) -> None:
-        pass
+    def __init__(self, cache_size: int = 50000) -> None:
+        self.lexicon = load_cmu_lexicon()
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
 
     def convertToPhonem(self, sentence: str) -> str:
-        phonem_representation = eng_to_ipa.convert(sentence)
+        with self._lock:
+            phonem_representation = self._cache.get(sentence)
+            if phonem_representation is not None:
+                self._cache.move_to_end(sentence)
+                self.hits += 1
+                return phonem_representation
+            self.misses += 1
+
+        phonem_representation = self._convert(sentence)
         phonem_representation = phonem_representation.replace('*', '')
+
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[sentence] = phonem_representation
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
         return phonem_representation
 
+    def _convert(self, sentence: str) -> str:
+        """Same output as eng_to_ipa.convert(sentence), with dictionary lookups served from memory."""
+        words = [preserve_punc(word.lower())[0] for word in sentence.split()]
+        cmu = [self.lexicon.get(word[1], ["__IGNORE__" + word[1]]) for word in words]
+        ipa = cmu_to_ipa(cmu, stress_marking='both')
+        ipa = _punct_replace_word(words, ipa)
+        return get_top(ipa)
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "max_size": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "lexicon_words": len(self.lexicon),
+            }
+
 
 def get_phonem_converter(language: str = "en"):
     """Get phoneme converter for the specified language (only English supported)."""
     if language == 'en':
-        return EngPhonemConverter()
+        return EngPhonemConverter(cache_size=int(os.getenv("PHONEME_CACHE_SIZE", "50000")))
     else:
         raise ValueError('Only English (en) language is supported')
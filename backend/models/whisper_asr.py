@@ -1,30 +1,72 @@
+import os
 import torch 
-from transformers import pipeline
-from .interfaces import IASRModel
-from typing import Union
+from .interfaces import IASRModel, TranscriptionResult, WordLocation
+from dataclasses import asdict
+from typing import List, Union
 import numpy as np 
 
 
 class WhisperASRModel(IASRModel):
-    def __init__(self, model_name="openai/whisper-base"):
-        self.asr = pipeline("automatic-speech-recognition", model=model_name, return_timestamps="word", generate_kwargs={"language": "en"})
-        self._transcript = ""
-        self._word_locations = []
+    def __init__(self, model_name="openai/whisper-base", local_dir: str = None):
+        """
+        local_dir: optional local copy of the weights. When it holds a saved pipeline it is loaded from there
+        (safetensors, memory-mapped, no hub round-trips); otherwise the hub model is saved into it for next time.
+        """
+        # Imported here so the API process can bind before transformers is loaded
+        from transformers import pipeline
+
+        has_local_copy = local_dir is not None and os.path.isfile(os.path.join(local_dir, "model.safetensors"))
+        self.asr = pipeline("automatic-speech-recognition", model=local_dir if has_local_copy else model_name,
+                            return_timestamps="word", generate_kwargs={"language": "en"})
+        if local_dir is not None and not has_local_copy:
+            self.asr.save_pretrained(local_dir, safe_serialization=True)
+        self._last_result = TranscriptionResult(transcript="", word_locations=())
         self.sample_rate = 16000
+        # Identifies the weights in result cache keys
+        self.model_version = f"transformers:{model_name}"
 
-    def processAudio(self, audio: Union[np.ndarray, torch.Tensor]):
+    def transcribe(self, audio: Union[np.ndarray, torch.Tensor]) -> TranscriptionResult:
         # 'audio' can be a path to a file or a numpy array of audio samples.
         if isinstance(audio, torch.Tensor):
             audio = audio.detach().cpu().numpy()
-        result = self.asr(audio[0])
-        self._transcript = result["text"]
-        self._word_locations = [{"word": word_info["text"], 
-                     "start_ts": word_info["timestamp"][0] * self.sample_rate if word_info["timestamp"][0] is not None else None,
-                     "end_ts": (word_info["timestamp"][1] * self.sample_rate if word_info["timestamp"][1] is not None else (word_info["timestamp"][0] + 1) * self.sample_rate),
-                     "tag": "processed"} for word_info in result["chunks"]]
+        return self._parse_result(self.asr(audio[0]))
+
+    def transcribe_batch(self, audios: List[Union[np.ndarray, torch.Tensor]]) -> List[TranscriptionResult]:
+        """Decode several clips in one padded pipeline call."""
+        inputs = []
+        for audio in audios:
+            if isinstance(audio, torch.Tensor):
+                audio = audio.detach().cpu().numpy()
+            inputs.append(audio[0])
+        results = self.asr(inputs, batch_size=len(inputs))
+        return [self._parse_result(result) for result in results]
+
+    def _parse_result(self, result: dict) -> TranscriptionResult:
+        """Convert a pipeline output into the transcript and word locations (in samples)."""
+        word_locations = tuple(
+            WordLocation(word=word_info["text"],
+                         start_ts=word_info["timestamp"][0] * self.sample_rate if word_info["timestamp"][0] is not None else None,
+                         end_ts=(word_info["timestamp"][1] * self.sample_rate if word_info["timestamp"][1] is not None else (word_info["timestamp"][0] + 1) * self.sample_rate))
+            for word_info in result["chunks"])
+        return TranscriptionResult(transcript=result["text"], word_locations=word_locations)
+
+    def processAudio(self, audio: Union[np.ndarray, torch.Tensor]):
+        # Legacy stateful API, prefer transcribe() when the model is shared between requests
+        self._last_result = self.transcribe(audio)
 
     def getTranscript(self) -> str:
-        return self._transcript
+        return self._last_result.transcript
 
     def getWordLocations(self) -> list:
-        return self._word_locations
+        return [asdict(word_location) for word_location in self._last_result.word_locations]
+
+
+def get_asr_model(backend: str = "transformers") -> IASRModel:
+    """Get the ASR model for the given backend ("transformers" fp32 pipeline or "ctranslate2" int8)."""
+    if backend == "transformers":
+        return WhisperASRModel(local_dir=os.getenv("ASR_LOCAL_MODEL_DIR") or None)
+    elif backend == "ctranslate2":
+        from .faster_whisper_asr import get_faster_whisper_model
+        return get_faster_whisper_model()
+    else:
+        raise ValueError(f'Unknown ASR backend "{backend}", use "transformers" or "ctranslate2"')
@@ -1,9 +1,12 @@
-import requests
+import asyncio
+import httpx
 import json
 import os
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+from utils.cache import SQLiteCache, TTLCache, TieredCache, content_key
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -23,28 +26,52 @@ def _generate_fallback_feedback(pronunciation_score: float, overall_quality: str
     return f"{chinese}\n\n{english}"
 
 class AIFeedbackGenerator:
-    def __init__(self):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 latency_budget_ms: Optional[float] = None, max_connections: int = 20,
+                 cache: Optional[TieredCache] = None):
         """
         Initialize AI feedback generator using Poe.
         
         Args:
             api_key: Poe API key. If not provided, will try to get from environment.
+            base_url: OpenAI-compatible API root (POE_BASE_URL), e.g. a local stub server in tests.
+            latency_budget_ms: Time allowed for one feedback call (AI_FEEDBACK_BUDGET_MS) before falling back.
+            max_connections: Size of the keep-alive connection pool.
+            cache: Feedback cache keyed by the prompt content, no caching when None.
         """
-        self.api_key = os.getenv("POE_API_KEY")
+        self.api_key = api_key or os.getenv("POE_API_KEY")
         print("Loaded Poe API Key from environment.")
         if not self.api_key:
             raise ValueError("POE key is required. Set POE_API_KEY in .env file")
         
-        self.base_url = "https://api.poe.com/v1"
-        self.model = "GPT-4o"
-        
-    def generate_feedback(self, 
+        self.base_url = (base_url or os.getenv("POE_BASE_URL", "https://api.poe.com/v1")).rstrip("/")
+        self.model = os.getenv("POE_MODEL", "GPT-4o")
+        if latency_budget_ms is None:
+            latency_budget_ms = float(os.getenv("AI_FEEDBACK_BUDGET_MS", "4000"))
+        self.latency_budget = latency_budget_ms / 1000
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self.cache = cache
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared client, so TLS connections to the API are reused across requests."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=httpx.Timeout(self.latency_budget),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    async def generate_feedback(self, 
                          pronunciation_score: float,
                          target_text: str,
                          transcribed_text: str,
                          word_comparisons: List[Dict],
                          overall_quality: str,
-                         is_letter_correct_all_words: str) -> str:
+                         is_letter_correct_all_words: Optional[str] = None) -> str:
         """
         Generate encouraging feedback for kids based on pronunciation results.
         
@@ -54,23 +81,38 @@ class AIFeedbackGenerator:
             transcribed_text: What was actually transcribed from the audio by Whisper
             word_comparisons: List of word-by-word comparisons
             overall_quality: Overall quality description (Excellent/Good/Needs Improvement)
+            is_letter_correct_all_words: Letter correctness mask, left out of the prompt when None
             
         Returns:
-            Encouraging feedback message in Chinese and English
+            Encouraging feedback message in Chinese and English, or the template feedback
+            when the API fails or does not answer within the latency budget
         """
         
-        # Prepare the prompt for the AI
+        # Prepare the prompt for the AI, from whitespace-normalized texts so equivalent attempts share a prompt
         prompt = self._create_prompt(
-            pronunciation_score, target_text, transcribed_text, 
+            pronunciation_score, " ".join(target_text.split()), " ".join(transcribed_text.split()),
             word_comparisons, overall_quality, is_letter_correct_all_words
         )
         print(f"AI Feedback Prompt: {prompt}")
+
+        # The prompt is fully determined by the inputs, so it addresses the cached answer
+        cache_key = content_key(self.model, prompt)
+        if self.cache is not None:
+            cached_response = await self.cache.aget(cache_key)
+            if cached_response is not None:
+                print("AI feedback served from cache")
+                return cached_response
         try:
             # Make request to Poe
-            response = self._make_Poe_request(prompt)
+            response = await asyncio.wait_for(self._make_Poe_request(prompt), timeout=self.latency_budget)
             print(f"LLM Response: {response}")
+            if self.cache is not None:
+                await self.cache.aset(cache_key, response)
             return response
             
+        except asyncio.TimeoutError:
+            print(f"AI feedback exceeded its {self.latency_budget:.1f}s budget, using fallback")
+            return self._generate_fallback_feedback(pronunciation_score, overall_quality)
         except Exception as e:
             # Fallback to template-based feedback if AI fails
             print(f"Error generating AI feedback: {e}")
@@ -82,7 +124,7 @@ class AIFeedbackGenerator:
                       transcribed_text: str,
                       word_comparisons: List[Dict],
                       overall_quality: str,
-                      is_letter_correct_all_words: str) -> str:
+                      is_letter_correct_all_words: Optional[str]) -> str:
         """Create a prompt for the AI to generate feedback."""
        
         # Analyze word-level issues
@@ -118,6 +160,9 @@ class AIFeedbackGenerator:
             for word in good_words:
                 phoneme_analysis += f"- '{word['word']}' ({word['phonemes']})\n"
 
+        letter_analysis = ""
+        if is_letter_correct_all_words is not None:
+            letter_analysis = f"Letter by Letter correctness (1 is correct, 0 is wrong): {is_letter_correct_all_words}\n"
         
         prompt = f"""
 You are a friendly English pronunciation tutor for Hong Kong primary school students (ages 6-12). 
@@ -131,8 +176,7 @@ Student's Performance:
 - Overall quality: {overall_quality}
 
 Phoneme Analysis:{phoneme_analysis}
-Letter by Letter correctness (1 is correct, 0 is wrong): {is_letter_correct_all_words}
-
+{letter_analysis}
 
 Guidelines:
 1. Use simple, friendly language suitable for primary school students
@@ -153,13 +197,8 @@ Format your response as:
 
         return prompt
    
-    def _make_Poe_request(self, prompt: str) -> str:
-        """Make a request to Poe API."""
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+    async def _make_Poe_request(self, prompt: str) -> str:
+        """Make a request to Poe API over the pooled client."""
         
         data = {
             "model": self.model,
@@ -173,13 +212,8 @@ Format your response as:
             "temperature": 0.7
         }
         try:
-            response = requests.post(
-                url=f"{self.base_url}/chat/completions",
-                headers=headers,
-                data=json.dumps(data),
-                timeout=8
-            )
-        except requests.RequestException as e:
+            response = await self._get_client().post("/chat/completions", json=data)
+        except httpx.HTTPError as e:
             print(f"Error connecting to Poe API: {e}")
             raise Exception(f"Failed to connect to Poe API: {e}")
         
@@ -196,6 +230,31 @@ Format your response as:
         return _generate_fallback_feedback(pronunciation_score, overall_quality)
 
 
+    def get_metrics(self) -> Dict:
+        return {"cache": self.cache.get_metrics() if self.cache is not None else None}
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.cache is not None:
+            self.cache.close()
+
+
+def get_feedback_cache() -> Optional[TieredCache]:
+    """
+    Feedback cache configured from the environment: FEEDBACK_CACHE_SIZE entries in memory (0 disables caching),
+    FEEDBACK_CACHE_TTL_SECONDS, and an optional SQLite tier at FEEDBACK_CACHE_DB that survives restarts.
+    """
+    max_size = int(os.getenv("FEEDBACK_CACHE_SIZE", "10000"))
+    if max_size <= 0:
+        return None
+    ttl_seconds = float(os.getenv("FEEDBACK_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    database_path = os.getenv("FEEDBACK_CACHE_DB", "")
+    backing = SQLiteCache(database_path, ttl_seconds=ttl_seconds) if database_path else None
+    return TieredCache(TTLCache(max_size=max_size, ttl_seconds=ttl_seconds), backing)
+
+
 def get_ai_feedback_generator() -> AIFeedbackGenerator:
     """Get an instance of AI feedback generator."""
-    return AIFeedbackGenerator()
+    return AIFeedbackGenerator(cache=get_feedback_cache())
@@ -1,10 +1,25 @@
 import torch
 import numpy as np
 import audioread
+import io
+import struct
 import tempfile
 import os
+from functools import lru_cache
+from typing import Tuple
 from torchaudio.transforms import Resample
 
+try:
+    import soundfile
+except ImportError:  # fall back to audioread for every compressed format
+    soundfile = None
+
+# Formats libsndfile can decode straight from memory
+SOUNDFILE_EXTENSIONS = {'.wav', '.flac', '.ogg', '.mp3'}
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
 
 def preprocess_audio(audio: torch.Tensor) -> torch.Tensor:
     """Normalize and preprocess audio for ASR processing."""
@@ -13,19 +28,148 @@ def preprocess_audio(audio: torch.Tensor) -> torch.Tensor:
     return audio
 
 
+def trim_silence(audio: torch.Tensor, sample_rate: int = 16000, frame_ms: float = 30.0,
+                 threshold_db: float = -40.0, padding_ms: float = 150.0) -> Tuple[torch.Tensor, int]:
+    """
+    Cut leading and trailing silence from a (1, samples) signal using frame energy.
+    Frames quieter than `threshold_db` below the loudest frame count as silence; `padding_ms` is kept
+    around the voiced region so word onsets are not clipped.
+    Returns the trimmed audio and the offset (in samples) of its first sample in the original signal.
+    """
+    frame_length = int(sample_rate * frame_ms / 1000)
+    number_of_frames = audio.shape[1] // frame_length
+    if number_of_frames == 0:
+        return audio, 0
+
+    frames = audio[0, :number_of_frames * frame_length].reshape(number_of_frames, frame_length)
+    energy_db = 10 * torch.log10(frames.pow(2).mean(dim=1) + 1e-10)
+    voiced_frames = torch.nonzero(energy_db > energy_db.max() + threshold_db).flatten()
+    if len(voiced_frames) == 0:
+        return audio, 0
+
+    padding = int(sample_rate * padding_ms / 1000)
+    start = max(0, int(voiced_frames[0]) * frame_length - padding)
+    end = min(audio.shape[1], (int(voiced_frames[-1]) + 1) * frame_length + padding)
+    return audio[:, start:end], start
+
+
 def load_audio_file(file_path: str, target_sample_rate: int = 16000) -> torch.Tensor:
     """Load audio file and resample to target sample rate."""
-    transform = Resample(orig_freq=48000, new_freq=target_sample_rate)
-    
     signal, fs = audioread_load(file_path)
-    signal = transform(torch.Tensor(signal)).unsqueeze(0)
-    
-    return signal
+    return to_mono_at_sample_rate(signal, fs, target_sample_rate)
+
+
+def load_audio_bytes(content: bytes, file_extension: str, target_sample_rate: int = 16000) -> torch.Tensor:
+    """Decode an uploaded audio file from memory and resample to target sample rate."""
+    signal, fs = decode_audio_bytes(content, file_extension)
+    return to_mono_at_sample_rate(signal, fs, target_sample_rate)
+
+
+@lru_cache(maxsize=16)
+def get_resampler(orig_sample_rate: int, target_sample_rate: int) -> Resample:
+    """Resample transforms are cached per rate pair, building the filter kernel is not free."""
+    return Resample(orig_freq=orig_sample_rate, new_freq=target_sample_rate)
+
+
+def to_mono_at_sample_rate(signal: np.ndarray, sample_rate: int, target_sample_rate: int = 16000) -> torch.Tensor:
+    """Downmix a (channels, samples) or (samples,) signal to mono and resample it, returns shape (1, samples)."""
+    # Downmix first so stereo uploads are only resampled once
+    if signal.ndim > 1:
+        signal = signal.mean(axis=0)
+    signal = torch.from_numpy(np.ascontiguousarray(signal, dtype=np.float32))
+
+    if sample_rate != target_sample_rate:
+        signal = get_resampler(sample_rate, target_sample_rate)(signal)
+
+    return signal.unsqueeze(0)
+
+
+def decode_audio_bytes(content: bytes, file_extension: str, dtype=np.float32):
+    """
+    Decode audio held in memory, picking the cheapest path:
+    PCM16 WAV is read in place, other libsndfile formats are decoded into a preallocated buffer,
+    anything else (e.g. m4a) goes through a temp file and audioread.
+    Returns (signal, sample_rate) with the same layout as `audioread_load`.
+    """
+    file_extension = file_extension.lower()
+    if file_extension == '.wav':
+        decoded = wav_pcm16_load(content, dtype=dtype)
+        if decoded is not None:
+            return decoded
+
+    if soundfile is not None and file_extension in SOUNDFILE_EXTENSIONS:
+        try:
+            return soundfile_load(content, dtype=dtype)
+        except RuntimeError:
+            # Not decodable by this libsndfile build, use the audioread fallback
+            pass
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
+        temp_file.write(content)
+        temp_file_path = temp_file.name
+    try:
+        return audioread_load(temp_file_path, dtype=dtype)
+    finally:
+        os.unlink(temp_file_path)
+
+
+def wav_pcm16_load(content: bytes, dtype=np.float32):
+    """
+    Read a PCM16 WAV file from memory. The samples are viewed in place with `np.frombuffer`,
+    the only copy is the conversion to float. Returns None for any other WAV encoding.
+    """
+    if len(content) < 12 or content[:4] != b'RIFF' or content[8:12] != b'WAVE':
+        return None
+
+    view = memoryview(content)
+    n_channels = sample_rate = None
+    position = 12
+    while position + 8 <= len(content):
+        chunk_id = content[position:position + 4]
+        chunk_size = struct.unpack_from('<I', content, position + 4)[0]
+        chunk_start = position + 8
+
+        if chunk_id == b'fmt ':
+            audio_format, n_channels, sample_rate = struct.unpack_from('<HHI', content, chunk_start)
+            bits_per_sample = struct.unpack_from('<H', content, chunk_start + 14)[0]
+            if audio_format == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                audio_format = struct.unpack_from('<H', content, chunk_start + 24)[0]
+            if audio_format != WAVE_FORMAT_PCM or bits_per_sample != 16:
+                return None
+
+        elif chunk_id == b'data':
+            if n_channels is None:
+                return None
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF, trust the payload instead
+            data_size = min(chunk_size, len(content) - chunk_start) if chunk_size else len(content) - chunk_start
+            data_size -= data_size % (2 * n_channels)
+            samples = np.frombuffer(view[chunk_start:chunk_start + data_size], dtype='<i2')
+
+            y = samples.astype(dtype)
+            y *= 1.0 / float(1 << 15)
+            if n_channels > 1:
+                y = y.reshape((-1, n_channels)).T
+            return y, sample_rate
+
+        position = chunk_start + chunk_size + (chunk_size & 1)
+
+    return None
+
+
+def soundfile_load(content: bytes, dtype=np.float32):
+    """Decode any libsndfile format from memory into a buffer preallocated from the header's frame count."""
+    with soundfile.SoundFile(io.BytesIO(content)) as sound_file:
+        # Returns a view of `out` trimmed to the frames actually decoded
+        y = sound_file.read(out=np.empty((sound_file.frames, sound_file.channels), dtype=dtype))
+        sample_rate = sound_file.samplerate
+
+    if y.shape[1] > 1:
+        return y.T, sample_rate
+    return y[:, 0], sample_rate
 
 
 def audioread_load(path, offset=0.0, duration=None, dtype=np.float32):
     """Load an audio buffer using audioread."""
-    y = []
     with audioread.audio_open(path) as input_file:
         sr_native = input_file.samplerate
         n_channels = input_file.channels
@@ -37,6 +181,13 @@ def audioread_load(path, offset=0.0, duration=None, dtype=np.float32):
         else:
             s_end = s_start + (int(np.round(sr_native * duration)) * n_channels)
 
+        # Preallocate from the reported duration and grow only if the estimate was short
+        estimated_length = int(np.ceil((input_file.duration or 0) * sr_native)) * n_channels - s_start
+        if s_end != np.inf:
+            estimated_length = min(estimated_length, s_end - s_start)
+        y = np.empty(max(estimated_length, 0), dtype=dtype)
+        filled = 0
+
         n = 0
 
         for frame in input_file:
@@ -56,14 +207,14 @@ def audioread_load(path, offset=0.0, duration=None, dtype=np.float32):
             if n_prev <= s_start <= n:
                 frame = frame[(s_start - n_prev):]
 
-            y.append(frame)
+            if filled + len(frame) > len(y):
+                y = np.resize(y, max(2 * len(y), filled + len(frame)))
+            y[filled:filled + len(frame)] = frame
+            filled += len(frame)
 
-    if y:
-        y = np.concatenate(y)
-        if n_channels > 1:
-            y = y.reshape((-1, n_channels)).T
-    else:
-        y = np.empty(0, dtype=dtype)
+    y = y[:filled]
+    if n_channels > 1:
+        y = y.reshape((-1, n_channels)).T
 
     return y, sr_native
 
@@ -0,0 +1,257 @@
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+def content_key(*parts: Any) -> str:
+    """SHA-256 of the JSON encoding of `parts`, a stable key for content-addressed caches."""
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache with LRU eviction and an optional time-to-live per entry.
+    Keeps hit/miss/eviction counters for metrics.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is not None and expires_at <= time.monotonic():
+                    del self._entries[key]
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        if self.max_size <= 0:
+            return
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class SQLiteCache:
+    """
+    On-disk cache tier in a single SQLite file, survives restarts. Values are pickled, so only point
+    it at files this service writes. Least recently used rows are pruned above `max_entries`.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None, max_entries: int = 100_000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connect()
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> None:
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+        self._pid = os.getpid()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """This process' connection (lock must be held); a connection must not be used across fork()."""
+        if self._pid != os.getpid():
+            self._connect()
+        return self._connection
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            connection = self._get_connection()
+            row = connection.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.misses += 1
+                return default
+            connection.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        now = time.time()
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = now + ttl_seconds if ttl_seconds is not None else None
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            connection = self._get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, blob, expires_at, now))
+            self._writes_since_prune += 1
+            # Pruning scans the table, do it once in a while rather than on every write
+            if self._writes_since_prune >= max(1, self.max_entries // 100):
+                self._prune(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._get_connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._get_connection().execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _prune(self, now: float) -> None:
+        """Drop expired rows, then the least recently used ones above max_entries (lock must be held)."""
+        self._writes_since_prune = 0
+        connection = self._get_connection()
+        connection.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        connection.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._get_connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "size": size,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class TieredCache:
+    """An in-memory TTL/LRU tier in front of an optional slower tier; hits in the slow tier are promoted."""
+
+    def __init__(self, memory: TTLCache, backing: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.backing = backing
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.backing is not None:
+            value = self.backing.get(key, _MISSING)
+            if value is not _MISSING:
+                self.memory.set(key, value)
+                return value
+        return default
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.backing is not None:
+            self.backing.set(key, value)
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """`get` for coroutines: a memory hit answers on the event loop, the disk tier is read in a thread."""
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.backing is None:
+            return default
+        value = await asyncio.to_thread(self.backing.get, key, _MISSING)
+        if value is _MISSING:
+            return default
+        self.memory.set(key, value)
+        return value
+
+    async def aset(self, key: str, value: Any) -> None:
+        """`set` for coroutines, the disk tier is written in a thread."""
+        if self.backing is None:
+            self.memory.set(key, value)
+        else:
+            await asyncio.to_thread(self.set, key, value)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.backing is not None:
+            self.backing.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.backing is not None:
+            self.backing.clear()
+
+    def close(self) -> None:
+        if self.backing is not None:
+            self.backing.close()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        memory = self.memory.get_metrics()
+        metrics = {"memory": memory}
+        hits = memory["hits"]
+        if self.backing is not None:
+            metrics["disk"] = self.backing.get_metrics()
+            hits += metrics["disk"]["hits"]
+        # Every lookup goes through the memory tier first
+        lookups = memory["hits"] + memory["misses"]
+        metrics["hits"] = hits
+        metrics["misses"] = lookups - hits
+        metrics["hit_rate"] = hits / lookups if lookups else 0.0
+        return metrics
@@ -0,0 +1,106 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils.cache import TTLCache
+from utils.inference_executor import _summarize
+
+
+class FeedbackQueueFullError(Exception):
+    """Raised when too many feedback jobs are already waiting."""
+
+
+@dataclass
+class FeedbackJob:
+    job_id: str
+    status: str = "pending"
+    ai_feedback: Optional[str] = None
+    created_at: float = field(default_factory=time.monotonic)
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"job_id": self.job_id, "status": self.status, "ai_feedback": self.ai_feedback}
+
+
+class FeedbackJobQueue:
+    """
+    Background generation of AI feedback, so /analyze can answer with the score right away.
+
+    Jobs run on `workers` asyncio tasks of the app's event loop (feedback generation is async I/O).
+    At most `max_pending` jobs wait at once. Finished jobs can be fetched for `retention_seconds`.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 256, retention_seconds: float = 600,
+                 max_jobs: int = 10000, metrics_window: int = 1000):
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self._jobs = TTLCache(max_size=max_jobs, ttl_seconds=retention_seconds)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._submitted_total = 0
+        self._rejected_total = 0
+        self._completed_total = 0
+        self._failed_total = 0
+        self._latencies = deque(maxlen=metrics_window)
+
+    def start(self) -> None:
+        """Start the workers, must be called from the running event loop."""
+        self._queue = asyncio.Queue()
+        self._worker_tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def submit(self, generate: Callable[[], Awaitable[str]]) -> FeedbackJob:
+        """Queue `generate()` (a coroutine function returning the feedback text) and return its job."""
+        if self._queue is None:
+            raise RuntimeError("FeedbackJobQueue.start() was not called")
+        if self._queue.qsize() >= self.max_pending:
+            self._rejected_total += 1
+            raise FeedbackQueueFullError(f"{self._queue.qsize()} feedback jobs already pending")
+        job = FeedbackJob(job_id=uuid.uuid4().hex)
+        self._jobs.set(job.job_id, job)
+        self._queue.put_nowait((job, generate))
+        self._submitted_total += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[FeedbackJob]:
+        return self._jobs.get(job_id)
+
+    async def _work(self) -> None:
+        while True:
+            job, generate = await self._queue.get()
+            try:
+                job.ai_feedback = await generate()
+                job.status = "done"
+                self._completed_total += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Feedback job {job.job_id} failed: {e}")
+                job.status = "failed"
+                self._failed_total += 1
+            finally:
+                if job.status != "pending":
+                    self._latencies.append(time.monotonic() - job.created_at)
+                job.done.set()
+                self._queue.task_done()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_pending": self.max_pending,
+            "submitted_total": self._submitted_total,
+            "rejected_total": self._rejected_total,
+            "completed_total": self._completed_total,
+            "failed_total": self._failed_total,
+            "time_to_feedback_seconds": _summarize(sorted(self._latencies)),
+        }
@@ -15,6 +15,11 @@ def get_ai_feedback():
             ai_feedback_generator = None
     return ai_feedback_generator
 
+async def close_ai_feedback():
+    """Close the pooled HTTP connections of the AI feedback generator, if it was created."""
+    if ai_feedback_generator is not None:
+        await ai_feedback_generator.aclose()
+
 def _get_quality_description(score: float) -> str:
     """Convert numerical score to quality description."""
     if score >= 80:
@@ -0,0 +1,143 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict
+
+
+class InferenceQueueFullError(Exception):
+    """Raised when the inference admission queue has no free slot."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    Dedicated worker pool for blocking model inference.
+
+    Jobs are admitted up to `max_workers` running plus `max_queue_size` waiting;
+    anything beyond that is rejected immediately so the caller can answer with 429
+    instead of piling up requests. Keeps queue-depth and wait-time metrics.
+    """
+
+    def __init__(self, max_workers: int = 1, max_queue_size: int = 16, metrics_window: int = 1000):
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(0, max_queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._submitted_total = 0
+        self._rejected_total = 0
+        self._completed_total = 0
+        self._failed_total = 0
+        self._wait_times = deque(maxlen=metrics_window)
+        self._run_times = deque(maxlen=metrics_window)
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue_size
+
+    def _admit(self):
+        with self._lock:
+            if self._admitted >= self.capacity:
+                self._rejected_total += 1
+                raise InferenceQueueFullError(self._estimate_retry_after())
+            self._admitted += 1
+            self._submitted_total += 1
+
+    def _release(self):
+        with self._lock:
+            self._admitted -= 1
+
+    def _estimate_retry_after(self) -> int:
+        """Rough seconds until a slot frees up, based on recent run times (lock must be held)."""
+        if not self._run_times:
+            return 1
+        average_run_time = sum(self._run_times) / len(self._run_times)
+        waves = math.ceil(self._admitted / self.max_workers)
+        return max(1, math.ceil(average_run_time * waves))
+
+    def run(self, func: Callable, *args, **kwargs) -> Awaitable[Any]:
+        """
+        Run `func` on the inference pool without blocking the event loop.
+        Admission is decided by this call itself, so a full pool raises before anything is awaited.
+        """
+        self._admit()
+        return self._run_admitted(func, args, kwargs)
+
+    async def _run_admitted(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        enqueued_at = time.monotonic()
+
+        def job():
+            started_at = time.monotonic()
+            with self._lock:
+                self._running += 1
+                self._wait_times.append(started_at - enqueued_at)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_times.append(time.monotonic() - started_at)
+                # The slot is held until the work itself ends, even if the caller stopped waiting
+                self._release()
+
+        try:
+            future = self._executor.submit(job)
+        except BaseException:
+            self._release()
+            raise
+        try:
+            result = await asyncio.wrap_future(future)
+            with self._lock:
+                self._completed_total += 1
+            return result
+        except asyncio.CancelledError:
+            # Caller went away (e.g. client disconnect): drop the job if it has not started yet,
+            # otherwise job() releases the slot when it finishes
+            if future.cancel():
+                self._release()
+            raise
+        except Exception:
+            with self._lock:
+                self._failed_total += 1
+            raise
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, throughput counters and wait/run time percentiles (seconds)."""
+        with self._lock:
+            wait_times = sorted(self._wait_times)
+            run_times = sorted(self._run_times)
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "running": self._running,
+                "queue_depth": self._admitted - self._running,
+                "submitted_total": self._submitted_total,
+                "rejected_total": self._rejected_total,
+                "completed_total": self._completed_total,
+                "failed_total": self._failed_total,
+                "wait_time_seconds": _summarize(wait_times),
+                "run_time_seconds": _summarize(run_times),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+def _summarize(sorted_values: list) -> Dict[str, float]:
+    """Mean / p50 / p95 / max over an already sorted list of samples."""
+    if not sorted_values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    count = len(sorted_values)
+    return {
+        "mean": sum(sorted_values) / count,
+        "p50": sorted_values[int(0.50 * (count - 1))],
+        "p95": sorted_values[int(0.95 * (count - 1))],
+        "max": sorted_values[-1],
+    }
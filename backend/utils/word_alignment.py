@@ -0,0 +1,93 @@
+import math
+import numpy as np
+from typing import Callable, Optional
+
+
+def dtw_align(row_costs: Callable[[int, int, int], np.ndarray], number_of_rows: int, number_of_columns: int,
+              band: Optional[int] = None, max_cost: Optional[float] = None) -> Optional[np.ndarray]:
+    """
+    Banded DTW with the symmetric2 step pattern (steps (1, 0) and (0, 1) cost d, (1, 1) costs 2d).
+
+    Only cells within `band` columns of the diagonal are evaluated, and `row_costs(row, first, last)`
+    is asked for the local distances of columns first..last of a row. Time and memory are therefore
+    O(rows * band) instead of O(rows * columns). Without a band the whole matrix is used, which gives
+    exactly the same path as `dtwalign.dtw_from_distance_matrix` (same recursion and tie-breaking).
+
+    Alignment is abandoned early (returns None) as soon as every cell of a row costs more than `max_cost`.
+
+    Returns, for every column, the last row the warping path visits in that column (row 0 for column 0),
+    which is what `DtwResult.get_warping_path()` interpolates to.
+    """
+    slope = (number_of_columns - 1) / (number_of_rows - 1) if number_of_rows > 1 else 0.
+    if band is None:
+        radius = number_of_columns
+    else:
+        # Consecutive rows must overlap, whatever the length ratio of both sequences
+        radius = max(band, math.ceil(slope) + 1)
+
+    first_columns = np.empty(number_of_rows, dtype=np.int64)
+    cumulative_rows = []
+    previous_row = None
+    for row in range(number_of_rows):
+        center = int(round(row * slope))
+        first = 0 if row == 0 else max(0, center - radius)
+        last = number_of_columns - 1 if row == number_of_rows - 1 or number_of_rows == 1 \
+            else min(number_of_columns - 1, center + radius)
+        first_columns[row] = first
+        costs = np.asarray(row_costs(row, first, last), dtype=np.float64)
+
+        if previous_row is None:
+            # First row: only horizontal steps from the origin
+            cumulative = np.cumsum(costs)
+        else:
+            # Best way into each cell from the previous row: vertical (d) or diagonal (2d) step
+            columns = np.arange(first, last + 1)
+            vertical = _lookup(previous_row, first_columns[row - 1], columns)
+            diagonal = _lookup(previous_row, first_columns[row - 1], columns - 1)
+            entry = np.minimum(vertical + costs, diagonal + 2 * costs)
+            # Horizontal steps: cumulative[j] = min(entry[j], cumulative[j - 1] + costs[j]), solved as a prefix scan
+            running_costs = np.cumsum(costs)
+            cumulative = running_costs + np.minimum.accumulate(entry - running_costs)
+        cumulative_rows.append(cumulative)
+        previous_row = cumulative
+
+        if max_cost is not None and cumulative.min() > max_cost:
+            return None
+
+    return _backtrack_last_rows(cumulative_rows, first_columns, number_of_columns)
+
+
+def _lookup(row_values: np.ndarray, first_column: int, columns: np.ndarray) -> np.ndarray:
+    """Cumulative costs of a stored band row at the given columns, inf outside the band."""
+    positions = columns - first_column
+    inside = (positions >= 0) & (positions < len(row_values))
+    values = np.full(len(columns), np.inf)
+    values[inside] = row_values[positions[inside]]
+    return values
+
+
+def _backtrack_last_rows(cumulative_rows: list, first_columns: np.ndarray, number_of_columns: int) -> np.ndarray:
+    """Walk the path back from the last cell, keeping the last row visited in every column."""
+    def cost(row, column):
+        if row < 0 or column < 0:
+            return np.inf
+        position = column - first_columns[row]
+        if position < 0 or position >= len(cumulative_rows[row]):
+            return np.inf
+        return cumulative_rows[row][position]
+
+    last_rows = np.zeros(number_of_columns, dtype=np.int64)
+    row, column = len(cumulative_rows) - 1, number_of_columns - 1
+    last_rows[column] = row
+    while row > 0 or column > 0:
+        # Same preference order as dtwalign on ties: vertical, diagonal, horizontal
+        candidates = [cost(row - 1, column), cost(row - 1, column - 1), cost(row, column - 1)]
+        step = candidates.index(min(candidates))
+        if candidates[step] == np.inf:
+            break
+        if step > 0:
+            # Entering a new column from its bottom-most cell
+            last_rows[column - 1] = row - 1 if step == 1 else row
+        row, column = [(row - 1, column), (row - 1, column - 1), (row, column - 1)][step]
+    last_rows[0] = 0
+    return last_rows
@@ -1,7 +1,11 @@
 import numpy as np
 from string import punctuation
-from dtwalign import dtw_from_distance_matrix
-from .word_metrics import edit_distance_python
+from .word_alignment import dtw_align
+from .word_metrics import edit_distance, edit_distance_matrix, edit_distance_one_to_many
+
+# Alignment band (in words) around the diagonal. Passages shorter than this are aligned on the full
+# matrix; longer read-aloud passages only evaluate cells within the band, in near-linear time and memory.
+WORD_ALIGNMENT_BAND = 50
 
 
 def get_word_distance_matrix(words_estimated: list, words_real: list) -> np.ndarray:
@@ -12,10 +16,16 @@ def get_word_distance_matrix(words_estimated: list, words_real: list) -> np.ndar
     word_distance_matrix = np.zeros(
         (number_of_estimated_words + 1, number_of_real_words))
     
-    for idx_estimated in range(number_of_estimated_words):
-        for idx_real in range(number_of_real_words):
-            word_distance_matrix[idx_estimated, idx_real] = edit_distance_python(
-                words_estimated[idx_estimated], words_real[idx_real])
+    # Each distinct word pair is computed once, in one batched pass
+    unique_estimated_words = list(dict.fromkeys(words_estimated))
+    unique_real_words = list(dict.fromkeys(words_real))
+    unique_distances = edit_distance_matrix(unique_estimated_words, unique_real_words)
+
+    estimated_positions = {word: idx for idx, word in enumerate(unique_estimated_words)}
+    real_positions = {word: idx for idx, word in enumerate(unique_real_words)}
+    word_distance_matrix[:number_of_estimated_words] = unique_distances[np.ix_(
+        [estimated_positions[word] for word in words_estimated],
+        [real_positions[word] for word in words_real])]
 
     # Add penalty for unmatched real words
     for idx_real in range(number_of_real_words):
@@ -53,7 +63,7 @@ def get_resulting_string(mapped_indices: np.ndarray, words_estimated: list, word
                 idx_above_word = single_word_idx >= len(words_estimated)
                 if idx_above_word:
                     continue
-                error_word = edit_distance_python(
+                error_word = edit_distance(
                     words_estimated[single_word_idx], words_real[word_idx])
                 if error_word < error:
                     error = error_word
@@ -67,12 +77,37 @@ def get_resulting_string(mapped_indices: np.ndarray, words_estimated: list, word
     return mapped_words, mapped_words_indices
 
 
-def get_best_mapped_words(words_estimated: list, words_real: list) -> tuple:
-    """Find the best mapping between estimated and real words using DTW."""
-    word_distance_matrix = get_word_distance_matrix(words_estimated, words_real)
-    
-    alignment = dtw_from_distance_matrix(word_distance_matrix.T)
-    mapped_indices = alignment.get_warping_path()[:len(words_estimated)]
+def get_best_mapped_words(words_estimated: list, words_real: list, band: int = WORD_ALIGNMENT_BAND,
+                          max_cost: float = None) -> tuple:
+    """
+    Find the best mapping between estimated and real words using banded DTW.
+    When the alignment cost exceeds `max_cost` it is abandoned and no real word is considered found.
+    """
+    number_of_estimated_words = len(words_estimated)
+    number_of_columns = number_of_estimated_words + 1
+
+    if band is None or 2 * band + 1 >= number_of_columns:
+        # The band covers everything, one batched matrix is cheaper than row by row distances
+        word_distance_matrix = get_word_distance_matrix(words_estimated, words_real).T
+
+        def row_costs(idx_real, first, last):
+            return word_distance_matrix[idx_real, first:last + 1]
+    else:
+        def row_costs(idx_real, first, last):
+            costs = np.empty(last - first + 1)
+            last_estimated = min(last, number_of_estimated_words - 1)
+            costs[:last_estimated - first + 1] = edit_distance_one_to_many(
+                words_real[idx_real], words_estimated[first:last_estimated + 1])
+            if last == number_of_estimated_words:
+                # Penalty for unmatched real words
+                costs[-1] = len(words_real[idx_real])
+            return costs
+
+    real_word_per_estimated_word = dtw_align(
+        row_costs, len(words_real), number_of_columns, band=band, max_cost=max_cost)
+    if real_word_per_estimated_word is None:
+        return ['-'] * len(words_real), [-1] * len(words_real)
+    mapped_indices = real_word_per_estimated_word[:number_of_estimated_words]
     
     mapped_words, mapped_words_indices = get_resulting_string(
         mapped_indices, words_estimated, words_real)
@@ -1,4 +1,5 @@
 import numpy as np
+from typing import NamedTuple, Sequence
 
 
 def edit_distance_python(seq1, seq2):
@@ -31,3 +32,156 @@ def edit_distance_python(seq1, seq2):
                 )
     
     return matrix[size_x - 1, size_y - 1]
+
+
+try:
+    from rapidfuzz.distance import Levenshtein as _rapidfuzz_levenshtein
+    from rapidfuzz.process import cdist as _rapidfuzz_cdist
+except ImportError:  # optional compiled backend, the bit-parallel implementation below is used otherwise
+    _rapidfuzz_levenshtein = None
+    _rapidfuzz_cdist = None
+
+
+def _pattern_bitmasks(pattern) -> dict:
+    """For each symbol of the pattern, a bitmask of the positions where it occurs."""
+    bitmasks = {}
+    for idx, symbol in enumerate(pattern):
+        bitmasks[symbol] = bitmasks.get(symbol, 0) | (1 << idx)
+    return bitmasks
+
+
+def _myers_distance(bitmasks: dict, pattern_length: int, text) -> int:
+    """
+    Bit-parallel Levenshtein distance (Myers 1999, Hyyrö's formulation for global distance).
+    Each DP column is encoded as vertical +1/-1 delta bitvectors, one Python int per column step.
+    """
+    if pattern_length == 0:
+        return len(text)
+    mask = (1 << pattern_length) - 1
+    last_bit = 1 << (pattern_length - 1)
+    positive_vertical = mask
+    negative_vertical = 0
+    score = pattern_length
+
+    for symbol in text:
+        equal = bitmasks.get(symbol, 0)
+        crossing_vertical = equal | negative_vertical
+        crossing_horizontal = ((((equal & positive_vertical) + positive_vertical) & mask) ^ positive_vertical) | equal
+        positive_horizontal = negative_vertical | (~(crossing_horizontal | positive_vertical) & mask)
+        negative_horizontal = positive_vertical & crossing_horizontal
+
+        if positive_horizontal & last_bit:
+            score += 1
+        elif negative_horizontal & last_bit:
+            score -= 1
+
+        positive_horizontal = ((positive_horizontal << 1) | 1) & mask
+        negative_horizontal = (negative_horizontal << 1) & mask
+        positive_vertical = negative_horizontal | (~(crossing_vertical | positive_horizontal) & mask)
+        negative_vertical = positive_horizontal & crossing_vertical
+
+    return score
+
+
+def edit_distance(seq1, seq2) -> int:
+    """
+    Levenshtein distance between two sequences (strings, phoneme strings or word lists).
+    Same result as `edit_distance_python`, computed with the compiled backend when available.
+    """
+    if _rapidfuzz_levenshtein is not None:
+        return _rapidfuzz_levenshtein.distance(seq1, seq2)
+    # The shorter sequence is the bit pattern, fewer bits per step
+    if len(seq1) > len(seq2):
+        seq1, seq2 = seq2, seq1
+    return _myers_distance(_pattern_bitmasks(seq1), len(seq1), seq2)
+
+
+def edit_distance_one_to_many(query, candidates: list) -> list:
+    """Distances from one sequence to many, the query bitmasks are built once."""
+    if _rapidfuzz_levenshtein is not None:
+        return [_rapidfuzz_levenshtein.distance(query, candidate) for candidate in candidates]
+    bitmasks = _pattern_bitmasks(query)
+    return [_myers_distance(bitmasks, len(query), candidate) for candidate in candidates]
+
+
+class CompiledPattern(NamedTuple):
+    """A sequence compared against many others, with its bit-parallel encoding built once."""
+    sequence: Sequence
+    bitmasks: dict
+
+
+def compile_pattern(sequence) -> CompiledPattern:
+    return CompiledPattern(sequence, _pattern_bitmasks(sequence))
+
+
+def edit_distance_to_pattern(pattern: CompiledPattern, text) -> int:
+    """Same as `edit_distance(pattern.sequence, text)` without re-encoding the pattern."""
+    if _rapidfuzz_levenshtein is not None:
+        return _rapidfuzz_levenshtein.distance(pattern.sequence, text)
+    return _myers_distance(pattern.bitmasks, len(pattern.sequence), text)
+
+
+# Below this many pairs the per-op NumPy overhead of the vectorized DP outweighs its gain
+VECTORIZED_MIN_PAIRS = 512
+# Rows of `seqs1` handled per vectorized pass, bounds the (max_length, rows, columns) work arrays
+VECTORIZED_ROW_BLOCK = 256
+
+
+def edit_distance_matrix(seqs1: list, seqs2: list) -> np.ndarray:
+    """Integer matrix of distances between every sequence of `seqs1` (rows) and `seqs2` (columns)."""
+    if not seqs1 or not seqs2:
+        return np.zeros((len(seqs1), len(seqs2)), dtype=np.int64)
+    if _rapidfuzz_cdist is not None:
+        return _rapidfuzz_cdist(seqs1, seqs2, scorer=_rapidfuzz_levenshtein.distance, dtype=np.int64)
+    if len(seqs1) * len(seqs2) >= VECTORIZED_MIN_PAIRS:
+        return edit_distance_matrix_vectorized(seqs1, seqs2)
+    return np.array([edit_distance_one_to_many(seq1, seqs2) for seq1 in seqs1], dtype=np.int64)
+
+
+def _encode_padded(seqs: list, symbol_ids: dict, padding: int):
+    """Integer-encode sequences into a padded (n, max_length) array plus their lengths."""
+    lengths = np.array([len(seq) for seq in seqs], dtype=np.int64)
+    codes = np.full((len(seqs), max(int(lengths.max()), 1)), padding, dtype=np.int32)
+    for row, seq in enumerate(seqs):
+        codes[row, :len(seq)] = [symbol_ids.setdefault(symbol, len(symbol_ids)) for symbol in seq]
+    return codes, lengths
+
+
+def edit_distance_matrix_vectorized(seqs1: list, seqs2: list) -> np.ndarray:
+    """
+    Wagner-Fischer run for all pairs at once: sequences are integer-encoded and padded, and each
+    DP cell (i, j) is updated for every pair with one NumPy operation, so the Python loop is
+    O(max_len1 * max_len2) regardless of how many sequences there are.
+    """
+    symbol_ids = {}
+    codes1, lengths1 = _encode_padded(seqs1, symbol_ids, padding=-1)
+    codes2, lengths2 = _encode_padded(seqs2, symbol_ids, padding=-2)
+    distances = np.empty((len(seqs1), len(seqs2)), dtype=np.int64)
+    columns = np.arange(len(seqs2))
+
+    for block_start in range(0, len(seqs1), VECTORIZED_ROW_BLOCK):
+        block_codes = codes1[block_start:block_start + VECTORIZED_ROW_BLOCK]
+        block_lengths = lengths1[block_start:block_start + VECTORIZED_ROW_BLOCK]
+        block_distances = distances[block_start:block_start + VECTORIZED_ROW_BLOCK]
+
+        # previous_row[j, a, b] holds D[i - 1, j] for the pair (seqs1[a], seqs2[b])
+        previous_row = np.broadcast_to(
+            np.arange(codes2.shape[1] + 1, dtype=np.int32)[:, None, None],
+            (codes2.shape[1] + 1, len(block_codes), len(seqs2))).copy()
+        block_distances[block_lengths == 0] = lengths2
+
+        for i in range(1, int(block_lengths.max()) + 1):
+            current_row = np.empty_like(previous_row)
+            current_row[0] = i
+            symbols1 = block_codes[:, i - 1][:, None]
+            for j in range(1, codes2.shape[1] + 1):
+                substitution_cost = symbols1 != codes2[:, j - 1][None, :]
+                np.minimum(previous_row[j] + 1, current_row[j - 1] + 1, out=current_row[j])
+                np.minimum(current_row[j], previous_row[j - 1] + substitution_cost, out=current_row[j])
+            finished = block_lengths == i
+            if finished.any():
+                # D[len(seq1), len(seq2)] for the rows whose sequence ends at i
+                block_distances[finished] = current_row[lengths2, :, columns].T[finished]
+            previous_row = current_row
+
+    return distances